@@ -1,45 +1,192 @@
 import os
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-import urllib3
-from urllib3.exceptions import HTTPError
+from teams_client import TeamsPostError, post_card, post_many
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-http = urllib3.PoolManager()
+DIGEST_MODE = os.getenv("DIGEST_MODE", "true").strip().lower() in {"1", "true", "yes", "on"}
+DIGEST_MAX_FACTS = int(os.getenv("DIGEST_MAX_FACTS", "50"))
+# Teams rejects connector payloads over ~28 KB; keep the encoded card below that.
+DIGEST_MAX_BYTES = int(os.getenv("DIGEST_MAX_BYTES", "24000"))
+DIGEST_MAX_TEXT = int(os.getenv("DIGEST_MAX_TEXT", "500"))
 
-def post_to_teams(webhook_url: str, message: str) -> None:
+STATE_ORDER = ("ALARM", "INSUFFICIENT_DATA", "OK")
+STATE_COLORS = {"ALARM": "D13438", "INSUFFICIENT_DATA": "FFB900", "OK": "107C10"}
+
+
+def extract_messages(event: Dict[str, Any]) -> List[Tuple[str, str]]:
     """
-    Post a message to a Microsoft Teams channel via the given webhook URL.
+    Return ``(record_id, message)`` pairs from an SNS or SQS-batched event.
 
-    :param webhook_url: The Microsoft Teams webhook URL.
-    :type webhook_url: str
-    :param message: The message to send to Teams.
-    :type message: str
-    :raises HTTPError: If the request to Teams fails at the HTTP level.
-    :raises Exception: If Teams does not return a 2xx status code.
+    SNS invokes the function with ``Records[].Sns``; when the topic is
+    subscribed through an SQS queue, each ``Records[].body`` holds the SNS
+    envelope as JSON.
+
+    :param event: The AWS Lambda event.
+    :type event: dict
+    :return: One pair per record, in delivery order.
+    :rtype: list
+    """
+    messages = []
+    for record in event.get("Records", []):
+        if "Sns" in record:
+            sns = record.get("Sns", {})
+            messages.append((sns.get("MessageId", ""), sns.get("Message", "No message found")))
+            continue
+
+        body = record.get("body", "")
+        try:
+            envelope = json.loads(body)
+        except (TypeError, ValueError):
+            envelope = None
+        if isinstance(envelope, dict) and "Message" in envelope:
+            body = envelope["Message"]
+        messages.append((record.get("messageId", ""), body or "No message found"))
+    return messages
+
+
+def parse_alarm(message: str) -> Optional[Dict[str, Any]]:
     """
-    body = {"text": message}
-    encoded_body = json.dumps(body).encode("utf-8")
+    Parse a CloudWatch alarm notification, or return None for other messages.
 
+    :param message: The SNS message body.
+    :type message: str
+    :rtype: dict or None
+    """
     try:
-        resp = http.request(
-            "POST",
-            webhook_url,
-            body=encoded_body,
-            headers={"Content-Type": "application/json"}
-        )
-    except HTTPError as exc:
-        logger.error("HTTP error occurred when posting to Teams: %s", exc)
-        raise
+        alarm = json.loads(message)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(alarm, dict) or "AlarmName" not in alarm:
+        return None
+    return alarm
+
+
+def coalesce(messages: List[str]) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], Dict[str, int]]:
+    """
+    Deduplicate alarm notifications by alarm name and new state.
+
+    The latest transition (by ``StateChangeTime``) wins for each key and the
+    number of notifications folded into it is kept as ``count``. Messages that
+    are not CloudWatch alarms are deduplicated by their text.
+
+    :param messages: Raw SNS message bodies.
+    :type messages: list
+    :return: The coalesced alarms and a text-to-count map of other messages.
+    :rtype: tuple
+    """
+    alarms: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    others: Dict[str, int] = {}
+
+    for message in messages:
+        alarm = parse_alarm(message)
+        if alarm is None:
+            others[message] = others.get(message, 0) + 1
+            continue
+
+        key = (alarm.get("AlarmName", ""), alarm.get("NewStateValue", ""))
+        seen = alarms.get(key)
+        if seen is None:
+            alarms[key] = {**alarm, "count": 1}
+            continue
+        seen["count"] += 1
+        if alarm.get("StateChangeTime", "") >= seen.get("StateChangeTime", ""):
+            alarms[key] = {**alarm, "count": seen["count"]}
 
-    logger.info("Teams responded with status %s", resp.status)
-    if not 200 <= resp.status < 300:
-        logger.error("Error posting to Teams: %s, %s", resp.status, resp.data)
-        raise Exception(f"Failed to post message to Teams: {resp.status}")
+    return alarms, others
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = str(text)
+    return text if len(text) <= limit else text[: max(0, limit - 3)] + "..."
+
+
+def _encoded_size(card: Dict[str, Any]) -> int:
+    return len(json.dumps(card).encode("utf-8"))
+
+
+def build_digest_card(
+    alarms: Dict[Tuple[str, str], Dict[str, Any]],
+    others: Dict[str, int],
+    total: int,
+    max_bytes: int = DIGEST_MAX_BYTES,
+) -> Dict[str, Any]:
+    """
+    Build a single MessageCard summarising every alarm in the window.
+
+    Each section lists at most ``DIGEST_MAX_FACTS`` entries, and names and
+    reasons are clipped to ``DIGEST_MAX_TEXT`` characters. If the encoded
+    card is still over ``max_bytes``, entries are dropped from the end of the
+    last sections first. Each section then ends with an "N more" line, so
+    the card always fits one Teams request.
+
+    :param alarms: Coalesced alarms keyed by (name, state).
+    :type alarms: dict
+    :param others: Non-alarm messages with their counts.
+    :type others: dict
+    :param total: Number of raw notifications folded into the card.
+    :type total: int
+    :param max_bytes: Upper bound for the UTF-8 JSON encoding of the card.
+    :type max_bytes: int
+    :rtype: dict
+    """
+    by_state: Dict[str, List[Dict[str, Any]]] = {}
+    for alarm in alarms.values():
+        by_state.setdefault(alarm.get("NewStateValue", "UNKNOWN"), []).append(alarm)
+
+    states = [s for s in STATE_ORDER if s in by_state]
+    states += sorted(s for s in by_state if s not in STATE_ORDER)
+
+    # (title, facts, total entries) per section; facts beyond the list are summarised.
+    groups: List[Tuple[str, List[Dict[str, str]], int]] = []
+    for state in states:
+        entries = sorted(by_state[state], key=lambda a: a.get("StateChangeTime", ""), reverse=True)
+        facts = []
+        for alarm in entries[:DIGEST_MAX_FACTS]:
+            suffix = f" (x{alarm['count']})" if alarm["count"] > 1 else ""
+            facts.append({
+                "name": _clip(alarm.get("AlarmName", ""), DIGEST_MAX_TEXT) + suffix,
+                "value": _clip(alarm.get("NewStateReason", "") or alarm.get("StateChangeTime", ""), DIGEST_MAX_TEXT),
+            })
+        groups.append((f"**{state}** ({len(entries)})", facts, len(entries)))
+
+    if others:
+        facts = [
+            {"name": f"x{count}" if count > 1 else "", "value": _clip(text, DIGEST_MAX_TEXT)}
+            for text, count in list(others.items())[:DIGEST_MAX_FACTS]
+        ]
+        groups.append(("**Other notifications**", facts, len(others)))
+
+    color_state = states[0] if states else "INSUFFICIENT_DATA"
+    card: Dict[str, Any] = {
+        "@type": "MessageCard",
+        "@context": "http://schema.org/extensions",
+        "summary": f"{total} CloudWatch notification(s)",
+        "themeColor": STATE_COLORS.get(color_state, "FFB900"),
+        "title": f"CloudWatch alarm digest: {len(alarms) + len(others)} unique of {total}",
+    }
+
+    def render() -> List[Dict[str, Any]]:
+        sections = []
+        for title, facts, count in groups:
+            shown = list(facts)
+            if count > len(facts):
+                shown.append({"name": "...", "value": f"{count - len(facts)} more"})
+            sections.append({"activityTitle": title, "facts": shown})
+        return sections
+
+    card["sections"] = render()
+    while _encoded_size(card) > max_bytes:
+        trimmable = [facts for _, facts, _ in groups if facts]
+        if not trimmable:
+            break
+        trimmable[-1].pop()
+        card["sections"] = render()
+    return card
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -47,11 +194,17 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     AWS Lambda handler that receives SNS notifications about CloudWatch Alarms
     and sends a message to a configured Microsoft Teams webhook.
 
-    :param event: The AWS Lambda event, typically containing SNS messages.
+    With ``DIGEST_MODE`` enabled, every record in the invocation (typically an
+    SQS batch collected over the queue's batching window) is deduplicated by
+    alarm name and state and posted as one digest card. Otherwise each record
+    is posted as its own message, concurrently.
+
+    :param event: The AWS Lambda event, containing SNS or SQS records.
     :type event: dict
     :param context: The AWS Lambda context (unused here).
     :type context: object
-    :return: A dictionary containing the status of message postings.
+    :return: A dictionary containing the status of message postings and, for
+        SQS batches, the ``batchItemFailures`` to redeliver.
     :rtype: dict
     """
     teams_webhook_url = os.getenv("TEAMS_WEBHOOK_URL")
@@ -59,17 +212,38 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.error("TEAMS_WEBHOOK_URL not found in environment variables.")
         raise ValueError("TEAMS_WEBHOOK_URL is required but not set.")
 
+    records = extract_messages(event)
+    sns_messages = [message for _, message in records]
     results = []
+    failed_ids = []
 
-    for record in event.get("Records", []):
-        sns_message = record.get("Sns", {}).get("Message", "No message found")
-        message = f"A CloudWatch Alarm has triggered:\n\n{sns_message}"
-
+    if DIGEST_MODE and len(records) > 1:
+        alarms, others = coalesce(sns_messages)
+        logger.info(
+            "Coalesced %d notification(s) into %d alarm(s) and %d other message(s)",
+            len(records), len(alarms), len(others),
+        )
         try:
-            post_to_teams(teams_webhook_url, message)
-            results.append({"status": "success", "message": sns_message})
-        except Exception as exc:
-            logger.exception("Failed to post SNS message to Teams")
-            results.append({"status": "failed", "error": str(exc), "message": sns_message})
+            post_card(teams_webhook_url, build_digest_card(alarms, others, len(records)))
+            results = [{"status": "success", "message": m} for m in sns_messages]
+        except TeamsPostError as exc:
+            logger.error("Failed to post alarm digest to Teams: %s", exc)
+            results = [{"status": "failed", "error": str(exc), "message": m} for m in sns_messages]
+            failed_ids = [record_id for record_id, _ in records]
+    else:
+        payloads = [
+            {"text": f"A CloudWatch Alarm has triggered:\n\n{sns_message}"}
+            for sns_message in sns_messages
+        ]
+        for (record_id, sns_message), error in zip(records, post_many(teams_webhook_url, payloads)):
+            if error is None:
+                results.append({"status": "success", "message": sns_message})
+            else:
+                logger.error("Failed to post SNS message to Teams: %s", error)
+                results.append({"status": "failed", "error": str(error), "message": sns_message})
+                failed_ids.append(record_id)
 
-    return {"results": results}
+    response: Dict[str, Any] = {"results": results}
+    if records and "Sns" not in event["Records"][0]:
+        response["batchItemFailures"] = [{"itemIdentifier": i} for i in failed_ids if i]
+    return response
@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import urllib3
+from urllib3.exceptions import HTTPError
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CONNECT_TIMEOUT = float(os.getenv("TEAMS_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("TEAMS_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("TEAMS_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("TEAMS_BACKOFF_FACTOR", "0.5"))
+MAX_WORKERS = int(os.getenv("TEAMS_MAX_WORKERS", "8"))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TeamsPostError(Exception):
+    """Raised when a Teams webhook does not accept a message."""
+
+
+def _build_pool() -> urllib3.PoolManager:
+    retries = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=MAX_WORKERS,
+        block=True,
+        retries=retries,
+        timeout=urllib3.Timeout(connect=CONNECT_TIMEOUT, read=READ_TIMEOUT),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+HTTP = _build_pool()
+
+
+def post_card(webhook_url: str, payload: Dict[str, Any]) -> int:
+    """
+    Post a JSON payload (a text message or a MessageCard) to a Teams webhook.
+
+    The request goes through a keep-alive connection pool shared by the whole
+    container. Connection failures and 429/5xx responses are retried with
+    exponential backoff, honouring ``Retry-After``.
+
+    Args:
+        webhook_url (str): The Microsoft Teams incoming-webhook URL.
+        payload (Dict[str, Any]): The JSON body to send.
+
+    Returns:
+        int: The HTTP status returned by Teams.
+
+    Raises:
+        TeamsPostError: If the request fails or Teams does not return 2xx.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    try:
+        resp = HTTP.request("POST", webhook_url, body=body)
+    except HTTPError as exc:
+        logger.error("HTTP error occurred when posting to Teams: %s", exc)
+        raise TeamsPostError(f"Failed to post message to Teams: {exc}") from exc
+
+    logger.info("Teams responded with status %s", resp.status)
+    if not 200 <= resp.status < 300:
+        logger.error("Error posting to Teams: %s, %s", resp.status, resp.data)
+        raise TeamsPostError(f"Failed to post message to Teams: {resp.status}")
+    return resp.status
+
+
+def post_text(webhook_url: str, text: str) -> int:
+    """
+    Post a plain Markdown text message to a Teams webhook.
+
+    Args:
+        webhook_url (str): The Microsoft Teams incoming-webhook URL.
+        text (str): The message content.
+
+    Returns:
+        int: The HTTP status returned by Teams.
+
+    Raises:
+        TeamsPostError: If the request fails or Teams does not return 2xx.
+    """
+    return post_card(webhook_url, {"text": text})
+
+
+def post_many(
+    webhook_url: str,
+    payloads: Sequence[Dict[str, Any]],
+    max_workers: int = MAX_WORKERS,
+) -> List[Optional[Exception]]:
+    """
+    Post several payloads to the same webhook concurrently.
+
+    Args:
+        webhook_url (str): The Microsoft Teams incoming-webhook URL.
+        payloads (Sequence[Dict[str, Any]]): The JSON bodies to send.
+        max_workers (int): Upper bound on in-flight requests.
+
+    Returns:
+        List[Optional[Exception]]: One entry per payload, in input order;
+        None when the post succeeded, otherwise the exception raised.
+    """
+    def _send(payload: Dict[str, Any]) -> Optional[Exception]:
+        try:
+            post_card(webhook_url, payload)
+            return None
+        except TeamsPostError as exc:
+            return exc
+
+    if len(payloads) <= 1 or max_workers <= 1:
+        return [_send(p) for p in payloads]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as pool:
+        return list(pool.map(_send, payloads))
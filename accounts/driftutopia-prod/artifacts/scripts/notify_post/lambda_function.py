@@ -1,9 +1,8 @@
-import json
 import logging
 import os
 from typing import Any, Dict, Optional
 
-import requests
+from teams_client import TeamsPostError, post_text
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -41,7 +40,7 @@ def post_to_teams(message_text: str) -> None:
 
     Raises:
         ValueError: If the Teams webhook URL is not set in the environment.
-        requests.RequestException: If the POST request fails for any reason.
+        TeamsPostError: If Teams does not accept the message after retries.
     """
     teams_webhook_url = os.environ.get("TEAMS_WEBHOOK_URL")
     if not teams_webhook_url:
@@ -50,13 +49,7 @@ def post_to_teams(message_text: str) -> None:
 
     logger.info("Sending the following message to Teams:\n%s", message_text)
 
-    response = requests.post(
-        url=teams_webhook_url,
-        headers={"Content-Type": "application/json"},
-        data=json.dumps({"text": message_text}),
-        timeout=10
-    )
-    response.raise_for_status()
+    post_text(teams_webhook_url, message_text)
     logger.info("Message posted to Microsoft Teams successfully.")
 
 
@@ -103,6 +96,6 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         message_text = build_message_text(post_id, title, link, description)
         post_to_teams(message_text)
         return {"status": "message_posted", "post_id": post_id}
-    except (ValueError, requests.RequestException) as exc:
+    except (ValueError, TeamsPostError) as exc:
         logger.error("Error posting to Teams: %s", exc, exc_info=True)
         return {"error": str(exc)}
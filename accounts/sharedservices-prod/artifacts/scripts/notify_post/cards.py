@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Sequence
+
+MAX_EMBED = 6
+THEME_COLOR = "EC008C"
+
+
+def _download_actions(urls: Sequence[str], start: int = 0, label: str = "Download") -> List[Dict[str, Any]]:
+    """One OpenUri action per URL; labels are numbered only when there is more than one download."""
+    numbered = start > 0 or len(urls) > 1
+    return [
+        {"@type": "OpenUri", "name": f"{label} {start + i + 1}" if numbered else label,
+         "targets": [{"os": "default", "uri": u}]}
+        for i, u in enumerate(urls)
+    ]
+
+
+def _pages(urls: Sequence[str], size: int) -> List[Sequence[str]]:
+    return [urls[i:i + size] for i in range(0, len(urls), size)]
+
+
+def _page_suffix(page: int, total: int) -> str:
+    return f" ({page}/{total})" if total > 1 else ""
+
+
+class CardBuilder:
+    """
+    Build Teams MessageCards for rendered media of one account.
+
+    Teams only embeds a handful of images per card, so asset lists longer
+    than ``max_embed`` are split across several cards; numbering of the
+    download actions continues from one page to the next.
+    """
+
+    def __init__(self, account: str, max_embed: int = MAX_EMBED) -> None:
+        self.account = account
+        self.max_embed = max(1, max_embed)
+
+    def _card(self, summary: str, title: str, **extra: Any) -> Dict[str, Any]:
+        return {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "summary": summary,
+            "themeColor": THEME_COLOR,
+            "title": title,
+            "text": f"**{self.account}**",
+            **extra,
+        }
+
+    def video_cards(self, urls: Sequence[str]) -> List[Dict[str, Any]]:
+        """Return the card(s) offering downloads for rendered videos."""
+        if not urls:
+            return []
+        if len(urls) == 1:
+            return [self._card(
+                f"Your video for {self.account} is ready!",
+                "Your video is ready!",
+                potentialAction=_download_actions(urls, label="Download Video")[:1],
+            )]
+
+        pages = _pages(urls, self.max_embed)
+        cards = []
+        for n, page in enumerate(pages):
+            cards.append(self._card(
+                f"Your videos for {self.account} are ready!",
+                f"Your videos are ready!{_page_suffix(n + 1, len(pages))}",
+                potentialAction=_download_actions(page, start=n * self.max_embed),
+            ))
+        return cards
+
+    def image_cards(self, urls: Sequence[str]) -> List[Dict[str, Any]]:
+        """Return one card per ``max_embed`` images, each embedding its page."""
+        pages = _pages(urls, self.max_embed)
+        cards = []
+        for n, page in enumerate(pages):
+            start = n * self.max_embed
+            cards.append(self._card(
+                f"Carousel assets for {self.account}",
+                f"Your carousel is ready!{_page_suffix(n + 1, len(pages))}",
+                sections=[{
+                    "images": [{"image": u, "title": f"Asset {start + i + 1}"} for i, u in enumerate(page)]
+                }],
+                potentialAction=_download_actions(page, start=start),
+            ))
+        return cards
+
+    def build(self, videos: Sequence[str], images: Sequence[str]) -> List[Dict[str, Any]]:
+        """Return every card for a delivery: videos first, then image pages."""
+        return self.video_cards(videos) + self.image_cards(images)
@@ -2,11 +2,16 @@ import json
 import logging
 import os
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
 
 import boto3
-import requests
-from botocore.exceptions import ClientError
+from botocore.auth import S3SigV4QueryAuth
+from botocore.awsrequest import AWSRequest
+from botocore.exceptions import NoCredentialsError
+
+from cards import CardBuilder
+from teams_client import post_card
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -14,52 +19,62 @@ logger.setLevel(logging.INFO)
 TEAMS_WEBHOOKS_JSON = os.environ["TEAMS_WEBHOOKS_JSON"]
 TARGET_BUCKET = os.environ["TARGET_BUCKET"]
 
-s3 = boto3.client("s3")
-
-
-def presign(key: str, exp: int = 7 * 24 * 3600) -> str:
-    params = {"Bucket": TARGET_BUCKET, "Key": key}
-    basename = os.path.basename(key)
-
-    if key.lower().endswith(".mp4"):
-        params["ResponseContentDisposition"] = f'attachment; filename="{basename}"'
-        params["ResponseContentType"] = "video/mp4"
-
-    return s3.generate_presigned_url("get_object", Params=params, ExpiresIn=exp)
-
-
-def build_image_card(urls: List[str], account: str) -> Dict[str, Any]:
-    MAX_EMBED = 6
-    embedded = urls[:MAX_EMBED]
-    return {
-        "@type": "MessageCard",
-        "@context": "http://schema.org/extensions",
-        "summary": f"Carousel assets for {account}",
-        "themeColor": "EC008C",
-        "title": "Your carousel is ready!",
-        "text": f"**{account}**",
-        "sections": [
-            {
-                "images": [{"image": u, "title": f"Asset {i+1}"} for i, u in enumerate(embedded)]
-            }
-        ],
-        "potentialAction": [
-            {"@type": "OpenUri", "name": f"Download {i+1}", "targets": [{"os": "default", "uri": u}]}
-            for i, u in enumerate(urls)
-        ],
-    }
-
-
-def build_video_card(url: str, account: str) -> Dict[str, Any]:
-    return {
-        "@type": "MessageCard",
-        "@context": "http://schema.org/extensions",
-        "summary": f"Your video for {account} is ready!",
-        "themeColor": "EC008C",
-        "title": "Your video is ready!",
-        "text": f"**{account}**",
-        "potentialAction": [{"@type": "OpenUri", "name": "Download Video", "targets": [{"os": "default", "uri": url}]}],
-    }
+session = boto3.session.Session()
+s3 = session.client("s3")
+
+VIDEO_EXTS = (".mp4",)
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+PRESIGN_TTL = 7 * 24 * 3600
+
+
+class Presigner:
+    """
+    Presign GET URLs for many keys with one signer and frozen credentials.
+
+    ``generate_presigned_url`` runs the full client request pipeline
+    (parameter validation, endpoint resolution, event hooks) for every key;
+    signing the query string directly produces the same URLs without it.
+    """
+
+    def __init__(self, bucket: str, exp: int = PRESIGN_TTL) -> None:
+        credentials = session.get_credentials()
+        if credentials is None:
+            raise NoCredentialsError()
+        self._base = f"https://{bucket}.s3.amazonaws.com/"
+        self._signer = S3SigV4QueryAuth(
+            credentials.get_frozen_credentials(), "s3", s3.meta.region_name, expires=exp
+        )
+
+    def presign(self, key: str) -> str:
+        params = {}
+        if key.lower().endswith(VIDEO_EXTS):
+            params["response-content-disposition"] = f'attachment; filename="{os.path.basename(key)}"'
+            params["response-content-type"] = "video/mp4"
+
+        request = AWSRequest(method="GET", url=self._base + quote(key, safe="/~"), params=params)
+        self._signer.add_auth(request)
+        return request.url
+
+    def presign_media(self, keys: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Presign *keys* in one pass, partitioning the URLs as it goes.
+
+        Returns:
+            (videos, images) in key order; keys with other extensions are
+            skipped.
+        """
+        videos: List[str] = []
+        images: List[str] = []
+        for k in keys:
+            lower = k.lower()
+            if lower.endswith(VIDEO_EXTS):
+                target = videos
+            elif lower.endswith(IMAGE_EXTS):
+                target = images
+            else:
+                continue
+            target.append(self.presign(k))
+        return videos, images
 
 
 def flatten_keys(evt: Dict[str, Any]) -> List[str]:
@@ -131,49 +146,16 @@ def lambda_handler(event: Dict[str, Any], _ctx: Any) -> Dict[str, Any]:
         return {"error": "no images or video"}
     logger.info("Selected media keys (per-slide, mp4 preferred): %s", keys)
 
-    urls: List[str] = []
-    for k in keys:
-        try:
-            urls.append(presign(k))
-        except ClientError as exc:
-            logger.warning("Presign failed for %s: %s", k, exc)
-
-    videos = [u for k, u in zip(keys, urls) if k.lower().endswith(".mp4")]
-    images = [u for k, u in zip(keys, urls) if k.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))]
-
-    posted = 0
-
-    if videos:
-        if len(videos) == 1:
-            card = build_video_card(videos[0], account)
-        else:
-            card = {
-                "@type": "MessageCard",
-                "@context": "http://schema.org/extensions",
-                "summary": f"Your videos for {account} are ready!",
-                "themeColor": "EC008C",
-                "title": "Your videos are ready!",
-                "text": f"**{account}**",
-                "potentialAction": [
-                    {"@type": "OpenUri", "name": f"Download {i+1}",
-                     "targets": [{"os": "default", "uri": u}]}
-                    for i, u in enumerate(videos)
-                ],
-            }
-        resp = requests.post(webhook_url, headers={"Content-Type": "application/json"},
-                             data=json.dumps(card), timeout=20)
-        resp.raise_for_status()
-        posted += len(videos)
-
-    if images:
-        MAX_PER_CARD = 6
-        for i in range(0, len(images), MAX_PER_CARD):
-            batch = images[i:i+MAX_PER_CARD]
-            card = build_image_card(batch, account)
-            resp = requests.post(webhook_url, headers={"Content-Type": "application/json"},
-                                 data=json.dumps(card), timeout=20)
-            resp.raise_for_status()
-            posted += len(batch)
-
-    logger.info("Posted %d item(s) to Teams for %s", posted, account)
-    return {"status": "posted", "itemCount": posted}
\ No newline at end of file
+    try:
+        videos, images = Presigner(TARGET_BUCKET).presign_media(keys)
+    except NoCredentialsError as exc:
+        logger.error("Presign failed: %s", exc)
+        return {"error": "presign failed"}
+
+    cards = CardBuilder(account).build(videos, images)
+    for card in cards:
+        post_card(webhook_url, card)
+
+    posted = len(videos) + len(images)
+    logger.info("Posted %d item(s) in %d card(s) to Teams for %s", posted, len(cards), account)
+    return {"status": "posted", "itemCount": posted}
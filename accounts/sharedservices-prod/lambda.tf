@@ -112,7 +112,6 @@ resource "aws_lambda_function" "notify_post" {
   }
 
   layers = [
-    "arn:aws:lambda:us-east-2:825765422855:layer:Python_Requests:1",
     "arn:aws:lambda:us-east-2:580247275435:layer:LambdaInsightsExtension:14"
   ]
 
@@ -136,7 +135,7 @@ resource "aws_lambda_function" "sns_to_teams" {
   role             = aws_iam_role.lambda_role.arn
   filename         = "${path.module}/artifacts/scripts/sns_to_teams/sns_to_teams.zip"
   source_code_hash = filebase64sha256("${path.module}/artifacts/scripts/sns_to_teams/sns_to_teams.zip")
-  timeout          = 10
+  timeout          = 30
 
   environment {
     variables = {
@@ -153,6 +152,18 @@ resource "aws_lambda_function" "sns_to_teams" {
   }
 }
 
+resource "aws_lambda_event_source_mapping" "sns_to_teams_digest" {
+  event_source_arn                   = aws_sqs_queue.alarm_digest_queue.arn
+  function_name                      = aws_lambda_function.sns_to_teams.arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 60
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  scaling_config {
+    maximum_concurrency = 2
+  }
+}
+
 #############################
 # ig_webhook_handler
 #############################
@@ -6,8 +6,8 @@ resource "aws_sns_topic" "monitoring_topic" {
   name = "${var.project_name}-monitoring-topic"
 }
 
-resource "aws_sns_topic_subscription" "sns_lambda_subscription" {
+resource "aws_sns_topic_subscription" "sns_digest_queue_subscription" {
   topic_arn = aws_sns_topic.monitoring_topic.arn
-  protocol  = "lambda"
-  endpoint  = aws_lambda_function.sns_to_teams.arn
+  protocol  = "sqs"
+  endpoint  = aws_sqs_queue.alarm_digest_queue.arn
 }
@@ -4,4 +4,45 @@
 
 resource "aws_sqs_queue" "lambda_dlq" {
   name = "${var.project_name}-lambda-dlq"
-}
\ No newline at end of file
+}
+
+resource "aws_sqs_queue" "alarm_digest_dlq" {
+  name                      = "${var.project_name}-alarm-digest-dlq"
+  message_retention_seconds = 1209600
+}
+
+resource "aws_sqs_queue" "alarm_digest_queue" {
+  name                       = "${var.project_name}-alarm-digest-queue"
+  visibility_timeout_seconds = 180
+  message_retention_seconds  = 86400
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.alarm_digest_dlq.arn
+    maxReceiveCount     = 5
+  })
+}
+
+data "aws_iam_policy_document" "alarm_digest_queue_policy_document" {
+  statement {
+    sid       = "AllowMonitoringTopicToSendMessage"
+    effect    = "Allow"
+    actions   = ["sqs:SendMessage"]
+    resources = [aws_sqs_queue.alarm_digest_queue.arn]
+
+    principals {
+      type        = "Service"
+      identifiers = ["sns.amazonaws.com"]
+    }
+
+    condition {
+      test     = "ArnEquals"
+      variable = "aws:SourceArn"
+      values   = [aws_sns_topic.monitoring_topic.arn]
+    }
+  }
+}
+
+resource "aws_sqs_queue_policy" "alarm_digest_queue_policy" {
+  queue_url = aws_sqs_queue.alarm_digest_queue.id
+  policy    = data.aws_iam_policy_document.alarm_digest_queue_policy_document.json
+}
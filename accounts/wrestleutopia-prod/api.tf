@@ -14,7 +14,7 @@ resource "aws_apigatewayv2_api" "http" {
     allow_origins     = var.allowed_origins
     allow_methods     = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
     allow_headers     = ["Authorization", "Content-Type", "Content-MD5", "content-md5"]
-    expose_headers    = ["content-type", "etag"]
+    expose_headers    = ["content-type", "etag", "x-next-token", "content-disposition"]
     max_age           = 3000
     allow_credentials = false
   }
@@ -137,6 +137,22 @@ resource "aws_apigatewayv2_route" "post_apps" {
   authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
 }
 
+resource "aws_apigatewayv2_route" "post_apps_status" {
+  api_id             = aws_apigatewayv2_api.http.id
+  route_key          = "POST /applications/status"
+  target             = "integrations/${aws_apigatewayv2_integration.api_lambda.id}"
+  authorization_type = "JWT"
+  authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
+}
+
+resource "aws_apigatewayv2_route" "get_apps_export" {
+  api_id             = aws_apigatewayv2_api.http.id
+  route_key          = "GET /applications/export"
+  target             = "integrations/${aws_apigatewayv2_integration.api_lambda.id}"
+  authorization_type = "JWT"
+  authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
+}
+
 resource "aws_apigatewayv2_route" "presign" {
   api_id             = aws_apigatewayv2_api.http.id
   route_key          = "GET /s3/presign"
@@ -378,6 +394,18 @@ resource "aws_apigatewayv2_stage" "prod" {
     throttling_rate_limit  = 5
   }
 
+  route_settings {
+    route_key              = "POST /applications/status"
+    throttling_burst_limit = 2
+    throttling_rate_limit  = 1
+  }
+
+  route_settings {
+    route_key              = "GET /applications/export"
+    throttling_burst_limit = 2
+    throttling_rate_limit  = 1
+  }
+
   route_settings {
     route_key              = "GET /tryouts/mine"
     throttling_burst_limit = 5
@@ -0,0 +1,67 @@
+"""
+Async execution mode for route handlers.
+
+boto3 blocks, so the async facade runs each DynamoDB call on a worker
+thread and lets a handler ``await asyncio.gather(...)`` the calls that
+don't depend on each other; a request with several independent reads then
+takes about as long as its slowest one. ``asyncio.to_thread`` copies the
+caller's context, so the request's dataloader and metrics follow each call
+(a Loader is not thread-safe: don't use it from two calls in the same
+gather).
+
+A route handler may be ``async def``; the router runs it on this
+container's event loop. API_ASYNC=1 registers the async variants of the
+multi-read handlers; otherwise every route stays synchronous.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Final, Optional, TypeVar
+
+T = TypeVar("T")
+
+ASYNC_WORKERS: Final[int] = int(os.environ.get("DDB_ASYNC_WORKERS", "8"))
+_TABLE_METHODS: Final = frozenset({"get_item", "put_item", "update_item", "delete_item", "query", "scan"})
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        _loop.set_default_executor(ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="ddb-async"))
+    return _loop
+
+
+def run(aw: Awaitable[T]) -> T:
+    """Run a handler coroutine to completion on the container's event loop."""
+    return _get_loop().run_until_complete(aw)
+
+
+async def call(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on a worker thread."""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+class AsyncTable:
+    """Awaitable view of a boto3 Table: the same data methods, each run on a worker thread."""
+
+    def __init__(self, table: Any) -> None:
+        self._table = table
+
+    @property
+    def name(self) -> str:
+        return self._table.name
+
+    def __getattr__(self, attr: str) -> Callable[..., Awaitable[Any]]:
+        if attr not in _TABLE_METHODS:
+            raise AttributeError(attr)
+        method = getattr(self._table, attr)
+
+        async def _call(**kwargs: Any) -> Any:
+            return await call(method, **kwargs)
+
+        return _call
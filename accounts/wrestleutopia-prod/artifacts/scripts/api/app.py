@@ -2,27 +2,41 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import re
+import sys
 from time import perf_counter
 
-from boto3.dynamodb.conditions import Key
-from botocore.exceptions import BotoCoreError, ClientError
-from auth import _claims, _is_promoter, _is_wrestler
+_INIT_T0 = perf_counter()
+
+import metrics
+from auth import _is_promoter, _is_wrestler
 from config import get_config
-from db.tables import T_WREST
-from http_utils import _now_iso, _path, _qs, _resp
-from routes import applications as r_apps
-from routes.tryouts import _get_tryouts, _get_open_tryouts_by_owner
-from routes import promoters as r_promoters
-from routes import tryouts as r_tryouts
-from routes import wrestlers as r_wrestlers
+from db.budget import DeadlineExceeded, set_context
+from db.cache import cache_stats
+from db.loader import request_scope
+from http_utils import _now_iso, _path, _resp
+from router import Handler, LazyModule, Request, Router
 
 cfg = get_config()
 LOGGER = logging.getLogger("wrestleutopia.app")
 
+# Route modules (and through them boto3 and the DynamoDB tables) load on the
+# first request that needs them, so /health, preflight and auth rejections
+# never pay for them.
+r_apps = LazyModule("routes.applications")
+r_promoters = LazyModule("routes.promoters")
+r_tryouts = LazyModule("routes.tryouts")
+r_wrestlers = LazyModule("routes.wrestlers")
+
 SAFE_PATH_RE = re.compile(r"^[A-Za-z0-9/_\-.]+$")
 MAX_BODY_BYTES = 1_000_000
-ALLOW_PUBLIC = set()
+ALLOWED_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+ALL_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+# Register the async variants of multi-read handlers (see aio.py).
+API_ASYNC = os.environ.get("API_ASYNC", "0") == "1"
+
+_cold = True
 
 
 def _normalize_method(event: dict) -> str:
@@ -36,13 +50,6 @@ def _normalize_method(event: dict) -> str:
     )
 
 
-def _require_member(groups: set[str]):
-    """Allow either Wrestler or Promoter."""
-    if not (_is_wrestler(groups) or _is_promoter(groups)):
-        return _resp(403, {"message": "Wrestler or promoter role required"})
-    return None
-
-
 def _request_ids(event: dict) -> dict:
     """Extract request/trace identifiers for correlation in logs and responses."""
     rc = event.get("requestContext", {}) or {}
@@ -64,286 +71,212 @@ def _bad_path(path: str) -> bool:
     return (not path) or (not SAFE_PATH_RE.match(path))
 
 
-def _require_promoter(groups: set[str]):
-    """Enforce Promoter role; return an HTTP response if unauthorized."""
-    if not _is_promoter(groups):
-        return _resp(403, {"message": "Promoter role required"})
-    return None
-
-
-def _require_wrestler(groups: set[str]):
-    """Enforce Wrestler role; return an HTTP response if unauthorized."""
-    if not _is_wrestler(groups):
-        return _resp(403, {"message": "Wrestler role required"})
-    return None
-
-
-def _uuid_from_tail(path: str) -> str | None:
-    """Extract a UUID from a /tryouts/{uuid} path using the strict regex."""
-    if cfg.uuid_path.fullmatch(path):
-        return path.rsplit("/", 1)[1]
-    return None
-
-
-def _access_log(method: str, path: str, status: int, t_start: float, ids: dict) -> None:
-    """Emit a single-line access log with latency and correlation IDs."""
+def _access_log(
+    method: str,
+    path: str,
+    status: int,
+    t_start: float,
+    ids: dict,
+    cache: tuple[int, int] = (0, 0),
+) -> None:
+    """Emit a single-line access log with latency, cache hits/misses and correlation IDs."""
     try:
-        latency_ms = int((perf_counter() - t_start) * 1000)
         LOGGER.info(
-            "access",
-            extra={
-                "method": method,
-                "path": path,
-                "status": status,
-                "latency_ms": latency_ms,
-                "requestId": ids.get("requestId", ""),
-                "traceId": ids.get("traceId", ""),
-                "env": cfg.environment,
-            },
+            "access method=%s path=%s status=%d latency_ms=%d cache_hits=%d cache_misses=%d "
+            "requestId=%s traceId=%s env=%s",
+            method,
+            path,
+            status,
+            int((perf_counter() - t_start) * 1000),
+            cache[0],
+            cache[1],
+            ids.get("requestId", ""),
+            ids.get("traceId", ""),
+            cfg.environment,
         )
     except Exception:
         pass
 
 
-def lambda_handler(event, _ctx):
-    """Main Lambda entrypoint and lightweight HTTP router."""
+def _cache_delta(before: dict, after: dict) -> dict:
+    """Per-cache hits/misses accumulated between two ``cache_stats()`` snapshots."""
+    return {
+        name: {k: s[k] - before.get(name, {}).get(k, 0) for k in ("hits", "misses")}
+        for name, s in after.items()
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Middleware (outermost first)
+# --------------------------------------------------------------------------- #
+
+def _mw_access_log(req: Request, nxt: Handler) -> dict:
+    """Time the request, emit one access log line and flush its metrics, whatever the outcome."""
+    global _cold
     t0 = perf_counter()
-    ids = _request_ids(event)
-    method = _normalize_method(event)
-    raw_path = _path(event)
+    metrics.start(f"{req.method} {req.route.pattern}" if req.route else "unmatched")
+    before = cache_stats()
+    resp = nxt(req)
+    caches = _cache_delta(before, cache_stats())
+    hits = sum(c["hits"] for c in caches.values())
+    misses = sum(c["misses"] for c in caches.values())
+    _access_log(req.method, req.path, resp["statusCode"], t0, req.ids, (hits, misses))
+    try:
+        metrics.flush(resp["statusCode"], cache=caches, properties={**req.ids, "coldStart": _cold})
+    except Exception as exc:
+        LOGGER.error("metrics_flush_failed err=%s", exc)
+    _cold = False
+    return resp
+
 
+def _mw_errors(req: Request, nxt: Handler) -> dict:
+    """Turn unhandled exceptions into a 500 with correlation IDs."""
     try:
-        if method not in {"GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}:
-            resp = _resp(405, {"message": "Method not allowed", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if _bad_path(raw_path):
-            resp = _resp(400, {"message": "Malformed path", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "OPTIONS":
-            resp = {
-                "statusCode": 204,
-                "headers": {"content-type": "application/json"},
-                "body": "",
-            }
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if _body_too_large(event):
-            resp = _resp(413, {"message": "Payload too large", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        sub, groups = _claims(event)
-        if not sub:
-            resp = _resp(401, {"message": "Unauthorized", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-        
-        if method == "GET" and raw_path == "/tryouts":
-            err = _require_member(groups)
-            resp = err or r_tryouts._get_tryouts(event)
-            resp.setdefault("headers", {}).update({"X-Request-Id": ids["requestId"]})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "GET":
-            if cfg.uuid_path.fullmatch(raw_path):
-                tryout_id = raw_path.rsplit("/", 1)[1]
-                resp = r_tryouts._get_tryout(tryout_id)
-                resp.setdefault("headers", {}).update({"X-Request-Id": ids["requestId"]})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-
-            if raw_path.startswith("/profiles/wrestlers/") and raw_path != "/profiles/wrestlers/me":
-                handle = raw_path.split("/")[-1]
-                resp = r_wrestlers._get_profile_by_handle(handle)
-                resp.setdefault("headers", {}).update({"X-Request-Id": ids["requestId"]})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-
-            if raw_path.startswith("/profiles/promoters/") and raw_path != "/profiles/promoters/me":
-                user_id = raw_path.split("/")[-1]
-                resp = r_promoters._get_promoter_public(user_id)
-                resp.setdefault("headers", {}).update({"X-Request-Id": ids["requestId"]})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-
-            if raw_path.startswith("/promoters/") and raw_path.endswith("/tryouts"):
-                user_id = raw_path.split("/")[2]
-                resp = r_tryouts._get_open_tryouts_by_owner(user_id)
-                resp.setdefault("headers", {}).update({"X-Request-Id": ids["requestId"]})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-
-        sub, groups = _claims(event)
-        if not sub:
-            resp = _resp(401, {"message": "Unauthorized", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if raw_path == "/health":
-            resp = _resp(200, {"ok": True, "time": _now_iso(), **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "GET" and raw_path == "/profiles/wrestlers/me":
-            item = T_WREST.get_item(Key={"userId": sub}).get("Item") or {}
-            item.setdefault("mediaKeys", [])
-            item.setdefault("highlights", [])
-            resp = _resp(200, {**item, **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "PUT" and raw_path == "/profiles/wrestlers/me":
-            err = _require_wrestler(groups)
-            resp = err or r_wrestlers._put_me_profile(sub, groups, event)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if raw_path.startswith("/profiles/wrestlers") and method in {"POST", "PATCH"}:
-            err = _require_wrestler(groups)
-            resp = err or r_wrestlers._upsert_wrestler_profile(sub, groups, event)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "GET" and raw_path == "/profiles/wrestlers":
-            if _is_promoter(groups):
-                resp = r_wrestlers._list_wrestlers(groups, event)
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-            if _is_wrestler(groups):
-                item = T_WREST.get_item(Key={"userId": sub}).get("Item") or {}
-                item.setdefault("mediaKeys", [])
-                item.setdefault("highlights", [])
-                resp = _resp(200, {**item, **ids})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-            resp = _resp(403, {"message": "Wrestler or promoter role required", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "GET" and raw_path == "/profiles/promoters/me":
-            resp = r_promoters._get_promoter_profile(sub)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "GET" and raw_path == "/profiles/promoters":
-            resp = r_promoters._list_promoters(groups, event)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if raw_path.startswith("/profiles/promoters") and method in {"PUT", "POST", "PATCH"}:
-            err = _require_promoter(groups)
-            resp = err or r_promoters._upsert_promoter_profile(sub, groups, event)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "POST" and raw_path == "/tryouts":
-            err = _require_promoter(groups)
-            resp = err or r_tryouts._post_tryout(sub, groups, event)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "GET" and raw_path == "/tryouts/mine":
-            err = _require_promoter(groups)
-            if err:
-                _access_log(method, raw_path, err["statusCode"], t0, ids)
-                return err
-            from db.tables import T_TRY
-            try:
-                result = T_TRY.query(
-                    IndexName="ByOwner",
-                    KeyConditionExpression=Key("ownerId").eq(sub),
-                    ScanIndexForward=False,
-                    Limit=100,
-                )
-                resp = _resp(200, {**ids, "items": result.get("Items", [])})
-            except (ClientError, BotoCoreError) as exc:
-                LOGGER.error("tryouts.mine.query_failed err=%s", exc, extra=ids)
-                resp = _resp(500, {"message": "Server error", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if method == "DELETE" and raw_path.startswith("/tryouts/"):
-            tryout_id = _uuid_from_tail(raw_path)
-            if not tryout_id:
-                resp = _resp(400, {"message": "Invalid tryout id", **ids})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-            resp = r_tryouts._delete_tryout(sub, tryout_id)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-        
-        if method == "POST" and raw_path.startswith("/tryouts/") and raw_path.endswith("/apply"):
-            parts = raw_path.split("/")
-            if len(parts) == 4:
-                tryout_id = parts[2]
-            else:
-                tryout_id = None
-
-            if not tryout_id:
-                resp = _resp(400, {"message": "tryoutId required", **ids})
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-
-            err = _require_wrestler(groups)
-            if err:
-                _access_log(method, raw_path, err["statusCode"], t0, ids)
-                return err
-
-            body = event.get("body")
-            if body and isinstance(body, str):
-                try:
-                    data = json.loads(body)
-                except Exception:
-                    data = {}
-            else:
-                data = {}
-
-            data.setdefault("tryoutId", tryout_id)
-            event = {**event, "body": json.dumps(data)}
-
-            resp = r_apps._post_application(sub, groups, event)
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-
-        if raw_path == "/applications":
-            if method == "POST":
-                err = _require_wrestler(groups)
-                resp = err or r_apps._post_application(sub, groups, event)
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-            if method == "GET":
-                resp = r_apps._get_applications(sub, event)
-                _access_log(method, raw_path, resp["statusCode"], t0, ids)
-                return resp
-            resp = _resp(405, {"message": "Method not allowed", **ids})
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        if cfg.debug_tryouts and method == "GET" and raw_path == "/debug/tryouts":
-            resp = r_tryouts._debug_tryouts()
-            _access_log(method, raw_path, resp["statusCode"], t0, ids)
-            return resp
-
-        resp = _resp(404, {"message": "Route not found", **ids})
-        _access_log(method, raw_path, resp["statusCode"], t0, ids)
+        return nxt(req)
+    except DeadlineExceeded as exc:
+        LOGGER.error("deadline_exceeded requestId=%s err=%s", req.ids.get("requestId", ""), exc)
+        resp = _resp(503, {"message": "Service busy, please retry", **req.ids})
+        resp.setdefault("headers", {})["Retry-After"] = "1"
         return resp
-
     except Exception as exc:
         LOGGER.error(
-            "unhandled",
-            extra={
-                "requestId": ids.get("requestId", ""),
-                "traceId": ids.get("traceId", ""),
-                "err": str(exc),
-            },
+            "unhandled requestId=%s traceId=%s err=%s",
+            req.ids.get("requestId", ""),
+            req.ids.get("traceId", ""),
+            exc,
         )
-        resp = _resp(500, {"message": "Server error", **ids})
-        _access_log(method, raw_path, resp["statusCode"], t0, ids)
-        return resp
+        return _resp(500, {"message": "Server error", **req.ids})
+
+
+def _mw_loader(req: Request, nxt: Handler) -> dict:
+    """Give the request its own dataloader so point reads batch and memoize across helpers."""
+    with request_scope():
+        return nxt(req)
+
+
+def _mw_request_id(req: Request, nxt: Handler) -> dict:
+    """Echo the request id back as an X-Request-Id response header."""
+    resp = nxt(req)
+    if req.ids.get("requestId"):
+        resp.setdefault("headers", {})["X-Request-Id"] = req.ids["requestId"]
+    return resp
+
+
+def _mw_guards(req: Request, nxt: Handler) -> dict:
+    """Reject bad methods, paths and oversized bodies; answer CORS preflight; require auth."""
+    if req.method not in ALLOWED_METHODS:
+        return _resp(405, {"message": "Method not allowed", **req.ids})
+    if _bad_path(req.path):
+        return _resp(400, {"message": "Malformed path", **req.ids})
+    if req.method == "OPTIONS":
+        return {"statusCode": 204, "headers": {"content-type": "application/json"}, "body": ""}
+    if _body_too_large(req.event):
+        return _resp(413, {"message": "Payload too large", **req.ids})
+    if not req.sub:
+        return _resp(401, {"message": "Unauthorized", **req.ids})
+    return nxt(req)
+
+
+router = Router([_mw_access_log, _mw_request_id, _mw_errors, _mw_guards, _mw_loader])
+
+
+# --------------------------------------------------------------------------- #
+# Route handlers
+# --------------------------------------------------------------------------- #
+
+def _own_wrestler_item(req: Request) -> dict:
+    return r_wrestlers._get_own_profile(req.sub, req.ids)
+
+
+def _health(req: Request) -> dict:
+    return _resp(200, {"ok": True, "time": _now_iso(), **req.ids})
+
+
+def _list_wrestlers(req: Request) -> dict:
+    """Promoters get the roster; wrestlers get their own profile."""
+    if _is_promoter(req.groups):
+        return r_wrestlers._list_wrestlers(req.groups, req.event)
+    if _is_wrestler(req.groups):
+        return _own_wrestler_item(req)
+    return _resp(403, {"message": "Wrestler or promoter role required", **req.ids})
+
+
+def _my_tryouts(req: Request) -> dict:
+    return r_tryouts._get_my_tryouts(req.sub, req.ids)
+
+
+def _apply_to_tryout(req: Request) -> dict:
+    """POST /tryouts/{id}/apply: fold the path id into the body and submit."""
+    body = req.event.get("body")
+    if body and isinstance(body, str):
+        try:
+            data = json.loads(body)
+        except Exception:
+            data = {}
+    else:
+        data = {}
+    data.setdefault("tryoutId", req.params["tryout_id"])
+    event = {**req.event, "body": json.dumps(data)}
+    return r_apps._post_application(req.sub, req.groups, event)
+
+
+router.add("GET", "/tryouts", lambda req: r_tryouts._get_tryouts(req.event), role="member")
+router.add("GET", "/tryouts/{tryout_id:uuid}", lambda req: r_tryouts._get_tryout(req.params["tryout_id"]))
+router.add("GET", "/profiles/wrestlers/{handle}", lambda req: r_wrestlers._get_profile_by_handle(req.params["handle"]))
+router.add("GET", "/profiles/promoters/{user_id}", lambda req: r_promoters._get_promoter_public(req.params["user_id"]))
+router.add("GET", "/promoters/{user_id}/tryouts", lambda req: r_tryouts._get_open_tryouts_by_owner(req.params["user_id"]))
+
+router.add(ALL_METHODS, "/health", _health)
+
+router.add("GET", "/profiles/wrestlers/me", _own_wrestler_item)
+router.add("PUT", "/profiles/wrestlers/me", lambda req: r_wrestlers._put_me_profile(req.sub, req.groups, req.event), role="wrestler")
+router.add(("POST", "PATCH"), "/profiles/wrestlers{rest:path}",
+           lambda req: r_wrestlers._upsert_wrestler_profile(req.sub, req.groups, req.event), role="wrestler")
+router.add("GET", "/profiles/wrestlers", _list_wrestlers)
+
+router.add("GET", "/profiles/promoters/me", lambda req: r_promoters._get_promoter_profile(req.sub))
+router.add("GET", "/profiles/promoters", lambda req: r_promoters._list_promoters(req.groups, req.event))
+router.add(("PUT", "POST", "PATCH"), "/profiles/promoters{rest:path}",
+           lambda req: r_promoters._upsert_promoter_profile(req.sub, req.groups, req.event), role="promoter")
+
+router.add("POST", "/tryouts", lambda req: r_tryouts._post_tryout(req.sub, req.groups, req.event), role="promoter")
+router.add("GET", "/tryouts/mine", _my_tryouts, role="promoter")
+router.add("DELETE", "/tryouts/{tryout_id:uuid}", lambda req: r_tryouts._delete_tryout(req.sub, req.params["tryout_id"]))
+router.add("POST", "/tryouts/{tryout_id}/apply", _apply_to_tryout, role="wrestler")
+
+router.add("POST", "/applications", lambda req: r_apps._post_application(req.sub, req.groups, req.event), role="wrestler")
+if API_ASYNC:
+    router.add("GET", "/applications", lambda req: r_apps._get_applications_async(req.sub, req.event))
+else:
+    router.add("GET", "/applications", lambda req: r_apps._get_applications(req.sub, req.event))
+router.add("POST", "/applications/status", lambda req: r_apps._bulk_update_status(req.sub, req.event), role="promoter")
+router.add("GET", "/applications/export", lambda req: r_apps._export_applications(req.sub, req.event), role="promoter")
+
+if cfg.debug_tryouts:
+    router.add("GET", "/debug/tryouts", lambda req: r_tryouts._debug_tryouts())
+
+
+def _log_init_profile() -> None:
+    """INIT_PROFILE=1: log how long module init took and whether boto3 was imported."""
+    LOGGER.warning(
+        "init_profile init_ms=%.1f modules=%d boto3_loaded=%s",
+        (perf_counter() - _INIT_T0) * 1000,
+        len(sys.modules),
+        "boto3" in sys.modules,
+    )
+
+
+if os.environ.get("INIT_PROFILE") == "1":
+    _log_init_profile()
+
+
+def lambda_handler(event, _ctx):
+    """Main Lambda entrypoint; dispatches through the route table in ``router``."""
+    set_context(_ctx)
+    req = Request(
+        event=event,
+        method=_normalize_method(event),
+        path=_path(event),
+        ids=_request_ids(event),
+    )
+    return router.dispatch(req)
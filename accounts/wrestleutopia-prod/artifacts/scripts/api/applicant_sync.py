@@ -0,0 +1,55 @@
+"""
+DynamoDB Streams consumer for the wrestlers table.
+
+Applications carry a copy of the applicant's profile summary (see
+``db.applications.applicant_summary``) so promoter views are a single
+Query. This function keeps those copies in step: when a profile's summary
+fields change, every application by that wrestler is updated. It ships in
+the API bundle and runs as its own function (handler
+``applicant_sync.lambda_handler``) with ReportBatchItemFailures enabled.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional
+
+import config
+from db.applications import applicant_summary, refresh_applicant_summaries
+from http_utils import now_iso
+from log import get_logger
+
+_LOG = get_logger("applicant_sync")
+
+
+def _image(rec: Mapping[str, Any], which: str) -> Optional[Dict[str, Any]]:
+    raw = (rec.get("dynamodb") or {}).get(which)
+    return {k: config._DESERIALIZER.deserialize(v) for k, v in raw.items()} if raw else None
+
+
+def lambda_handler(event: Mapping[str, Any], _ctx: Any) -> Dict[str, List[Dict[str, str]]]:
+    """Refresh application copies for each wrestler whose summary changed in this batch."""
+    first_seq: Dict[str, str] = {}
+    latest: Dict[str, Dict[str, Any]] = {}
+    for rec in event.get("Records") or []:
+        keys = (rec.get("dynamodb") or {}).get("Keys") or {}
+        uid = (keys.get("userId") or {}).get("S")
+        if not uid:
+            continue
+        old, new = _image(rec, "OldImage"), _image(rec, "NewImage")
+        if rec.get("eventName") == "MODIFY" and applicant_summary(old) == applicant_summary(new):
+            continue
+        if new is None:
+            # Deleted profile: clear the copies, outranking the last version seen.
+            new = {"version": int((old or {}).get("version") or 0) + 1}
+        first_seq.setdefault(uid, rec["dynamodb"]["SequenceNumber"])
+        latest[uid] = new
+
+    failures: List[Dict[str, str]] = []
+    now = now_iso()
+    for uid, profile in latest.items():
+        try:
+            updated, skipped = refresh_applicant_summaries(uid, profile, now=now)
+            _LOG.info("applicant_sync user=%s updated=%d skipped=%d", uid, updated, skipped)
+        except Exception as exc:  # noqa: BLE001
+            _LOG.error("applicant_sync_failed user=%s err=%s", uid, exc)
+            failures.append({"itemIdentifier": first_seq[uid]})
+    return {"batchItemFailures": failures}
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Callable, Dict, Final, Mapping
+
+
+def number(raw: str | Decimal) -> int | float:
+    """Convert a DynamoDB number (wire string or Decimal) to int when integral, else float."""
+    if isinstance(raw, str):
+        try:
+            return int(raw)
+        except ValueError:
+            f = float(raw)
+            return int(f) if f.is_integer() else f
+    return int(raw) if raw % 1 == 0 else float(raw)
+
+
+def _decode_list(v: list) -> list:
+    return [decode_value(x) for x in v]
+
+
+def _decode_map(v: Mapping[str, Any]) -> Dict[str, Any]:
+    return decode_item(v)
+
+
+_DECODERS: Final[Dict[str, Callable[[Any], Any]]] = {
+    "S": str,
+    "N": number,
+    "BOOL": bool,
+    "NULL": lambda _v: None,
+    "M": _decode_map,
+    "L": _decode_list,
+    "SS": list,
+    "NS": lambda v: [number(x) for x in v],
+}
+
+
+def decode_value(av: Mapping[str, Any]) -> Any:
+    """Decode one low-level attribute value straight to a JSON-ready Python value."""
+    if len(av) == 1:
+        (tag, v), = av.items()
+        if tag == "S":
+            return v
+        decoder = _DECODERS.get(tag)
+        if decoder is not None:
+            return decoder(v)
+    from config import _DESERIALIZER
+
+    return json_ready(_DESERIALIZER.deserialize(av))
+
+
+def decode_item(item: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Decode a low-level attribute map to JSON-ready values.
+
+    Strings pass through and numbers become int/float without a Decimal
+    round trip; sets become lists. The result is meant for responses, not
+    for writing back through the boto3 resource layer (which rejects floats).
+    """
+    return {k: decode_value(v) for k, v in item.items()}
+
+
+def json_ready(data: Any) -> Any:
+    """Recursively convert Decimal values (as returned by the resource API) to int/float."""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, Decimal):
+        return number(data)
+    if isinstance(data, list):
+        return [json_ready(x) for x in data]
+    if isinstance(data, dict):
+        return {k: json_ready(v) for k, v in data.items()}
+    return data
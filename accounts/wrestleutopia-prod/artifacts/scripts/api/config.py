@@ -5,8 +5,10 @@ import hashlib
 import logging
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Final
-from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+from typing import TYPE_CHECKING, Any, Final, Tuple
+
+if TYPE_CHECKING:
+    from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 
 MAX_BIO_LEN_DEFAULT: Final[int] = 1500
 MAX_BIO_LEN_MIN: Final[int] = 50
@@ -21,6 +23,23 @@ UUID_PATH: Final[re.Pattern[str]] = re.compile(r"^/tryouts/[0-9a-fA-F-]{36}$", r
 HANDLE_RE: Final[re.Pattern[str]] = re.compile(r"[^a-z0-9]+", re.ASCII)
 
 
+@lru_cache(maxsize=1)
+def _type_codecs() -> Tuple[TypeSerializer, TypeDeserializer]:
+    """Build the shared DynamoDB (de)serializers on first use; importing boto3 is costly at INIT."""
+    from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+    return TypeSerializer(), TypeDeserializer()
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``_SERIALIZER``/``_DESERIALIZER`` lazily (PEP 562)."""
+    if name == "_SERIALIZER":
+        return _type_codecs()[0]
+    if name == "_DESERIALIZER":
+        return _type_codecs()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def _env(name: str, *, default: str | None = None) -> str | None:
     """Return trimmed environment variable or default if not set."""
     val = os.environ.get(name)
@@ -104,18 +123,19 @@ class Config:
     table_tryouts: str
     table_apps: str
     table_handles: str
+    table_search: str
     uuid_path: re.Pattern[str]
     handle_re: re.Pattern[str]
 
     @property
     def serializer(self) -> TypeSerializer:
-        """Return a DynamoDB TypeSerializer instance."""
-        return TypeSerializer()
+        """Return the shared DynamoDB TypeSerializer instance."""
+        return _type_codecs()[0]
 
     @property
     def deserializer(self) -> TypeDeserializer:
-        """Return a DynamoDB TypeDeserializer instance."""
-        return TypeDeserializer()
+        """Return the shared DynamoDB TypeDeserializer instance."""
+        return _type_codecs()[1]
 
     @property
     def is_prod(self) -> bool:
@@ -129,7 +149,7 @@ class Config:
             f"env={self.environment}",
             f"region={self.aws_region}",
             f"log={self.log_level}",
-            f"tables={self.table_wrestlers},{self.table_promoters},{self.table_tryouts},{self.table_apps},{self.table_handles}",
+            f"tables={self.table_wrestlers},{self.table_promoters},{self.table_tryouts},{self.table_apps},{self.table_handles},{self.table_search}",
             f"limits={self.max_bio_len},{self.max_gimmicks}",
         ]
         return hashlib.sha256(",".join(parts).encode("utf-8")).hexdigest()[:16]
@@ -157,6 +177,7 @@ def get_config() -> Config:
     tt = _validate_table("TABLE_TRYOUTS")
     ta = _validate_table("TABLE_APPS")
     th = _validate_table("TABLE_HANDLES")
+    ts = _validate_table("TABLE_SEARCH")
 
     config = Config(
         environment=env,
@@ -170,6 +191,7 @@ def get_config() -> Config:
         table_tryouts=tt,
         table_apps=ta,
         table_handles=th,
+        table_search=ts,
         uuid_path=UUID_PATH,
         handle_re=HANDLE_RE,
     )
@@ -0,0 +1,171 @@
+"""
+Compact, signed pagination cursors.
+
+A cursor is ``base64url(version | schema id | packed key values | mac)``.
+The schema id names the table/index and the order of the stored key
+attributes, so a cursor carries only the values. Attributes the route
+already knows (the caller's id, the tryout being listed) are not stored
+at all: they are passed back in as ``implied`` values, which fills them
+into the decoded key and binds the cursor to them through the MAC. A
+cursor minted for one partition, index or caller fails to verify
+anywhere else. A cursor that fails to verify decodes to None, and the
+listing starts from the first page.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Dict, Final, List, Mapping, Optional, Tuple
+
+from log import get_logger
+
+_LOG = get_logger("cursor")
+
+CURSOR_VERSION: Final[int] = 1
+MAC_BYTES: Final[int] = 12
+_NUMBER_FLAG: Final[int] = 1
+
+
+@dataclass(frozen=True)
+class CursorSchema:
+    """Key layout of one paginated read: which attributes are stored and which are implied."""
+    id: int
+    name: str
+    index: Optional[str]
+    stored: Tuple[str, ...]
+    implied: Tuple[str, ...] = ()
+
+
+_SCHEMAS: Dict[int, CursorSchema] = {}
+
+
+def _schema(*args: Any, **kwargs: Any) -> CursorSchema:
+    s = CursorSchema(*args, **kwargs)
+    if s.id in _SCHEMAS or not 0 < s.id < 256:
+        raise ValueError(f"bad or duplicate cursor schema id {s.id}")
+    _SCHEMAS[s.id] = s
+    return s
+
+
+SEARCH: Final = _schema(1, "search", None, ("sk",), ("pk",))
+TRYOUT_FEED: Final = _schema(2, "tryouts", "OpenFeed", ("feedSort",))
+TRYOUTS_BY_OWNER: Final = _schema(3, "tryouts", "ByOwner", ("tryoutId",), ("ownerId",))
+APPS_BY_TRYOUT: Final = _schema(4, "apps", None, ("applicantId",), ("tryoutId",))
+APPS_BY_APPLICANT: Final = _schema(5, "apps", "ByApplicant", ("tryoutId",), ("applicantIdGsi", "applicantId"))
+
+
+@lru_cache(maxsize=1)
+def _keys() -> List[bytes]:
+    """
+    Signing key first, then any previous key still accepted for verification.
+
+    Outside prod a missing CURSOR_SECRET falls back to a key derived from
+    ENVIRONMENT, which anyone can compute; prod refuses to sign with it.
+    Checked here rather than in ``get_config`` because the stream Lambdas
+    that share this package never touch cursors.
+    """
+    secret = (os.environ.get("CURSOR_SECRET") or "").strip()
+    if not secret and (os.environ.get("ENVIRONMENT") or "").strip().lower() == "prod":
+        raise RuntimeError("Missing required environment variable: CURSOR_SECRET")
+    keys = [k.encode("utf-8") for k in (secret, os.environ.get("CURSOR_SECRET_PREVIOUS")) if k]
+    if not keys:
+        _LOG.error("cursor_secret_missing env=%s; cursors are signed with a non-secret fallback key", os.environ.get("ENVIRONMENT"))
+        keys = [hashlib.sha256(b"wrestleutopia-cursor/" + os.environ.get("ENVIRONMENT", "").encode()).digest()]
+    return keys
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b, n = n & 0x7F, n >> 7
+        out.append(b | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+
+def _pack(values: List[Any]) -> bytes:
+    out = bytearray()
+    for v in values:
+        if isinstance(v, bool) or not isinstance(v, (str, int, float, Decimal)):
+            raise TypeError(f"unsupported cursor key value {type(v).__name__}")
+        is_num = not isinstance(v, str)
+        raw = str(v).encode("utf-8")
+        out += _varint(len(raw) << 1 | (_NUMBER_FLAG if is_num else 0)) + raw
+    return bytes(out)
+
+
+def _unpack(buf: bytes, count: int) -> List[Any]:
+    values: List[Any] = []
+    pos = 0
+    for _ in range(count):
+        head, pos = _read_varint(buf, pos)
+        size = head >> 1
+        raw = buf[pos: pos + size].decode("utf-8")
+        if len(raw.encode("utf-8")) != size:
+            raise ValueError("truncated cursor")
+        pos += size
+        values.append(Decimal(raw) if head & _NUMBER_FLAG else raw)
+    if pos != len(buf):
+        raise ValueError("trailing cursor bytes")
+    return values
+
+
+def _mac(key: bytes, header: bytes, body: bytes, implied: List[Any]) -> bytes:
+    msg = header + body + b"\x00" + _pack(implied)
+    return hmac.new(key, msg, hashlib.sha256).digest()[:MAC_BYTES]
+
+
+def encode(schema: CursorSchema, key: Optional[Mapping[str, Any]], **implied: Any) -> Optional[str]:
+    """
+    Return a cursor for ``key`` (a LastEvaluatedKey), or None at the end of the listing.
+
+    ``implied`` must give every attribute in ``schema.implied``; they are
+    not stored but must match ``key`` if it carries them.
+    """
+    if not key:
+        return None
+    bound = [implied[a] for a in schema.implied]
+    for a in schema.implied:
+        if a in key and key[a] != implied[a]:
+            raise ValueError(f"cursor key {a} does not match the implied value")
+    header = bytes((CURSOR_VERSION, schema.id))
+    body = _pack([key[a] for a in schema.stored])
+    token = header + body + _mac(_keys()[0], header, body, bound)
+    return base64.urlsafe_b64encode(token).rstrip(b"=").decode("ascii")
+
+
+def decode(token: Optional[str], schema: CursorSchema, **implied: Any) -> Optional[Dict[str, Any]]:
+    """Return the ExclusiveStartKey for ``token``, or None if it is absent, stale or not ours."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        if len(raw) < 2 + MAC_BYTES or raw[0] != CURSOR_VERSION or raw[1] != schema.id:
+            raise ValueError("version or schema mismatch")
+        header, body, mac = raw[:2], raw[2:-MAC_BYTES], raw[-MAC_BYTES:]
+        bound = [implied[a] for a in schema.implied]
+        if not any(hmac.compare_digest(mac, _mac(k, header, body, bound)) for k in _keys()):
+            raise ValueError("bad signature")
+        values = _unpack(body, len(schema.stored))
+    except (ValueError, TypeError, IndexError, InvalidOperation) as exc:
+        _LOG.info("cursor_rejected schema=%s err=%s", schema.name, exc)
+        return None
+    out = dict(zip(schema.stored, values))
+    out.update({a: implied[a] for a in schema.implied})
+    return out
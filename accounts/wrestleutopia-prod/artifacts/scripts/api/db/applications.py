@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Final, List, Mapping, Optional, Sequence, Tuple
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import BotoCoreError, ClientError
+
+from db.batch import MAX_WORKERS, _backoff
+from db.tables import T_APP, ddb_client
+from log import get_logger
+
+_LOG = get_logger("db.applications")
+
+APPLICATION_STATUSES: Final[frozenset[str]] = frozenset(
+    {"submitted", "reviewing", "shortlisted", "accepted", "rejected"}
+)
+APPLICANT_SUMMARY_FIELDS: Final = ("userId", "handle", "stageName", "name", "city", "region", "photoKey")
+MAX_TRANSACT_ITEMS: Final[int] = 100
+MAX_CHUNK_ATTEMPTS: Final[int] = 3
+
+AppKey = Tuple[str, str]
+StatusUpdate = Tuple[str, str, str]
+
+_RETRYABLE_REASONS: Final = frozenset({"TransactionConflict", "ThrottlingError", "ProvisionedThroughputExceeded"})
+
+
+def _update_entry(update: StatusUpdate, *, actor: str, now: str) -> Dict[str, object]:
+    tryout_id, applicant_id, status = update
+    return {
+        "Update": {
+            "TableName": T_APP.name,
+            "Key": {"tryoutId": {"S": tryout_id}, "applicantId": {"S": applicant_id}},
+            "UpdateExpression": "SET #s = :s, statusUpdatedAt = :now, statusUpdatedBy = :by",
+            "ConditionExpression": "attribute_exists(applicantId)",
+            "ExpressionAttributeNames": {"#s": "status"},
+            "ExpressionAttributeValues": {":s": {"S": status}, ":now": {"S": now}, ":by": {"S": actor}},
+        }
+    }
+
+
+def _write_chunk(chunk: Sequence[StatusUpdate], *, actor: str, now: str) -> Dict[AppKey, Optional[str]]:
+    """
+    Apply one chunk with TransactWriteItems; returns an error code per key (None = written).
+
+    A transaction is all-or-nothing, so when it is cancelled the items that
+    caused it (missing applications) are reported and the rest are
+    resubmitted; conflicts and throttling are retried with backoff.
+    """
+    results: Dict[AppKey, Optional[str]] = {}
+    pending = list(chunk)
+    for attempt in range(MAX_CHUNK_ATTEMPTS):
+        if not pending:
+            break
+        if attempt:
+            time.sleep(_backoff(attempt))
+        try:
+            ddb_client.transact_write_items(
+                TransactItems=[_update_entry(u, actor=actor, now=now) for u in pending],
+            )
+            results.update({(t, a): None for t, a, _ in pending})
+            return results
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+                _LOG.error("bulk_status_chunk_failed count=%d err=%s", len(pending), exc)
+                break
+            reasons = [r.get("Code") or "None" for r in exc.response.get("CancellationReasons") or []]
+            retry: List[StatusUpdate] = []
+            for u, code in zip(pending, reasons):
+                if code == "ConditionalCheckFailed":
+                    results[(u[0], u[1])] = "not_found"
+                elif code == "None" or code in _RETRYABLE_REASONS:
+                    retry.append(u)
+                else:
+                    results[(u[0], u[1])] = code
+            pending = retry
+        except BotoCoreError as exc:
+            _LOG.error("bulk_status_chunk_failed count=%d err=%s", len(pending), exc)
+            break
+    for t, a, _ in pending:
+        results.setdefault((t, a), "failed")
+    return results
+
+
+def set_statuses(updates: Sequence[StatusUpdate], *, actor: str, now: str) -> Dict[AppKey, Optional[str]]:
+    """
+    Set the status of many existing applications; returns an error code per key (None = written).
+
+    Updates go out as 100-item TransactWriteItems chunks in parallel. Each
+    item is a conditional UpdateItem, so a missing application is never
+    created and fields other than the status are left alone (BatchWriteItem
+    could only replace whole items).
+    """
+    chunks = [updates[i: i + MAX_TRANSACT_ITEMS] for i in range(0, len(updates), MAX_TRANSACT_ITEMS)]
+    if not chunks:
+        return {}
+    if len(chunks) == 1:
+        parts = [_write_chunk(chunks[0], actor=actor, now=now)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks))) as pool:
+            parts = list(pool.map(lambda c: _write_chunk(c, actor=actor, now=now), chunks))
+    out: Dict[AppKey, Optional[str]] = {}
+    for part in parts:
+        out.update(part)
+    _LOG.info("bulk_status_done count=%d failed=%d", len(out), sum(1 for v in out.values() if v))
+    return out
+
+
+def applicant_summary(profile: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """The profile fields copied onto an application as ``applicantProfile``."""
+    p = {k: profile[k] for k in APPLICANT_SUMMARY_FIELDS if profile and profile.get(k) is not None}
+    if p:
+        p["stageName"] = p.get("stageName") or p.get("name") or None
+    return p
+
+
+def summary_attrs(profile: Optional[Mapping[str, Any]], *, now: str) -> Dict[str, Any]:
+    """
+    Application attributes holding the applicant summary of ``profile``.
+
+    ``applicantProfileVersion`` is the profile's ``version`` the copy was
+    taken from, so an older copy never overwrites a newer one.
+    """
+    return {
+        "applicantProfile": applicant_summary(profile),
+        "applicantProfileVersion": int((profile or {}).get("version") or 0),
+        "applicantProfileSyncedAt": now,
+    }
+
+
+def _refresh_one(key: Mapping[str, Any], attrs: Mapping[str, Any]) -> bool:
+    try:
+        T_APP.update_item(
+            Key=dict(key),
+            UpdateExpression="SET applicantProfile = :p, applicantProfileVersion = :v, applicantProfileSyncedAt = :now",
+            ConditionExpression=(
+                "attribute_exists(applicantId) AND "
+                "(attribute_not_exists(applicantProfileVersion) OR applicantProfileVersion <= :v)"
+            ),
+            ExpressionAttributeValues={
+                ":p": attrs["applicantProfile"],
+                ":v": attrs["applicantProfileVersion"],
+                ":now": attrs["applicantProfileSyncedAt"],
+            },
+        )
+        return True
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def refresh_applicant_summaries(user_id: str, profile: Optional[Mapping[str, Any]], *, now: str) -> Tuple[int, int]:
+    """
+    Copy ``profile``'s summary onto every application by ``user_id``.
+
+    Applications are found through the ByApplicant index and updated in
+    parallel; copies already at a newer profile version are left alone.
+    Returns (updated, skipped). Errors propagate so the caller can retry.
+    """
+    attrs = summary_attrs(profile, now=now)
+    keys: List[Dict[str, Any]] = []
+    kwargs: Dict[str, Any] = {
+        "IndexName": "ByApplicant",
+        "KeyConditionExpression": Key("applicantIdGsi").eq(user_id),
+        "ProjectionExpression": "tryoutId, applicantId",
+    }
+    while True:
+        r = T_APP.query(**kwargs)
+        keys.extend({"tryoutId": it["tryoutId"], "applicantId": it["applicantId"]} for it in r.get("Items", []))
+        if not r.get("LastEvaluatedKey"):
+            break
+        kwargs["ExclusiveStartKey"] = r["LastEvaluatedKey"]
+    if not keys:
+        return 0, 0
+    if len(keys) == 1:
+        done = [_refresh_one(keys[0], attrs)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(keys))) as pool:
+            done = list(pool.map(lambda k: _refresh_one(k, attrs), keys))
+    updated = sum(done)
+    return updated, len(done) - updated
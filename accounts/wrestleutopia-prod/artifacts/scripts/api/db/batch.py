@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from codec import decode_item
+from db.tables import ddb_client
+from log import get_logger
+
+_LOG = get_logger("db.batch")
+
+MAX_KEYS_PER_BATCH = 100
+MAX_WORKERS = int(os.environ.get("DDB_BATCH_WORKERS", "8"))
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.15
+BACKOFF_CAP = 2.0
+
+AttrMap = Dict[str, Dict[str, Any]]
+
+
+def _backoff(attempt: int) -> float:
+    """Return a jittered exponential backoff delay for an unprocessed-keys retry."""
+    return min(BACKOFF_CAP, BACKOFF_BASE * (2 ** (attempt - 1))) * random.uniform(0.75, 1.25)
+
+
+def batch_get_raw(request_items: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[AttrMap]]:
+    """
+    Run one BatchGetItem (any number of tables, at most 100 keys in total).
+
+    Unprocessed keys are retried with backoff; returns the low-level items
+    found, per table. Keys still unprocessed after the retries are logged
+    and left out.
+    """
+    client = ddb_client
+    pending: Dict[str, Any] = {t: dict(spec) for t, spec in request_items.items()}
+    found: Dict[str, List[AttrMap]] = {t: [] for t in request_items}
+
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(_backoff(attempt))
+        resp = client.batch_get_item(RequestItems=pending)
+        for table_name, items in (resp.get("Responses") or {}).items():
+            found.setdefault(table_name, []).extend(items)
+
+        pending = {t: spec for t, spec in (resp.get("UnprocessedKeys") or {}).items() if spec.get("Keys")}
+        if not pending:
+            return found
+        _LOG.debug("batch_get_unprocessed tables=%s attempt=%d remaining=%d",
+                   ",".join(pending), attempt + 1, sum(len(s["Keys"]) for s in pending.values()))
+
+    _LOG.warning(
+        "unprocessed_keys_exhausted tables=%s returned=%d remaining=%d",
+        ",".join(pending), sum(map(len, found.values())), sum(len(s["Keys"]) for s in pending.values()),
+    )
+    return found
+
+
+def _get_chunk(table_name: str, keys: Sequence[AttrMap], params: Mapping[str, Any]) -> List[AttrMap]:
+    """BatchGet one chunk of at most 100 keys, retrying its unprocessed keys with backoff."""
+    return batch_get_raw({table_name: {"Keys": list(keys), **params}}).get(table_name, [])
+
+
+def batch_get_items(
+    table_name: str,
+    keys: Sequence[AttrMap],
+    *,
+    projection: Optional[str] = None,
+    names: Optional[Mapping[str, str]] = None,
+    consistent_read: bool = False,
+    max_workers: int = MAX_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch items by low-level key in parallel 100-key BatchGetItem chunks.
+
+    Each chunk runs on its own worker and retries its own unprocessed keys.
+    A chunk that fails outright is logged and skipped, so callers get every
+    item that could be read and can retry the missing keys themselves. If
+    every chunk fails, the first error is raised.
+    Items are decoded to JSON-ready values (see ``codec.decode_item``), in
+    no particular order.
+    """
+    if not keys:
+        return []
+
+    params: Dict[str, Any] = {"ConsistentRead": bool(consistent_read)}
+    if projection:
+        params["ProjectionExpression"] = projection
+    if names:
+        params["ExpressionAttributeNames"] = dict(names)
+
+    chunks = [keys[i: i + MAX_KEYS_PER_BATCH] for i in range(0, len(keys), MAX_KEYS_PER_BATCH)]
+
+    errors: List[Exception] = []
+
+    def _run(chunk: Sequence[AttrMap]) -> List[AttrMap]:
+        try:
+            return _get_chunk(table_name, chunk, params)
+        except (ClientError, BotoCoreError) as exc:
+            _LOG.error("batch_get_item_failed table=%s count=%d error=%s", table_name, len(chunk), exc)
+            errors.append(exc)
+            return []
+
+    if len(chunks) == 1 or max_workers <= 1:
+        pages = [_run(c) for c in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            pages = list(pool.map(_run, chunks))
+
+    if len(errors) == len(chunks):
+        raise errors[0]
+
+    return [decode_item(av) for page in pages for av in page]
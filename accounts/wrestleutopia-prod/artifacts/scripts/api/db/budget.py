@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Final, Optional
+
+from log import get_logger
+
+_LOG = get_logger("db.budget")
+
+# Below this much Lambda time left, failed DynamoDB calls are not retried.
+RETRY_RESERVE_MS: Final[int] = int(os.environ.get("DDB_RETRY_RESERVE_MS", "1500"))
+
+
+class DeadlineExceeded(Exception):
+    """A DynamoDB call failed and there is no Lambda time left to retry it."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Read capacity and wall time one request may spend paginating."""
+    read_units: float
+    time_ms: int
+
+
+def _budget(name: str, read_units: float, time_ms: int) -> Budget:
+    prefix = f"BUDGET_{name.upper()}"
+    return Budget(
+        read_units=float(os.environ.get(f"{prefix}_RCU", read_units)),
+        time_ms=int(os.environ.get(f"{prefix}_MS", time_ms)),
+    )
+
+
+ROUTE_BUDGETS: Final[Dict[str, Budget]] = {
+    "list_wrestlers": _budget("list_wrestlers", 25.0, 1500),
+    "list_promoters": _budget("list_promoters", 25.0, 1500),
+    "debug_tryouts": _budget("debug_tryouts", 5.0, 1000),
+    "export_applications": _budget("export_applications", 200.0, 6000),
+}
+
+_remaining: Optional[Callable[[], int]] = None
+
+
+def set_context(ctx: Any) -> None:
+    """Remember the Lambda context of the invocation being served (None outside Lambda)."""
+    global _remaining
+    _remaining = getattr(ctx, "get_remaining_time_in_millis", None)
+
+
+def remaining_ms() -> Optional[int]:
+    """Milliseconds left in this invocation, or None when unknown."""
+    try:
+        return int(_remaining()) if _remaining else None
+    except Exception:
+        return None
+
+
+def for_route(name: str) -> Budget:
+    """Return the route's budget with its time capped to what the invocation has left."""
+    budget = ROUTE_BUDGETS[name]
+    left = remaining_ms()
+    if left is None:
+        return budget
+    return Budget(budget.read_units, max(0, min(budget.time_ms, left - RETRY_RESERVE_MS)))
+
+
+def _needs_retry(attempts: int = 0, response: Any = None, caught_exception: Any = None, **_: Any) -> None:
+    """Abort before botocore retries a failed call when the invocation is about to time out."""
+    failed = caught_exception is not None or (
+        response is not None and (response[1] or {}).get("Error")
+    )
+    if not failed:
+        return
+    left = remaining_ms()
+    if left is not None and left < RETRY_RESERVE_MS:
+        code = ((response or (None, {}))[1] or {}).get("Error", {}).get("Code") or type(caught_exception).__name__
+        _LOG.warning("ddb_retry_short_circuit attempts=%d remaining_ms=%d error=%s", attempts, left, code)
+        raise DeadlineExceeded(code)
+
+
+def install_deadline_guard(client: Any) -> None:
+    """Run :func:`_needs_retry` ahead of the client's own retry handler."""
+    client.meta.events.register_first("needs-retry.dynamodb.*", _needs_retry, unique_id="wu-deadline-guard")
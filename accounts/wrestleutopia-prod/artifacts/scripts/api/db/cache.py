@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Final, Hashable, Optional, Tuple
+
+CACHE_TTL_SECONDS: Final[float] = float(os.environ.get("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES: Final[int] = int(os.environ.get("CACHE_MAX_ENTRIES", "512"))
+TAKEN_HANDLE_TTL_SECONDS: Final[float] = float(os.environ.get("TAKEN_HANDLE_TTL_SECONDS", "600"))
+
+_MISSING: Final = object()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, name: str, *, maxsize: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS) -> None:
+        self.name = name
+        self.maxsize = max(0, maxsize)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a shallow copy of the cached value, or ``default`` on miss/expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy.copy(entry[1])
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a shallow copy of ``value``, evicting the least recently used entry if full."""
+        if not self.maxsize or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, copy.copy(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry (no-op if absent)."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Read through: return the cached value or call ``loader`` and cache a non-None result."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+
+PROFILE_BY_HANDLE: Final = TTLCache("profile_by_handle")
+PROMOTER_PUBLIC: Final = TTLCache("promoter_public")
+TRYOUT: Final = TTLCache("tryout")
+OWNER_OPEN_TRYOUTS: Final = TTLCache("owner_open_tryouts")
+FEED_LAST_MONTH: Final = TTLCache("feed_last_month", maxsize=1)
+TAKEN_HANDLES: Final = TTLCache("taken_handles", maxsize=4 * CACHE_MAX_ENTRIES, ttl=TAKEN_HANDLE_TTL_SECONDS)
+
+_ALL: Final = (PROFILE_BY_HANDLE, PROMOTER_PUBLIC, TRYOUT, OWNER_OPEN_TRYOUTS, FEED_LAST_MONTH, TAKEN_HANDLES)
+
+
+def cache_totals() -> Tuple[int, int]:
+    """Return container-lifetime (hits, misses) summed over every cache."""
+    return sum(c.hits for c in _ALL), sum(c.misses for c in _ALL)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-cache hit/miss/size counters for logs and debugging."""
+    return {c.name: {"hits": c.hits, "misses": c.misses, "size": len(c._data)} for c in _ALL}
+
+
+def invalidate_owner_tryouts(owner_id: Optional[str], tryout_id: Optional[str] = None) -> None:
+    """Drop an owner's open-tryout list and, optionally, one tryout."""
+    if owner_id:
+        OWNER_OPEN_TRYOUTS.invalidate(owner_id)
+    if tryout_id:
+        TRYOUT.invalidate(tryout_id)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import heapq
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Final, Iterator, List, Mapping, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from db.cache import FEED_LAST_MONTH
+from db.tables import T_TRY
+from log import get_logger
+
+_LOG = get_logger("db.feed")
+
+FEED_INDEX: Final[str] = "OpenFeed"
+BY_DATE_INDEX: Final[str] = "OpenByDate"
+FEED_SHARDS: Final[int] = max(1, int(os.environ.get("TRYOUT_FEED_SHARDS", "4")))
+FEED_MONTHS_PER_PAGE: Final[int] = max(1, int(os.environ.get("TRYOUT_FEED_MONTHS_PER_PAGE", "3")))
+
+_DATE_RE: Final[re.Pattern[str]] = re.compile(r"^\d{4}-\d{2}-\d{2}$", re.ASCII)
+_FEED_ATTRS: Final[Tuple[str, ...]] = ("feedBucket", "feedSort")
+
+
+def shard_of(tryout_id: str) -> int:
+    """Stable shard number for a tryout."""
+    return zlib.crc32(tryout_id.encode("utf-8")) % FEED_SHARDS
+
+
+def feed_keys(item: Mapping[str, Any]) -> Dict[str, str]:
+    """
+    Return the OpenFeed GSI attributes for a tryout item.
+
+    Only open, dated tryouts get them, so the index is sparse: closing a
+    tryout means removing these two attributes. The bucket is the month plus
+    a hash shard, which spreads writes for busy months over several
+    partitions; the sort key is unique per tryout.
+    """
+    date = str(item.get("date") or "")
+    tryout_id = str(item.get("tryoutId") or "")
+    if (item.get("status") or "open") != "open" or not tryout_id or not _DATE_RE.match(date):
+        return {}
+    return {
+        "feedBucket": f"{date[:7]}#{shard_of(tryout_id)}",
+        "feedSort": f"{date}#{tryout_id}",
+    }
+
+
+def _months(start: str, count: int) -> Iterator[str]:
+    year, month = int(start[:4]), int(start[5:7])
+    for _ in range(count):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _query_shard(bucket: str, cond: Any, limit: int) -> List[Dict[str, Any]]:
+    r = T_TRY.query(
+        IndexName=FEED_INDEX,
+        KeyConditionExpression=Key("feedBucket").eq(bucket) & cond,
+        ScanIndexForward=True,
+        Limit=limit,
+    )
+    return r.get("Items") or []
+
+
+def _last_open_month() -> Optional[str]:
+    """
+    Month (YYYY-MM) of the latest-dated open tryout, from one Limit=1 read of
+    OpenByDate, cached per container for CACHE_TTL_SECONDS.
+
+    Returns "" when nothing is open and None when the latest date is not
+    YYYY-MM-DD (the walk is then bounded by FEED_MONTHS_PER_PAGE only).
+    """
+    def _load() -> str:
+        r = T_TRY.query(
+            IndexName=BY_DATE_INDEX,
+            KeyConditionExpression=Key("status").eq("open"),
+            ScanIndexForward=False,
+            Limit=1,
+            ProjectionExpression="#d",
+            ExpressionAttributeNames={"#d": "date"},
+        )
+        items = r.get("Items") or []
+        if not items:
+            return ""
+        date = str(items[0].get("date") or "")
+        return date[:7] if _DATE_RE.match(date) else "?"
+
+    month = FEED_LAST_MONTH.get_or_load("open", _load)
+    return None if month == "?" else month
+
+
+def open_feed(
+    limit: int,
+    *,
+    from_date: str,
+    after: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return up to ``limit`` open tryouts dated ``from_date`` or later, in date order.
+
+    Months are read in order, up to the month of the latest open tryout.
+    Within a month every shard is queried in parallel for at most the
+    remaining count and the results are merged on ``feedSort``, so the
+    merged order is exact. One call reads at most FEED_MONTHS_PER_PAGE
+    months, so a sparse feed can return a short page with a resume point.
+
+    ``after`` is the resume point: the ``feedSort`` of the last item already
+    returned, or ``YYYY-MM-00`` (sorts before every tryout of that month)
+    when the previous call stopped at a month boundary. The second value
+    returned is the next resume point, or None once the feed is exhausted.
+    """
+    last_month = _last_open_month()
+    if last_month == "":
+        return [], None
+    start = after or from_date
+    items: List[Dict[str, Any]] = []
+    month = start[:7]
+
+    with ThreadPoolExecutor(max_workers=FEED_SHARDS) as pool:
+        for month in _months(start[:7], FEED_MONTHS_PER_PAGE):
+            if last_month and month > last_month:
+                return [_strip(it) for it in items], None
+            want = limit - len(items)
+            if after and month == after[:7]:
+                cond = Key("feedSort").gt(after)
+            elif month == from_date[:7] and not after:
+                cond = Key("feedSort").gte(from_date)
+            else:
+                cond = Key("feedSort").begins_with(month)
+            buckets = [f"{month}#{s}" for s in range(FEED_SHARDS)]
+            shards = list(pool.map(lambda b: _query_shard(b, cond, want), buckets))
+            merged = heapq.merge(*shards, key=lambda it: it["feedSort"])
+            items.extend(next(merged) for _ in range(min(want, sum(map(len, shards)))))
+            if len(items) >= limit:
+                return [_strip(it) for it in items], items[-1]["feedSort"]
+
+    next_month = list(_months(month, 2))[1]
+    if last_month and next_month > last_month:
+        return [_strip(it) for it in items], None
+    _LOG.debug("open_feed_month_budget start=%s months=%d count=%d", start, FEED_MONTHS_PER_PAGE, len(items))
+    return [_strip(it) for it in items], f"{next_month}-00"
+
+
+def _strip(item: Mapping[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in item.items() if k not in _FEED_ATTRS}
+
+
+def backfill() -> int:
+    """Add OpenFeed attributes to existing open tryouts; returns how many were updated."""
+    n = 0
+    kwargs: Dict[str, Any] = {}
+    while True:
+        r = T_TRY.scan(**kwargs)
+        for item in r.get("Items", []):
+            keys = feed_keys(item)
+            if keys and any(item.get(k) != v for k, v in keys.items()):
+                T_TRY.update_item(
+                    Key={"tryoutId": item["tryoutId"]},
+                    UpdateExpression="SET feedBucket = :b, feedSort = :s",
+                    ConditionExpression="attribute_exists(tryoutId)",
+                    ExpressionAttributeValues={":b": keys["feedBucket"], ":s": keys["feedSort"]},
+                )
+                n += 1
+        if not r.get("LastEvaluatedKey"):
+            break
+        kwargs["ExclusiveStartKey"] = r["LastEvaluatedKey"]
+    _LOG.info("open_feed_backfill updated=%d", n)
+    return n
+
+
+if __name__ == "__main__":
+    print(backfill())
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import random
+import string
+from typing import List, Optional
+
+from botocore.exceptions import ClientError
+
+from db.batch import batch_get_items
+from db.cache import TAKEN_HANDLES
+from db.tables import T_HANDLES, T_WREST, ddb_client
+from db.updates import ConditionFailed, ProfileUpdate
+from log import get_logger
+
+_LOG = get_logger("db.handles")
+
+NUMBERED_CANDIDATES = 50
+RANDOM_CANDIDATES = 8
+MAX_RESERVE_ATTEMPTS = 3
+
+
+class HandleConflict(Exception):
+    """Every candidate handle was taken by the time it was reserved."""
+
+
+def _candidates(base: str, owner: str) -> List[str]:
+    """Handles to try, in preference order: base, base-2..base-50, u-<owner>, u-<owner>-<rnd>."""
+    fallback = f"u-{owner[:8].lower()}"
+    alphabet = string.ascii_lowercase + string.digits
+    out = [base] + [f"{base}-{i}" for i in range(2, NUMBERED_CANDIDATES + 1)] + [fallback]
+    out += [f"{fallback}-{''.join(random.choices(alphabet, k=4))}" for _ in range(RANDOM_CANDIDATES)]
+    return list(dict.fromkeys(out))
+
+
+def pick_handle(base: str, owner: str) -> Optional[str]:
+    """
+    Return the first candidate handle that is free or already owned by ``owner``.
+
+    Candidates known to be taken (cached per container) are skipped; the
+    rest are checked with one BatchGetItem, and newly seen taken handles are
+    cached for later requests. The result is only a hint: reserve it with
+    :func:`reserve_with_profile`.
+    """
+    cands = [h for h in _candidates(base, owner) if not TAKEN_HANDLES.get(h)]
+    if not cands:
+        return None
+    rows = batch_get_items(
+        T_HANDLES.name,
+        [{"handle": {"S": h}} for h in cands],
+        projection="handle, #o",
+        names={"#o": "owner"},
+    )
+    owners = {r["handle"]: r.get("owner") for r in rows}
+    for h, o in owners.items():
+        if o != owner:
+            TAKEN_HANDLES.set(h, True)
+    return next((h for h in cands if owners.get(h, owner) == owner), None)
+
+
+def reserve_with_profile(handle: str, owner: str, update: ProfileUpdate) -> bool:
+    """
+    Reserve ``handle`` for ``owner`` and apply ``update`` to their profile in one transaction.
+
+    Returns False (and caches the handle as taken) if someone else holds the
+    handle. Raises ConditionFailed if the profile gained a handle or moved
+    past the expected version in the meantime.
+    """
+    try:
+        ddb_client.transact_write_items(
+            TransactItems=[
+                {
+                    "Put": {
+                        "TableName": T_HANDLES.name,
+                        "Item": {"handle": {"S": handle}, "owner": {"S": owner}},
+                        "ConditionExpression": "attribute_not_exists(handle) OR #o = :u",
+                        "ExpressionAttributeNames": {"#o": "owner"},
+                        "ExpressionAttributeValues": {":u": {"S": owner}},
+                    }
+                },
+                {
+                    "Update": update.with_sets(handle=handle).low_level(
+                        T_WREST.name, {"userId": owner}, condition="attribute_not_exists(handle)"
+                    )
+                },
+            ]
+        )
+        return True
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+            raise
+        codes = [r.get("Code") for r in exc.response.get("CancellationReasons") or []]
+        if codes[:1] == ["ConditionalCheckFailed"]:
+            TAKEN_HANDLES.set(handle, True)
+            return False
+        if codes[1:2] == ["ConditionalCheckFailed"]:
+            raise ConditionFailed({}) from exc
+        raise
+
+
+def allocate_and_write(base: str, owner: str, update: ProfileUpdate) -> str:
+    """Pick a free handle and write it with ``update``, retrying if a candidate is lost to a race."""
+    for attempt in range(MAX_RESERVE_ATTEMPTS):
+        handle = pick_handle(base, owner)
+        if handle is None:
+            break
+        if reserve_with_profile(handle, owner, update):
+            return handle
+        _LOG.info("handle_reserve_raced handle=%s attempt=%d", handle, attempt + 1)
+    raise HandleConflict(base)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+from typing import Any, Dict, Final, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import config
+from log import get_logger
+
+_LOG = get_logger("db.loader")
+
+MAX_KEYS_PER_BATCH: Final[int] = 100
+MAX_KEYS_PER_TRANSACT: Final[int] = 100
+
+MemoKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+Ref = Tuple[Any, Mapping[str, Any]]
+
+_NOT_FOUND: Final = object()
+
+
+def _memo_key(table_name: str, key: Mapping[str, Any]) -> MemoKey:
+    return table_name, tuple(sorted(key.items()))
+
+
+class Loader:
+    """
+    Request-scoped point-read batcher for DynamoDB.
+
+    ``prime`` queues a key; ``load``/``load_many`` queue theirs and then
+    fetch everything queued so far, across tables, in as few BatchGetItem
+    calls as possible. Identical keys are read once, and every result
+    (including "not found") is memoized for the rest of the request, so a
+    handler and the helpers it calls can all ask for the same item freely.
+    Items come back as the resource layer returns them (``Decimal`` numbers),
+    so ``loader.load(T, key)`` is a drop-in for ``T.get_item(Key=key).get("Item")``.
+
+    Not thread-safe: one Loader belongs to one request.
+    """
+
+    def __init__(self) -> None:
+        self._memo: Dict[MemoKey, Any] = {}
+        self._pending: Dict[str, Dict[MemoKey, Dict[str, Any]]] = {}
+        self.calls = 0
+        self.keys_read = 0
+
+    def prime(self, table: Any, key: Mapping[str, Any]) -> None:
+        """Queue ``key`` for the next fetch unless it is already known."""
+        mk = _memo_key(table.name, key)
+        if mk not in self._memo:
+            self._pending.setdefault(table.name, {})[mk] = dict(key)
+
+    def load(self, table: Any, key: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the item for ``key`` (or None), fetching it with anything else queued."""
+        return self.load_many(table, [key])[0]
+
+    def load_many(self, table: Any, keys: Sequence[Mapping[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Return items (or None) in ``keys`` order; queued keys of other tables ride along."""
+        for key in keys:
+            self.prime(table, key)
+        self.flush()
+        out = []
+        for key in keys:
+            item = self._memo.get(_memo_key(table.name, key), _NOT_FOUND)
+            out.append(None if item is _NOT_FOUND else dict(item))
+        return out
+
+    def put(self, table: Any, key: Mapping[str, Any], item: Optional[Mapping[str, Any]]) -> None:
+        """Record a write made by this request so later loads see it (None = deleted)."""
+        mk = _memo_key(table.name, key)
+        self._memo[mk] = _NOT_FOUND if item is None else dict(item)
+        self._pending.get(table.name, {}).pop(mk, None)
+
+    def forget(self, table: Any, key: Mapping[str, Any]) -> None:
+        """Drop a memoized item so the next load reads it again."""
+        self._memo.pop(_memo_key(table.name, key), None)
+
+    def flush(self) -> None:
+        """Fetch every queued key: 100-key BatchGetItem chunks, mixed across tables, in parallel."""
+        if not self._pending:
+            return
+        from db.batch import MAX_WORKERS, batch_get_raw
+
+        ser = config._SERIALIZER
+        queued = [(t, mk, key) for t, keys in self._pending.items() for mk, key in keys.items()]
+        self._pending = {}
+        chunks = [queued[i: i + MAX_KEYS_PER_BATCH] for i in range(0, len(queued), MAX_KEYS_PER_BATCH)]
+
+        def _run(chunk: List[Tuple[str, MemoKey, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+            request: Dict[str, Dict[str, Any]] = {}
+            for table_name, _, key in chunk:
+                request.setdefault(table_name, {"Keys": []})["Keys"].append(
+                    {k: ser.serialize(v) for k, v in key.items()}
+                )
+            return batch_get_raw(request)
+
+        if len(chunks) == 1:
+            pages = [_run(chunks[0])]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks))) as pool:
+                pages = list(pool.map(_run, chunks))
+        self.calls += len(chunks)
+        self.keys_read += len(queued)
+
+        key_attrs = {t: tuple(key) for t, _, key in queued}
+        for page in pages:
+            for table_name, raw_items in page.items():
+                for raw in raw_items:
+                    item = {k: config._DESERIALIZER.deserialize(v) for k, v in raw.items()}
+                    mk = _memo_key(table_name, {a: item.get(a) for a in key_attrs[table_name]})
+                    self._memo[mk] = item
+        for _, mk, _ in queued:
+            self._memo.setdefault(mk, _NOT_FOUND)
+
+    def snapshot(self, refs: Sequence[Ref]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Read ``(table, key)`` pairs with one TransactGetItems call.
+
+        Use this when the items have to agree with each other (one serializable
+        read, at twice the read capacity of a batch). Results replace whatever
+        was memoized for those keys.
+        """
+        if not refs:
+            return []
+        if len(refs) > MAX_KEYS_PER_TRANSACT:
+            raise ValueError(f"snapshot supports at most {MAX_KEYS_PER_TRANSACT} items")
+        from db.tables import ddb_client
+
+        ser, des = config._SERIALIZER, config._DESERIALIZER
+        resp = ddb_client.transact_get_items(
+            TransactItems=[
+                {"Get": {"TableName": t.name, "Key": {k: ser.serialize(v) for k, v in key.items()}}}
+                for t, key in refs
+            ]
+        )
+        self.calls += 1
+        self.keys_read += len(refs)
+        out: List[Optional[Dict[str, Any]]] = []
+        for (t, key), res in zip(refs, resp.get("Responses") or []):
+            raw = res.get("Item")
+            item = {k: des.deserialize(v) for k, v in raw.items()} if raw else None
+            self.put(t, key, item)
+            out.append(dict(item) if item else None)
+        return out
+
+
+_CURRENT: contextvars.ContextVar[Optional[Loader]] = contextvars.ContextVar("wrestleutopia_loader", default=None)
+
+
+@contextlib.contextmanager
+def request_scope() -> Iterator[Loader]:
+    """Install a fresh Loader for the duration of one request."""
+    loader = Loader()
+    token = _CURRENT.set(loader)
+    try:
+        yield loader
+    finally:
+        _CURRENT.reset(token)
+        if loader.calls:
+            _LOG.debug("loader_request calls=%d keys=%d", loader.calls, loader.keys_read)
+
+
+def current() -> Loader:
+    """Return the request's Loader; outside a request scope, a throwaway one."""
+    return _CURRENT.get() or Loader()
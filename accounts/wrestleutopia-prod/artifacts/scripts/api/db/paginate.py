@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Final, List, Mapping, Optional
+
+from log import get_logger
+
+_LOG = get_logger("db.paginate")
+
+PAGE_MAX_READS: Final[int] = int(os.environ.get("PAGE_MAX_READS", "8"))
+PAGE_TIME_BUDGET_MS: Final[int] = int(os.environ.get("PAGE_TIME_BUDGET_MS", "1500"))
+PAGE_MIN_READ: Final[int] = 25
+
+KeyOf = Callable[[Mapping[str, Any]], Dict[str, Any]]
+
+
+@dataclass
+class Page:
+    """Result of :func:`fill_page`: matches, resume key and what it cost."""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    last_key: Optional[Dict[str, Any]] = None
+    reads: int = 0
+    scanned: int = 0
+    read_units: float = 0.0
+    stopped: str = "end"
+
+
+def fill_page(
+    read: Callable[..., Mapping[str, Any]],
+    params: Mapping[str, Any],
+    *,
+    limit: int,
+    key_of: KeyOf,
+    start_key: Optional[Mapping[str, Any]] = None,
+    max_reads: int = PAGE_MAX_READS,
+    time_budget_ms: int = PAGE_TIME_BUDGET_MS,
+    max_read_units: Optional[float] = None,
+) -> Page:
+    """
+    Call ``read`` (a table's query or scan) until ``limit`` items match.
+
+    DynamoDB applies ``Limit`` before ``FilterExpression``, so one request can
+    return few or no matches. This keeps following ``LastEvaluatedKey`` until
+    the page is full, the data ends, ``max_reads`` requests were made or the
+    time budget is spent. When a request returns more matches than the page
+    needs, the page ends on its last kept item and ``last_key`` is that
+    item's key (via ``key_of``), so the next call resumes mid-page without
+    skipping or repeating anything.
+
+    With ``max_read_units`` each read reports its ConsumedCapacity and the
+    page also stops once that many read units were spent. ``stopped`` is
+    one of 'full', 'end', 'reads', 'time' or 'capacity'; on the last three
+    ``last_key`` is where the next call picks up.
+    """
+    page = Page()
+    deadline = time.monotonic() + time_budget_ms / 1000.0
+    cursor = dict(start_key) if start_key else None
+
+    while True:
+        want = limit - len(page.items)
+        call = {**params, "Limit": max(want, PAGE_MIN_READ) if "FilterExpression" in params else want}
+        if max_read_units is not None:
+            call["ReturnConsumedCapacity"] = "TOTAL"
+        if cursor:
+            call["ExclusiveStartKey"] = cursor
+        resp = read(**call)
+        page.reads += 1
+        page.scanned += int(resp.get("ScannedCount", 0) or 0)
+        page.read_units += float((resp.get("ConsumedCapacity") or {}).get("CapacityUnits") or 0)
+
+        batch = resp.get("Items") or []
+        cursor = resp.get("LastEvaluatedKey")
+        if len(batch) > want:
+            page.items.extend(batch[:want])
+            page.last_key = key_of(page.items[-1])
+            page.stopped = "full"
+            break
+        page.items.extend(batch)
+        page.last_key = cursor
+        if not cursor:
+            break
+        if len(batch) == want:
+            page.stopped = "full"
+            break
+        if page.reads >= max_reads:
+            page.stopped = "reads"
+            break
+        if max_read_units is not None and page.read_units >= max_read_units:
+            page.stopped = "capacity"
+            break
+        if time.monotonic() >= deadline:
+            page.stopped = "time"
+            break
+
+    if page.stopped in ("reads", "time", "capacity"):
+        _LOG.debug("fill_page_budget stopped=%s reads=%d scanned=%d rcu=%.1f matched=%d",
+                   page.stopped, page.reads, page.scanned, page.read_units, len(page.items))
+    return page
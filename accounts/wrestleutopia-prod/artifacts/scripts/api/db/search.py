@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Dict, Final, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from boto3.dynamodb.conditions import Attr, Key
+
+from db.budget import Budget
+from db.paginate import fill_page
+from db.tables import T_PROMO, T_SEARCH, T_WREST
+from log import get_logger
+
+_LOG = get_logger("db.search")
+
+WRESTLER: Final[str] = "wrestler"
+PROMOTER: Final[str] = "promoter"
+
+# Facets in the order they are preferred as the Query partition; the
+# remaining requested facets are applied as filters on the index rows.
+FACET_PRIORITY: Final[Tuple[str, ...]] = ("gimmick", "city", "region", "verified")
+
+# Listing fields copied onto every index row so a listing is answered by the
+# Query alone, without reading the profile tables.
+LIST_FIELDS: Final[Dict[str, Tuple[str, ...]]] = {
+    WRESTLER: (
+        "userId", "handle", "stageName", "name", "city", "region", "country",
+        "photoKey", "gimmicks", "experienceYears",
+    ),
+    PROMOTER: (
+        "userId", "role", "orgName", "city", "region", "country", "website", "bio",
+        "logoKey", "socials", "mediaKeys", "highlights", "createdAt", "updatedAt",
+    ),
+}
+
+_SOURCE: Final[Dict[str, Any]] = {WRESTLER: T_WREST, PROMOTER: T_PROMO}
+_ROW_KEYS: Final[Tuple[str, ...]] = ("pk", "sk")
+_FACET_ATTRS: Final[Tuple[str, ...]] = ("f_city", "f_region", "f_gimmicks", "f_verified")
+_WS_RE: Final[re.Pattern[str]] = re.compile(r"\s+")
+
+
+def normalize(value: Any) -> str:
+    """Fold a facet value for exact matching: NFKC, casefolded, single-spaced."""
+    if value is None:
+        return ""
+    s = unicodedata.normalize("NFKC", str(value)).casefold()
+    return _WS_RE.sub(" ", s).strip()
+
+
+def _facet_values(kind: str, item: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return the normalized facet attributes of a profile (f_city, f_gimmicks, ...)."""
+    out: Dict[str, Any] = {}
+    city, region = normalize(item.get("city")), normalize(item.get("region"))
+    if city:
+        out["f_city"] = city
+    if region:
+        out["f_region"] = region
+    if kind == WRESTLER:
+        gimmicks = item.get("gimmicks") or []
+        if isinstance(gimmicks, str):
+            gimmicks = [gimmicks]
+        folded = sorted({normalize(g) for g in gimmicks if normalize(g)})
+        if folded:
+            out["f_gimmicks"] = folded
+        out["f_verified"] = item.get("verified_school") is True
+    return out
+
+
+def _partitions(kind: str, facets: Mapping[str, Any]) -> Set[str]:
+    """Return every index partition a profile with these facets belongs to."""
+    parts = {f"{kind}#all"}
+    if "f_city" in facets:
+        parts.add(f"{kind}#city#{facets['f_city']}")
+    if "f_region" in facets:
+        parts.add(f"{kind}#region#{facets['f_region']}")
+    for g in facets.get("f_gimmicks", ()):
+        parts.add(f"{kind}#gimmick#{g}")
+    if facets.get("f_verified"):
+        parts.add(f"{kind}#verified#1")
+    return parts
+
+
+def _sort_key(kind: str, item: Mapping[str, Any]) -> str:
+    """Stable per-profile sort key: display name first, userId as tie-breaker."""
+    label = item.get("stageName") if kind == WRESTLER else item.get("orgName")
+    return f"{normalize(label or item.get('name'))}#{item['userId']}"
+
+
+def index_rows(kind: str, item: Optional[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Build the index rows for one profile (empty for a missing profile)."""
+    if not item or not item.get("userId"):
+        return []
+    facets = _facet_values(kind, item)
+    body = {f: item[f] for f in LIST_FIELDS[kind] if item.get(f) is not None}
+    sk = _sort_key(kind, item)
+    return [{"pk": pk, "sk": sk, **body, **facets} for pk in sorted(_partitions(kind, facets))]
+
+
+def sync_profile(kind: str, old: Optional[Mapping[str, Any]], new: Optional[Mapping[str, Any]]) -> None:
+    """
+    Bring a profile's index rows in line with its new image.
+
+    Rows for partitions the profile left are deleted and every current row is
+    rewritten so the copied listing fields stay fresh; nothing is written
+    when the change touches no listed field or facet. Driven by the profile
+    table streams (see ``search_sync``); errors are raised so the stream
+    retries the record.
+    """
+    rows = index_rows(kind, new)
+    if rows == index_rows(kind, old):
+        return
+    keep = {(r["pk"], r["sk"]) for r in rows}
+    stale = [k for k in ((r["pk"], r["sk"]) for r in index_rows(kind, old)) if k not in keep]
+    with T_SEARCH.batch_writer(overwrite_by_pkeys=list(_ROW_KEYS)) as batch:
+        for pk, sk in stale:
+            batch.delete_item(Key={"pk": pk, "sk": sk})
+        for row in rows:
+            batch.put_item(Item=row)
+
+
+def _wanted(facets: Mapping[str, str]) -> Dict[str, str]:
+    return {f: normalize(v) for f, v in facets.items() if normalize(v)}
+
+
+def _partition(kind: str, wanted: Mapping[str, str]) -> Tuple[Optional[str], str]:
+    primary = next((f for f in FACET_PRIORITY if f in wanted), None)
+    if primary is None:
+        return None, f"{kind}#all"
+    if primary == "verified":
+        return primary, f"{kind}#verified#1"
+    return primary, f"{kind}#{primary}#{wanted[primary]}"
+
+
+def partition_key(kind: str, facets: Mapping[str, str]) -> str:
+    """Index partition that :func:`query` reads for these facets (cursors are bound to it)."""
+    return _partition(kind, _wanted(facets))[1]
+
+
+def query(
+    kind: str,
+    facets: Mapping[str, str],
+    *,
+    limit: int,
+    start_key: Optional[Mapping[str, Any]] = None,
+    extra_filter: Any = None,
+    budget: Optional[Budget] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    List profiles of ``kind`` matching every requested facet.
+
+    ``facets`` maps facet names ('gimmick', 'city', 'region', 'verified') to
+    raw values; the highest-priority one picks the partition and the rest
+    become filters. Filtered pages are filled across several reads (see
+    ``db.paginate.fill_page``). A ``start_key`` from another partition (e.g. a cursor
+    minted for different filters) is ignored rather than sent to DynamoDB.
+    A ``budget`` caps the read units and time spent filling the page; when
+    it runs out the page comes back short with a key to resume from.
+    Returns listing items and the LastEvaluatedKey.
+    """
+    wanted = _wanted(facets)
+    primary, pk = _partition(kind, wanted)
+
+    fe = extra_filter
+    for name, value in wanted.items():
+        if name == primary:
+            continue
+        if name == "gimmick":
+            cond = Attr("f_gimmicks").contains(value)
+        elif name == "verified":
+            cond = Attr("f_verified").eq(True)
+        else:
+            cond = Attr(f"f_{name}").eq(value)
+        fe = cond if fe is None else fe & cond
+
+    params: Dict[str, Any] = {"KeyConditionExpression": Key("pk").eq(pk)}
+    if fe is not None:
+        params["FilterExpression"] = fe
+    resume = None
+    if start_key and start_key.get("pk") == pk and start_key.get("sk"):
+        resume = {"pk": pk, "sk": start_key["sk"]}
+
+    limits: Dict[str, Any] = {}
+    if budget is not None:
+        limits = {"max_read_units": budget.read_units, "time_budget_ms": budget.time_ms}
+    page = fill_page(T_SEARCH.query, params, limit=limit, key_of=_row_key, start_key=resume, **limits)
+    return [_strip(row) for row in page.items], page.last_key
+
+
+def _row_key(row: Mapping[str, Any]) -> Dict[str, Any]:
+    return {"pk": row["pk"], "sk": row["sk"]}
+
+
+def _strip(row: Mapping[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in row.items() if k not in _ROW_KEYS and k not in _FACET_ATTRS}
+
+
+def backfill(kinds: Sequence[str] = (WRESTLER, PROMOTER)) -> Dict[str, int]:
+    """
+    Rebuild index rows from the profile tables; returns profiles indexed per kind.
+
+    The stream consumer only sees changes made after it starts, so run this
+    (``python -m db.search``) once the consumer is deployed and before the
+    listing routes are switched to the index.
+    """
+    counts: Dict[str, int] = {}
+    for kind in kinds:
+        n = 0
+        for item in _scan_all(_SOURCE[kind]):
+            sync_profile(kind, None, item)
+            n += 1
+        counts[kind] = n
+        _LOG.info("search_backfill kind=%s profiles=%d", kind, n)
+    return counts
+
+
+def _scan_all(table: Any) -> Iterable[Dict[str, Any]]:
+    kwargs: Dict[str, Any] = {}
+    while True:
+        r = table.scan(**kwargs)
+        yield from r.get("Items", [])
+        if not r.get("LastEvaluatedKey"):
+            return
+        kwargs["ExclusiveStartKey"] = r["LastEvaluatedKey"]
+
+
+if __name__ == "__main__":
+    print(backfill())
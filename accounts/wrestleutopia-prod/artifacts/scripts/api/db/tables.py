@@ -1,32 +1,56 @@
 from __future__ import annotations
 
+import json
 import logging
-from dataclasses import dataclass
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Any, Dict, Final
-
-import boto3
-from botocore.config import Config as BotoConfig
+from typing import Any, Dict, Final, Mapping, Optional, Tuple
 
+import metrics
 from config import get_config
+from db.budget import install_deadline_guard
 
 LOGGER: Final = logging.getLogger("wrestleutopia.db.tables")
 
+SCHEMA_TTL_SECONDS: Final[int] = int(os.environ.get("DDB_SCHEMA_TTL_SECONDS", "3600"))
+SCHEMA_OVERRIDE_ENV: Final[str] = "DDB_KEY_SCHEMA"
+_FALLBACK_TTL_SECONDS: Final[int] = 60
+
 
 @dataclass(frozen=True)
 class Tables:
-    """Immutable DynamoDB resource and table handles."""
+    """Immutable DynamoDB resource, low-level client and table handles."""
     ddb: Any
+    client: Any
     wrestlers: Any
     promoters: Any
     tryouts: Any
     apps: Any
     handles: Any
+    search: Any
+
+
+def _table_names(cfg: Any) -> Dict[str, str]:
+    """Map logical table names to physical names."""
+    return {
+        "wrestlers": cfg.table_wrestlers,
+        "promoters": cfg.table_promoters,
+        "tryouts": cfg.table_tryouts,
+        "apps": cfg.table_apps,
+        "handles": cfg.table_handles,
+        "search": cfg.table_search,
+    }
 
 
 @lru_cache(maxsize=1)
 def get_tables() -> Tables:
-    """Return cached DynamoDB resource and tables."""
+    """Return cached DynamoDB resource and tables (built on first use, not at import)."""
+    import boto3
+    from botocore.config import Config as BotoConfig
+
     cfg = get_config()
     boto_cfg = BotoConfig(
         region_name=cfg.aws_region,
@@ -42,48 +66,199 @@ def get_tables() -> Tables:
     except Exception as exc:  # noqa: BLE001
         LOGGER.error("ddb_resource_init_failed error=%s", exc)
         raise
+    # The resource's own client (ddb.meta.client) converts attribute values
+    # to and from Python types; calls built with {"S": ...} maps use this one.
+    client = boto3.client("dynamodb", config=boto_cfg)
+    for c in (ddb.meta.client, client):
+        metrics.instrument(c)
+        install_deadline_guard(c)
 
     tables = Tables(
         ddb=ddb,
+        client=client,
         wrestlers=ddb.Table(cfg.table_wrestlers),
         promoters=ddb.Table(cfg.table_promoters),
         tryouts=ddb.Table(cfg.table_tryouts),
         apps=ddb.Table(cfg.table_apps),
         handles=ddb.Table(cfg.table_handles),
+        search=ddb.Table(cfg.table_search),
     )
 
     LOGGER.info(
         "dynamodb_tables_ready region=%s tables=%s",
         cfg.aws_region,
-        {
-            "wrestlers": cfg.table_wrestlers,
-            "promoters": cfg.table_promoters,
-            "tryouts": cfg.table_tryouts,
-            "apps": cfg.table_apps,
-            "handles": cfg.table_handles,
-        },
+        _table_names(cfg),
     )
     return tables
 
 
+@dataclass(frozen=True)
+class KeySchema:
+    """Primary key and GSI key attributes of one table."""
+    table: str
+    partition_key: str
+    sort_key: Optional[str] = None
+    indexes: Mapping[str, Tuple[str, Optional[str]]] = field(default_factory=dict)
+    source: str = "default"
+
+    @property
+    def key_attrs(self) -> Tuple[str, ...]:
+        """Return the primary key attribute names, partition key first."""
+        return (self.partition_key, self.sort_key) if self.sort_key else (self.partition_key,)
+
+    def key_of(self, item: Mapping[str, Any]) -> Dict[str, Any]:
+        """Return the primary key of an item (or LastEvaluatedKey-shaped map)."""
+        return {a: item[a] for a in self.key_attrs if a in item}
+
+
+_DEFAULT_SCHEMAS: Final[Dict[str, Tuple[str, Optional[str], Dict[str, Tuple[str, Optional[str]]]]]] = {
+    "wrestlers": ("userId", None, {"ByHandle": ("handle", None)}),
+    "promoters": ("userId", None, {}),
+    "tryouts": ("tryoutId", None, {
+        "ByOwner": ("ownerId", None),
+        "OpenByDate": ("status", "date"),
+        "OpenFeed": ("feedBucket", "feedSort"),
+    }),
+    "apps": ("tryoutId", "applicantId", {"ByApplicant": ("applicantIdGsi", None)}),
+    "handles": ("handle", None, {}),
+    "search": ("pk", "sk", {}),
+}
+
+
+def _keys_from(key_schema: list[dict[str, str]]) -> Tuple[str, Optional[str]]:
+    """Return (partition, sort) attribute names from a DescribeTable KeySchema."""
+    pk = next((k["AttributeName"] for k in key_schema if k["KeyType"] == "HASH"), "")
+    sk = next((k["AttributeName"] for k in key_schema if k["KeyType"] == "RANGE"), None)
+    return pk, sk
+
+
+def _schema_from_description(table: str, desc: Mapping[str, Any]) -> KeySchema:
+    """Build a KeySchema from a DescribeTable response."""
+    t = desc.get("Table", desc)
+    pk, sk = _keys_from(t.get("KeySchema", []))
+    indexes = {
+        gsi["IndexName"]: _keys_from(gsi.get("KeySchema", []))
+        for gsi in t.get("GlobalSecondaryIndexes", []) or []
+    }
+    return KeySchema(table=table, partition_key=pk, sort_key=sk, indexes=indexes, source="describe")
+
+
+def _schema_overrides() -> Dict[str, KeySchema]:
+    """Parse DDB_KEY_SCHEMA, e.g. {"wrestlers": {"pk": "userId", "sk": "role", "indexes": {"ByHandle": ["handle"]}}}."""
+    raw = (os.environ.get(SCHEMA_OVERRIDE_ENV) or "").strip()
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid JSON in {SCHEMA_OVERRIDE_ENV}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise RuntimeError(f"{SCHEMA_OVERRIDE_ENV} must be a JSON object")
+
+    cfg = get_config()
+    names = _table_names(cfg)
+    out: Dict[str, KeySchema] = {}
+    for logical, spec in data.items():
+        if logical not in names or not isinstance(spec, dict) or not spec.get("pk"):
+            raise RuntimeError(f"Invalid {SCHEMA_OVERRIDE_ENV} entry for {logical!r}")
+        indexes = {
+            str(name): (str(keys[0]), str(keys[1]) if len(keys) > 1 and keys[1] else None)
+            for name, keys in (spec.get("indexes") or {}).items()
+            if isinstance(keys, list) and keys
+        }
+        out[logical] = KeySchema(
+            table=names[logical],
+            partition_key=str(spec["pk"]),
+            sort_key=str(spec["sk"]) if spec.get("sk") else None,
+            indexes=indexes,
+            source="env",
+        )
+    return out
+
+
+class SchemaRegistry:
+    """Per-container cache of table key schemas, described once and refreshed on a TTL."""
+
+    def __init__(self, client: Any, names: Mapping[str, str], ttl_seconds: int = SCHEMA_TTL_SECONDS) -> None:
+        self._client = client
+        self._names = dict(names)
+        self._ttl = max(0, ttl_seconds)
+        self._overrides = _schema_overrides()
+        self._cache: Dict[str, Tuple[float, KeySchema]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, logical: str) -> KeySchema:
+        """Return the key schema for a logical table name ('wrestlers', 'apps', ...)."""
+        if logical in self._overrides:
+            return self._overrides[logical]
+        if logical not in self._names:
+            raise KeyError(f"Unknown table: {logical!r}")
+
+        hit = self._cache.get(logical)
+        if hit and time.monotonic() < hit[0]:
+            return hit[1]
+
+        with self._lock:
+            hit = self._cache.get(logical)
+            if hit and time.monotonic() < hit[0]:
+                return hit[1]
+            schema = self._describe(logical)
+            ttl = self._ttl if schema.source == "describe" else min(self._ttl, _FALLBACK_TTL_SECONDS)
+            self._cache[logical] = (time.monotonic() + ttl, schema)
+            return schema
+
+    def prime(self, logical: str, desc: Mapping[str, Any]) -> None:
+        """Store a schema from a DescribeTable response obtained elsewhere."""
+        if logical in self._names and logical not in self._overrides:
+            schema = _schema_from_description(self._names[logical], desc)
+            with self._lock:
+                self._cache[logical] = (time.monotonic() + self._ttl, schema)
+
+    def invalidate(self, logical: Optional[str] = None) -> None:
+        """Drop one (or every) cached schema so the next lookup describes again."""
+        with self._lock:
+            if logical is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(logical, None)
+
+    def _describe(self, logical: str) -> KeySchema:
+        name = self._names[logical]
+        try:
+            schema = _schema_from_description(name, self._client.describe_table(TableName=name))
+            LOGGER.info("table_schema_described logical=%s keys=%s", logical, schema.key_attrs)
+            return schema
+        except Exception as exc:  # noqa: BLE001
+            pk, sk, indexes = _DEFAULT_SCHEMAS[logical]
+            LOGGER.warning("describe_table_failed logical=%s defaulting=%s error=%s", logical, pk, exc)
+            return KeySchema(table=name, partition_key=pk, sort_key=sk, indexes=dict(indexes))
+
+
+@lru_cache(maxsize=1)
+def get_schema_registry() -> SchemaRegistry:
+    """Return the container-wide schema registry."""
+    return SchemaRegistry(get_tables().ddb.meta.client, _table_names(get_config()))
+
+
+def get_key_schema(logical: str) -> KeySchema:
+    """Return the cached key schema for a logical table name."""
+    return get_schema_registry().get(logical)
+
+
 def verify_tables(existence_only: bool = True) -> Dict[str, str]:
     """Return table existence status for health/debug."""
     cfg = get_config()
     tables = get_tables()
     client = tables.ddb.meta.client
 
-    to_check = {
-        "wrestlers": cfg.table_wrestlers,
-        "promoters": cfg.table_promoters,
-        "tryouts": cfg.table_tryouts,
-        "apps": cfg.table_apps,
-        "handles": cfg.table_handles,
-    }
+    to_check = _table_names(cfg)
+    registry = get_schema_registry()
 
     results: Dict[str, str] = {}
     for logical, name in to_check.items():
         try:
             desc = client.describe_table(TableName=name)
+            registry.prime(logical, desc)
             if existence_only:
                 results[logical] = "ok"
             else:
@@ -95,22 +270,42 @@ def verify_tables(existence_only: bool = True) -> Dict[str, str]:
     return results
 
 
-_tables = get_tables()
-ddb = _tables.ddb
-T_WREST = _tables.wrestlers
-T_PROMO = _tables.promoters
-T_TRY = _tables.tryouts
-T_APP = _tables.apps
-T_HANDLES = _tables.handles
+_LAZY_TABLES: Final[Dict[str, str]] = {
+    "ddb": "ddb",
+    "ddb_client": "client",
+    "T_WREST": "wrestlers",
+    "T_PROMO": "promoters",
+    "T_TRY": "tryouts",
+    "T_APP": "apps",
+    "T_HANDLES": "handles",
+    "T_SEARCH": "search",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``ddb``, ``ddb_client`` and the ``T_*`` handles on first access (PEP 562), so importing is free."""
+    attr = _LAZY_TABLES.get(name)
+    if attr is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(get_tables(), attr)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "Tables",
+    "KeySchema",
+    "SchemaRegistry",
     "get_tables",
+    "get_schema_registry",
+    "get_key_schema",
     "verify_tables",
     "ddb",
+    "ddb_client",
     "T_WREST",
     "T_PROMO",
     "T_TRY",
     "T_APP",
     "T_HANDLES",
+    "T_SEARCH",
 ]
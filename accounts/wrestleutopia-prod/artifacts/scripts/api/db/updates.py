@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Final, Iterable, List, Mapping, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from config import _DESERIALIZER, _SERIALIZER
+
+VERSION_ATTR: Final[str] = "version"
+
+
+class ConditionFailed(Exception):
+    """An UpdateItem condition did not hold; ``item`` is the current item (or {})."""
+
+    def __init__(self, item: Mapping[str, Any]) -> None:
+        super().__init__("conditional update failed")
+        self.item = dict(item)
+
+
+@dataclass(frozen=True)
+class ProfileUpdate:
+    """
+    One partial profile write, rendered as a single UpdateItem.
+
+    ``sets`` are written, ``removes`` are deleted, ``defaults`` are only
+    written when absent (``if_not_exists``). Every update stamps updatedAt,
+    sets createdAt once, and bumps ``version``; when ``expected_version`` is
+    given the write only succeeds if the stored version still matches.
+    """
+    sets: Mapping[str, Any]
+    removes: Tuple[str, ...]
+    now: str
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+    expected_version: Optional[int] = None
+
+    def with_sets(self, **values: Any) -> "ProfileUpdate":
+        return replace(self, sets={**self.sets, **values})
+
+    def version_condition(self) -> Optional[str]:
+        if self.expected_version is None:
+            return None
+        if self.expected_version == 0:
+            return "attribute_not_exists(#ver)"
+        return "#ver = :expected"
+
+    def params(self, condition: Optional[str] = None) -> Dict[str, Any]:
+        """UpdateExpression/Condition/names/values (Python values, resource-layer style)."""
+        names: Dict[str, str] = {"#ca": "createdAt", "#ua": "updatedAt", "#ver": VERSION_ATTR}
+        values: Dict[str, Any] = {":now": self.now, ":zero": 0, ":one": 1}
+        sets: List[str] = [
+            "#ca = if_not_exists(#ca, :now)",
+            "#ua = :now",
+            "#ver = if_not_exists(#ver, :zero) + :one",
+        ]
+        for i, (k, v) in enumerate(self.sets.items()):
+            names[f"#s{i}"], values[f":s{i}"] = k, v
+            sets.append(f"#s{i} = :s{i}")
+        for i, (k, v) in enumerate(self.defaults.items()):
+            names[f"#d{i}"], values[f":d{i}"] = k, v
+            sets.append(f"#d{i} = if_not_exists(#d{i}, :d{i})")
+        expr = "SET " + ", ".join(sets)
+        if self.removes:
+            for i, k in enumerate(self.removes):
+                names[f"#r{i}"] = k
+            expr += " REMOVE " + ", ".join(f"#r{i}" for i in range(len(self.removes)))
+
+        conds = [c for c in (condition, self.version_condition()) if c]
+        if self.expected_version:
+            values[":expected"] = self.expected_version
+        out: Dict[str, Any] = {
+            "UpdateExpression": expr,
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+        }
+        if conds:
+            out["ConditionExpression"] = " AND ".join(f"({c})" for c in conds)
+        return out
+
+    def low_level(self, table: str, key: Mapping[str, Any], condition: Optional[str] = None) -> Dict[str, Any]:
+        """The same update as a TransactWriteItems ``Update`` entry."""
+        p = self.params(condition)
+        p["ExpressionAttributeValues"] = {k: _SERIALIZER.serialize(v) for k, v in p["ExpressionAttributeValues"].items()}
+        return {"TableName": table, "Key": {k: _SERIALIZER.serialize(v) for k, v in key.items()}, **p}
+
+    def apply(self, old: Mapping[str, Any], key: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Return the item as it reads after this update was applied to ``old``.
+
+        ``key`` is the item's primary key; pass it so an item created by this
+        update (``old`` is {}) carries its key attributes too.
+        """
+        new = {**(key or {}), **{k: v for k, v in old.items() if k not in self.removes}}
+        for k, v in self.defaults.items():
+            new.setdefault(k, v)
+        new.update(self.sets)
+        new.setdefault("createdAt", self.now)
+        new["updatedAt"] = self.now
+        new[VERSION_ATTR] = int(old.get(VERSION_ATTR) or 0) + 1
+        return new
+
+
+def build_update(
+    changes: Mapping[str, Any],
+    allowed: Iterable[str],
+    *,
+    now: str,
+    defaults: Optional[Mapping[str, Any]] = None,
+    expected_version: Any = None,
+) -> ProfileUpdate:
+    """
+    Diff ``changes`` against the field allowlist.
+
+    Allowed fields present with a value are set; allowed fields present as
+    None (or an empty string) are removed; anything else is ignored.
+    ``expected_version`` is taken as an int when it parses as one.
+    """
+    allowed = set(allowed)
+    sets = {k: v for k, v in changes.items() if k in allowed and v is not None and v != ""}
+    removes = tuple(k for k, v in changes.items() if k in allowed and (v is None or v == ""))
+    try:
+        expected = int(expected_version) if expected_version is not None and str(expected_version) != "" else None
+    except (TypeError, ValueError):
+        expected = None
+    return ProfileUpdate(sets=sets, removes=removes, now=now, defaults=dict(defaults or {}),
+                         expected_version=expected)
+
+
+def update_item(table: Any, key: Mapping[str, Any], upd: ProfileUpdate, *, condition: Optional[str] = None) -> Dict[str, Any]:
+    """Run ``upd`` as one UpdateItem and return the item as it was before (or {})."""
+    try:
+        r = table.update_item(
+            Key=dict(key),
+            ReturnValues="ALL_OLD",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            **upd.params(condition),
+        )
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            raw = exc.response.get("Item") or {}
+            raise ConditionFailed({k: _DESERIALIZER.deserialize(v) for k, v in raw.items()}) from exc
+        raise
+    return r.get("Attributes") or {}
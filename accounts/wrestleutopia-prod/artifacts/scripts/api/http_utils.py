@@ -5,9 +5,16 @@ import json
 import logging
 import os
 from decimal import Decimal
-from typing import Any, Dict, Mapping, MutableMapping, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+from codec import json_ready, number
 from config import get_config
 
+try:
+    import orjson
+except ImportError:  # optional; bundle it in the deployment zip to enable the fast path
+    orjson = None
+
 LOGGER = logging.getLogger("wrestleutopia.http")
 
 
@@ -46,10 +53,39 @@ def _safe_len(buf: Any) -> int:
 def _json_default(o: Any) -> Any:
     """JSON encoder default that converts Decimal to int or float."""
     if isinstance(o, Decimal):
-        return int(o) if o % 1 == 0 else float(o)
+        return number(o)
     raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
 
 
+def _dumps_stdlib(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(payload: Any) -> str:
+        """Serialize with orjson; fall back to stdlib for what orjson refuses (e.g. >64-bit ints)."""
+        try:
+            return orjson.dumps(payload, default=_json_default, option=_ORJSON_OPTS).decode("utf-8")
+        except orjson.JSONEncodeError:
+            return _dumps_stdlib(payload)
+else:
+    dumps: Callable[[Any], str] = _dumps_stdlib
+
+_BASE_HEADERS: Mapping[str, str] = MappingProxyType({
+    "content-type": "application/json; charset=utf-8",
+    "cache-control": "no-store",
+    "x-content-type-options": "nosniff",
+})
+_CORS_HEADERS: Mapping[str, str] = MappingProxyType({
+    **_BASE_HEADERS,
+    "access-control-allow-origin": CORS_ALLOW_ORIGIN,
+    "access-control-allow-headers": CORS_ALLOW_HEADERS,
+    "access-control-allow-methods": CORS_ALLOW_METHODS,
+})
+
+
 def request_method(event: Mapping[str, Any]) -> str:
     """Return the HTTP method from the Lambda proxy event."""
     return (
@@ -112,13 +148,7 @@ def parse_json_body(event: Mapping[str, Any]) -> Dict[str, Any]:
 
 def jsonify(data: Any) -> Any:
     """Recursively convert unsupported JSON types like Decimal."""
-    if isinstance(data, Decimal):
-        return int(data) if data % 1 == 0 else float(data)
-    if isinstance(data, list):
-        return [jsonify(x) for x in data]
-    if isinstance(data, dict):
-        return {k: jsonify(v) for k, v in data.items()}
-    return data
+    return json_ready(data)
 
 
 def json_response(
@@ -128,42 +158,72 @@ def json_response(
     headers: Optional[Mapping[str, str]] = None,
     cors: bool = False,
 ) -> Dict[str, Any]:
-    """Return an API Gateway–compatible JSON response with consistent headers."""
-    base_headers: MutableMapping[str, str] = {
-        "content-type": "application/json; charset=utf-8",
-        "cache-control": "no-store",
-        "x-content-type-options": "nosniff",
-    }
-    if cors and CORS_ALLOW_ORIGIN:
-        base_headers.update(
-            {
-                "access-control-allow-origin": CORS_ALLOW_ORIGIN,
-                "access-control-allow-headers": CORS_ALLOW_HEADERS,
-                "access-control-allow-methods": CORS_ALLOW_METHODS,
-            }
-        )
+    """
+    Return an API Gateway–compatible JSON response with consistent headers.
+
+    The body is serialized in one pass (orjson when installed, else stdlib);
+    Decimals are converted by the ``default`` hook rather than a pre-walk.
+    Headers are copied from frozen templates; extra ``headers`` never
+    override the template keys.
+    """
+    template = _CORS_HEADERS if cors and CORS_ALLOW_ORIGIN else _BASE_HEADERS
+    out_headers = dict(template)
     if headers:
         for k, v in headers.items():
-            if k.lower() not in base_headers:
-                base_headers[k] = v
-    payload = {} if body is None else body
+            if k.lower() not in template:
+                out_headers[k] = v
     try:
-        body_str = json.dumps(
-            jsonify(payload),
-            ensure_ascii=False,
-            separators=(",", ":"),
-            default=_json_default,
-        )
+        body_str = dumps({} if body is None else body)
     except TypeError:
         body_str = json.dumps({"message": "Serialization error"})
     LOGGER.debug("json_response status=%s", status)
     return {
         "statusCode": int(status),
-        "headers": dict(base_headers),
+        "headers": out_headers,
         "body": body_str,
     }
 
 
+def accepts_gzip(event: Mapping[str, Any]) -> bool:
+    """Return True if the client sent ``Accept-Encoding: gzip``."""
+    headers = event.get("headers") or {}
+    value = next((v for k, v in headers.items() if k.lower() == "accept-encoding"), "") or ""
+    return any(part.split(";")[0].strip().lower() == "gzip" for part in value.split(","))
+
+
+def text_response(
+    status: int,
+    body: str,
+    *,
+    content_type: str,
+    headers: Optional[Mapping[str, str]] = None,
+    gzip_body: bool = False,
+) -> Dict[str, Any]:
+    """
+    Return an API Gateway–compatible non-JSON response (CSV, NDJSON, ...).
+
+    With ``gzip_body`` the body is gzipped and returned base64-encoded,
+    which keeps large exports well under the 6 MB Lambda response limit.
+    """
+    out_headers = {**_BASE_HEADERS, "content-type": content_type}
+    if headers:
+        for k, v in headers.items():
+            if k.lower() not in out_headers:
+                out_headers[k] = v
+    if not gzip_body:
+        return {"statusCode": int(status), "headers": out_headers, "body": body}
+    import gzip
+
+    out_headers["content-encoding"] = "gzip"
+    packed = gzip.compress(body.encode("utf-8"), compresslevel=6)
+    return {
+        "statusCode": int(status),
+        "headers": out_headers,
+        "body": base64.b64encode(packed).decode("ascii"),
+        "isBase64Encoded": True,
+    }
+
+
 def _json(event: Dict[str, Any]) -> Dict[str, Any]:
     """Backward compatibility alias for parse_json_body()."""
     return parse_json_body(event)
@@ -0,0 +1,170 @@
+"""
+Per-invocation metrics, flushed once as a CloudWatch Embedded Metric Format line.
+
+The API records route latency, DynamoDB calls and consumed capacity, and
+cache hits for the request being served, then writes one EMF JSON line to
+stdout. CloudWatch turns that line into metrics (percentiles come from the
+Latency samples), and the same line is queryable in Logs Insights. The line
+is written directly, not through ``logging``, so LOG_LEVEL=ERROR in prod
+doesn't drop it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Final, Mapping, Optional
+
+METRICS_ENABLED: Final[bool] = os.environ.get("METRICS_ENABLED", "1") != "0"
+METRICS_NAMESPACE: Final[str] = os.environ.get("METRICS_NAMESPACE", "WrestleUtopia/Api")
+
+# Operations that accept ReturnConsumedCapacity.
+CAPACITY_OPS: Final[frozenset[str]] = frozenset({
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem", "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem", "TransactGetItems", "TransactWriteItems",
+})
+
+
+class Invocation:
+    """Counters for one request; safe to update from worker threads."""
+
+    def __init__(self, route: str) -> None:
+        self.route = route
+        self.started = time.perf_counter()
+        self.ddb_calls: Counter[str] = Counter()
+        self.read_units: Dict[str, float] = defaultdict(float)
+        self.write_units: Dict[str, float] = defaultdict(float)
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_read_units(self) -> float:
+        with self._lock:
+            return sum(self.read_units.values())
+
+    def record_throttle(self) -> None:
+        with self._lock:
+            self.throttles += 1
+
+    def record_call(self, op: str, consumed: Any) -> None:
+        """Count one DynamoDB call and add its ConsumedCapacity (a dict or a list of dicts)."""
+        with self._lock:
+            self.ddb_calls[op] += 1
+            for cc in consumed if isinstance(consumed, list) else [consumed] if consumed else []:
+                table = str(cc.get("TableName") or "?")
+                total = float(cc.get("CapacityUnits") or 0)
+                rcu, wcu = cc.get("ReadCapacityUnits"), cc.get("WriteCapacityUnits")
+                if rcu is None and wcu is None:
+                    # Only the total is reported; attribute it by operation kind.
+                    if op in ("PutItem", "UpdateItem", "DeleteItem", "BatchWriteItem", "TransactWriteItems"):
+                        wcu = total
+                    else:
+                        rcu = total
+                self.read_units[table] += float(rcu or 0)
+                self.write_units[table] += float(wcu or 0)
+
+
+_current: Optional[Invocation] = None
+
+
+def start(route: str) -> Invocation:
+    """Begin collecting for the request now being served."""
+    global _current
+    _current = Invocation(route)
+    return _current
+
+
+def current() -> Optional[Invocation]:
+    return _current
+
+
+def _add_consumed_capacity(params: Dict[str, Any], model: Any, **_: Any) -> None:
+    if model.name in CAPACITY_OPS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+
+def _after_call(parsed: Mapping[str, Any], model: Any, **_: Any) -> None:
+    inv = _current
+    if inv is not None:
+        inv.record_call(model.name, parsed.get("ConsumedCapacity"))
+
+
+def _response_received(parsed_response: Optional[Mapping[str, Any]] = None, **_: Any) -> None:
+    """Runs once per HTTP attempt, so throttled attempts that were retried are counted too."""
+    inv = _current
+    code = ((parsed_response or {}).get("Error") or {}).get("Code", "")
+    if inv is not None and "Throttl" in code:
+        inv.record_throttle()
+
+
+def instrument(client: Any) -> None:
+    """Ask ``client`` for ConsumedCapacity on every data call and record each call."""
+    if not METRICS_ENABLED:
+        return
+    events = client.meta.events
+    events.register("provide-client-params.dynamodb.*", _add_consumed_capacity, unique_id="wu-metrics-rcc")
+    events.register("after-call.dynamodb.*", _after_call, unique_id="wu-metrics-after")
+    events.register("response-received.dynamodb.*", _response_received, unique_id="wu-metrics-attempt")
+
+
+def flush(
+    status: int,
+    *,
+    cache: Mapping[str, Mapping[str, int]] | None = None,
+    properties: Optional[Mapping[str, Any]] = None,
+    stream: Any = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Write the current invocation as one EMF line and reset.
+
+    ``cache`` is the per-cache hit/miss delta for this request. Returns the
+    document written (None when metrics are disabled or nothing was started).
+    """
+    global _current
+    inv, _current = _current, None
+    if inv is None or not METRICS_ENABLED:
+        return None
+
+    latency_ms = (time.perf_counter() - inv.started) * 1000
+    hits = sum(c.get("hits", 0) for c in (cache or {}).values())
+    misses = sum(c.get("misses", 0) for c in (cache or {}).values())
+    values: Dict[str, Any] = {
+        "Latency": round(latency_ms, 2),
+        "DynamoDBCalls": sum(inv.ddb_calls.values()),
+        "ReadCapacityUnits": round(sum(inv.read_units.values()), 2),
+        "WriteCapacityUnits": round(sum(inv.write_units.values()), 2),
+        "Throttles": inv.throttles,
+        "CacheHits": hits,
+        "CacheMisses": misses,
+        "Errors": 1 if status >= 500 else 0,
+    }
+    units = {"Latency": "Milliseconds"}
+    if hits + misses:
+        values["CacheHitRatio"] = round(100.0 * hits / (hits + misses), 1)
+        units["CacheHitRatio"] = "Percent"
+
+    doc: Dict[str, Any] = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [["Route"]],
+                "Metrics": [{"Name": k, "Unit": units.get(k, "Count")} for k in values],
+            }],
+        },
+        "Route": inv.route,
+        "status": status,
+        **values,
+        "ddbOps": dict(inv.ddb_calls),
+        "rcuByTable": {t: round(v, 2) for t, v in inv.read_units.items()},
+        "wcuByTable": {t: round(v, 2) for t, v in inv.write_units.items()},
+        "caches": {n: c for n, c in (cache or {}).items() if c.get("hits") or c.get("misses")},
+        **(properties or {}),
+    }
+    out = stream or sys.stdout
+    out.write(json.dumps(doc, separators=(",", ":"), default=str) + "\n")
+    out.flush()
+    return doc
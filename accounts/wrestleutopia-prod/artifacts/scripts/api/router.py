@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import importlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from auth import _claims, _is_promoter, _is_wrestler
+from http_utils import _resp
+
+Handler = Callable[["Request"], Dict[str, Any]]
+Middleware = Callable[["Request", Handler], Dict[str, Any]]
+
+_PARAM_RE = re.compile(r"\{(\w+)(?::([^}]+))?\}")
+CONVERTERS: Dict[str, str] = {
+    "str": r"[^/]+",
+    "uuid": r"[0-9a-fA-F-]{36}",
+    "path": r"(?:/.*)?",
+}
+
+ROLE_CHECKS: Dict[str, Tuple[Callable[[FrozenSet[str]], bool], str]] = {
+    "member": (lambda g: _is_wrestler(g) or _is_promoter(g), "Wrestler or promoter role required"),
+    "wrestler": (_is_wrestler, "Wrestler role required"),
+    "promoter": (_is_promoter, "Promoter role required"),
+}
+
+
+class LazyModule:
+    """
+    Stand-in for a route module that imports it on first attribute access.
+
+    Route tables reference handlers as ``mod._handler``; with a LazyModule
+    the module (and the boto3/DynamoDB setup it pulls in) loads on the
+    first dispatch to one of its routes instead of at INIT.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Any = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+
+@dataclass
+class Request:
+    """Per-invocation request state shared by middleware and handlers."""
+    event: Dict[str, Any]
+    method: str
+    path: str
+    ids: Dict[str, str]
+    params: Dict[str, str] = field(default_factory=dict)
+    route: Optional["Route"] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+    _auth: Optional[Tuple[Optional[str], FrozenSet[str]]] = None
+
+    def _claims(self) -> Tuple[Optional[str], FrozenSet[str]]:
+        if self._auth is None:
+            self._auth = _claims(self.event)
+        return self._auth
+
+    @property
+    def sub(self) -> Optional[str]:
+        """Caller subject, parsed from the authorizer claims once per request."""
+        return self._claims()[0]
+
+    @property
+    def groups(self) -> FrozenSet[str]:
+        """Caller groups, parsed together with ``sub``."""
+        return self._claims()[1]
+
+
+@dataclass(frozen=True)
+class Route:
+    """One entry of the route table."""
+    method: str
+    pattern: str
+    handler: Handler
+    role: Optional[str] = None
+    regex: Optional[re.Pattern[str]] = None
+    param_names: Tuple[str, ...] = ()
+
+
+def _compile(pattern: str, prefix: str = "p") -> Tuple[str, Tuple[str, ...]]:
+    """Translate '/tryouts/{id:uuid}' into a regex body (groups named prefix+index) and its parameter names."""
+    names: List[str] = []
+    out: List[str] = []
+    pos = 0
+    for m in _PARAM_RE.finditer(pattern):
+        out.append(re.escape(pattern[pos:m.start()]))
+        name, conv = m.group(1), m.group(2) or "str"
+        if conv not in CONVERTERS:
+            raise ValueError(f"Unknown converter {conv!r} in route {pattern!r}")
+        out.append(f"(?P<{prefix}{len(names)}>{CONVERTERS[conv]})")
+        names.append(name)
+        pos = m.end()
+    out.append(re.escape(pattern[pos:]))
+    return "".join(out), tuple(names)
+
+
+class Router:
+    """
+    Declarative HTTP router.
+
+    Static paths resolve with one dict lookup; parameterized paths of a
+    method are folded into a single alternation regex, so any request costs
+    at most one regex match. Routes are tried static-first. A handler may
+    be a coroutine function; it runs on the event loop in ``aio``.
+    """
+
+    def __init__(self, middleware: Sequence[Middleware] = ()) -> None:
+        self._static: Dict[Tuple[str, str], Route] = {}
+        self._dynamic: Dict[str, List[Route]] = {}
+        self._compiled: Dict[str, Optional[re.Pattern[str]]] = {}
+        self._middleware = list(middleware)
+        self._chain: Optional[Handler] = None
+
+    def add(self, methods: str | Sequence[str], pattern: str, handler: Handler, *, role: Optional[str] = None) -> None:
+        """Register ``handler`` for one or more methods on ``pattern``."""
+        if role is not None and role not in ROLE_CHECKS:
+            raise ValueError(f"Unknown role {role!r}")
+        for method in [methods] if isinstance(methods, str) else methods:
+            if not _PARAM_RE.search(pattern):
+                self._static[(method, pattern)] = Route(method, pattern, handler, role)
+                continue
+            body, names = _compile(pattern)
+            route = Route(method, pattern, handler, role, re.compile(f"^{body}$"), names)
+            self._dynamic.setdefault(method, []).append(route)
+            self._compiled.pop(method, None)
+
+    def route(self, methods: str | Sequence[str], pattern: str, *, role: Optional[str] = None) -> Callable[[Handler], Handler]:
+        """Decorator form of :meth:`add`."""
+        def deco(fn: Handler) -> Handler:
+            self.add(methods, pattern, fn, role=role)
+            return fn
+        return deco
+
+    def use(self, middleware: Middleware) -> None:
+        """Append a middleware; the first one added is the outermost."""
+        self._middleware.append(middleware)
+        self._chain = None
+
+    def _combined(self, method: str) -> Optional[re.Pattern[str]]:
+        if method not in self._compiled:
+            routes = self._dynamic.get(method) or []
+            alts = []
+            for i, r in enumerate(routes):
+                body, _ = _compile(r.pattern, prefix=f"r{i}_")
+                alts.append(f"(?P<r{i}>{body})")
+            self._compiled[method] = re.compile("^(?:" + "|".join(alts) + ")$") if alts else None
+        return self._compiled[method]
+
+    def match(self, method: str, path: str) -> Tuple[Optional[Route], Dict[str, str]]:
+        """Return the route and path parameters for a request, or (None, {})."""
+        route = self._static.get((method, path))
+        if route is not None:
+            return route, {}
+        combined = self._combined(method)
+        m = combined.match(path) if combined else None
+        if not m:
+            return None, {}
+        i = int(m.lastgroup[1:])
+        route = self._dynamic[method][i]
+        return route, {name: m.group(f"r{i}_{j}") for j, name in enumerate(route.param_names)}
+
+    def allows_path(self, path: str) -> bool:
+        """True if some method is routed for ``path`` (used to tell 405 from 404)."""
+        return any(p == path for _, p in self._static) or any(
+            r.regex.match(path) for routes in self._dynamic.values() for r in routes
+        )
+
+    def _endpoint(self, req: Request) -> Dict[str, Any]:
+        if req.route is None:
+            if self.allows_path(req.path):
+                return _resp(405, {"message": "Method not allowed", **req.ids})
+            return _resp(404, {"message": "Route not found", **req.ids})
+        if req.route.role is not None:
+            allowed, message = ROLE_CHECKS[req.route.role]
+            if not allowed(req.groups):
+                return _resp(403, {"message": message, **req.ids})
+        resp = req.route.handler(req)
+        if hasattr(resp, "__await__"):
+            from aio import run  # asyncio loads only when an async handler runs
+
+            resp = run(resp)
+        return resp
+
+    def dispatch(self, request: Request) -> Dict[str, Any]:
+        """Resolve the route for ``request`` and run it through the middleware chain."""
+        request.route, request.params = self.match(request.method, request.path)
+        if self._chain is None:
+            call: Handler = self._endpoint
+            for mw in reversed(self._middleware):
+                call = (lambda m, nxt: lambda req: m(req, nxt))(mw, call)
+            self._chain = call
+        return self._chain(request)
@@ -1,26 +1,40 @@
 from __future__ import annotations
 
-import base64
-import json
+import csv
+import io
 import logging
 import os
 import re
-from typing import Any, Dict, Iterable, List, Tuple
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Key
 
+import cursor
 from auth import _is_wrestler
-from config import get_config
+from db import loader
+from db.applications import APPLICANT_SUMMARY_FIELDS, APPLICATION_STATUSES, applicant_summary, set_statuses, summary_attrs
+from db.budget import DeadlineExceeded, for_route
+from db.paginate import fill_page
 from db.tables import T_APP, T_TRY, T_WREST
 from db.wrestlers import batch_get_wrestlers, get_wrestler_pk
-from http_utils import _json, _now_iso, _resp, _qs
+from http_utils import _json, _now_iso, _resp, _qs, accepts_gzip, dumps, text_response
 
 LOGGER = logging.getLogger("wrestleutopia.routes.applications")
 
 MAX_NOTES_LEN = 2000
 REEL_URL_RE = re.compile(r"^https?://[^\s]{3,}$", re.IGNORECASE)
-BATCH_GET_LIMIT = 100
+
+MAX_BULK_UPDATES = int(os.environ.get("MAX_BULK_STATUS_UPDATES", "500"))
+EXPORT_PAGE_SIZE = 100
+EXPORT_MAX_BYTES = int(os.environ.get("EXPORT_MAX_BYTES", "4000000"))
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_APP_FIELDS = ("tryoutId", "applicantId", "status", "timestamp", "statusUpdatedAt", "notes", "reelLink")
+EXPORT_PROFILE_FIELDS = ("handle", "stageName", "name", "city", "region", "photoKey")
 
 
 def _request_id(event: dict) -> str:
@@ -32,26 +46,6 @@ def _request_id(event: dict) -> str:
     )
 
 
-def _decode_next_token(token: str | None) -> Dict[str, Any] | None:
-    """Decode a nextToken produced by _encode_next_token."""
-    if not token:
-        return None
-    try:
-        raw = base64.urlsafe_b64decode(token.encode("utf-8")).decode("utf-8")
-        data = json.loads(raw)
-        return data if isinstance(data, dict) else None
-    except Exception:
-        return None
-
-
-def _encode_next_token(key: Dict[str, Any] | None) -> str | None:
-    """Encode LastEvaluatedKey as an opaque nextToken."""
-    if not key:
-        return None
-    raw = json.dumps(key, separators=(",", ":"), ensure_ascii=False)
-    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8")
-
-
 def _bounded_page_size(qs: dict, default: int = 100, min_v: int = 1, max_v: int = 200) -> int:
     """Return a safe page size parsed from querystring."""
     val = (qs.get("pageSize") or "").strip()
@@ -64,6 +58,11 @@ def _bounded_page_size(qs: dict, default: int = 100, min_v: int = 1, max_v: int
     return max(min_v, min(max_v, n))
 
 
+def _wants_fresh(qs: dict) -> bool:
+    """``fresh=1`` trades latency for live applicant profiles instead of the copies on the applications."""
+    return (qs.get("fresh") or "").strip().lower() in ("1", "true")
+
+
 def _clean_notes(s: str | None) -> str:
     """Trim and bound notes length."""
     s = (s or "").strip()
@@ -78,26 +77,77 @@ def _clean_reel_link(s: str | None) -> str:
     return s if REEL_URL_RE.match(s) else ""
 
 
-def _chunked(seq: Iterable[str], size: int) -> Iterable[List[str]]:
-    """Yield fixed-size chunks from an iterable."""
-    chunk: List[str] = []
-    for x in seq:
-        chunk.append(x)
-        if len(chunk) >= size:
-            yield chunk
-            chunk = []
-    if chunk:
-        yield chunk
-
-
 def _profile_projection() -> Tuple[set[str], str, Dict[str, str]]:
-    """Return allowlisted fields and projection/EAN for GetItem fallback."""
-    allowed_fields = {"userId", "handle", "stageName", "name", "city", "region", "photoKey"}
+    """Return allowlisted profile fields and the equivalent projection/EAN."""
+    allowed_fields = set(APPLICANT_SUMMARY_FIELDS)
     proj = "userId, handle, stageName, #n, city, #r, photoKey"
     ean = {"#r": "region", "#n": "name"}
     return allowed_fields, proj, ean
 
 
+def _get_profiles_individually(ids: List[str], req_id: str) -> List[Dict[str, Any]]:
+    """Per-UID GetItem fallback for when the batched profile read fails outright."""
+    _, proj, ean = _profile_projection()
+    pk = get_wrestler_pk()
+    items: List[Dict[str, Any]] = []
+    for uid in ids:
+        key = {"userId": uid}
+        if len(pk) == 2 and "role" in pk:
+            key["role"] = "Wrestler"
+        try:
+            it = T_WREST.get_item(Key=key, ProjectionExpression=proj, ExpressionAttributeNames=ean).get("Item")
+        except Exception as exc:
+            LOGGER.info("get_item_profile_fallback_failed requestId=%s uid=%s err=%s", req_id, uid, exc)
+            continue
+        if it:
+            items.append(it)
+    return items
+
+
+def _load_applicant_profiles(ids: List[str], req_id: str) -> Dict[str, Dict[str, Any]]:
+    """Batch-load applicant profiles; keys missed by the first pass get one consistent retry batch."""
+    allowed_fields, _, _ = _profile_projection()
+    profiles: Dict[str, Dict[str, Any]] = {}
+    missing = ids
+    for consistent in (False, True):
+        if not missing:
+            break
+        fallback = False
+        try:
+            items = batch_get_wrestlers(ids=missing, allowed_fields=allowed_fields, consistent_read=consistent)
+        except Exception as exc:
+            LOGGER.warning("batch_get_profiles_failed requestId=%s err=%s", req_id, exc)
+            items, fallback = _get_profiles_individually(missing, req_id), True
+        for p in items:
+            p = applicant_summary(p)
+            uid = p.get("userId")
+            if uid:
+                profiles[uid] = p
+        missing = [uid for uid in missing if uid not in profiles]
+        if fallback:
+            break
+    if missing:
+        LOGGER.info("applicant_profiles_missing requestId=%s count=%d", req_id, len(missing))
+    return profiles
+
+
+def _attach_applicant_profiles(apps: List[Dict[str, Any]], req_id: str, *, fresh: bool = False) -> None:
+    """
+    Make sure each application carries an ``applicantProfile``.
+
+    The summary copied onto the application (at apply time, then kept in
+    step by the wrestlers stream consumer) is used as is; only applications
+    without one, or every application when ``fresh`` is set, are joined to
+    the live profiles with one batched read.
+    """
+    todo = [a for a in apps if a.get("applicantId") and (fresh or "applicantProfile" not in a)]
+    if not todo:
+        return
+    profiles = _load_applicant_profiles(sorted({a["applicantId"] for a in todo}), req_id)
+    for a in todo:
+        a["applicantProfile"] = profiles.get(a["applicantId"], {})
+
+
 def _post_application(sub: str, groups: set[str], event) -> dict[str, Any]:
     """Submit a tryout application; idempotent on duplicate."""
     req_id = _request_id(event)
@@ -107,25 +157,34 @@ def _post_application(sub: str, groups: set[str], event) -> dict[str, Any]:
     tryout_id = (data.get("tryoutId") or "").strip()
     if not tryout_id:
         return _resp(400, {"message": "tryoutId required"})
-    tr = T_TRY.get_item(Key={"tryoutId": tryout_id}).get("Item")
+    ld = loader.current()
+    app_key = {"tryoutId": tryout_id, "applicantId": sub}
+    ld.prime(T_APP, app_key)
+    ld.prime(T_WREST, {"userId": sub})
+    tr = ld.load(T_TRY, {"tryoutId": tryout_id})
     if not tr:
         return _resp(404, {"message": "Tryout not found"})
+    if ld.load(T_APP, app_key):
+        LOGGER.info("application_duplicate requestId=%s tryout=%s", req_id, tryout_id)
+        return _resp(200, {"ok": True, "tryoutId": tryout_id, "note": "already_applied"})
     now = _now_iso()
     notes = _clean_notes(data.get("notes"))
     reel = _clean_reel_link(data.get("reelLink"))
+    item = {
+        **app_key,
+        "applicantIdGsi": sub,
+        "timestamp": now,
+        "notes": notes,
+        "reelLink": reel,
+        "status": "submitted",
+        **summary_attrs(ld.load(T_WREST, {"userId": sub}), now=now),
+    }
     try:
         T_APP.put_item(
-            Item={
-                "tryoutId": tryout_id,
-                "applicantId": sub,
-                "applicantIdGsi": sub,
-                "timestamp": now,
-                "notes": notes,
-                "reelLink": reel,
-                "status": "submitted",
-            },
+            Item=item,
             ConditionExpression="attribute_not_exists(tryoutId) AND attribute_not_exists(applicantId)",
         )
+        ld.put(T_APP, app_key, item)
         LOGGER.info("application_submitted requestId=%s tryout=%s", req_id, tryout_id)
     except ClientError as exc:
         code = (exc.response or {}).get("Error", {}).get("Code")
@@ -142,89 +201,244 @@ def _post_application(sub: str, groups: set[str], event) -> dict[str, Any]:
     return _resp(200, {"ok": True, "tryoutId": tryout_id})
 
 
+def _tryout_apps_query(qs: dict, tryout_id: str, page_size: int) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"KeyConditionExpression": Key("tryoutId").eq(tryout_id), "Limit": page_size}
+    start_key = cursor.decode(qs.get("nextToken"), cursor.APPS_BY_TRYOUT, tryoutId=tryout_id)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    return kwargs
+
+
+def _applicant_apps_query(qs: dict, sub: str, page_size: int) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "IndexName": "ByApplicant",
+        "KeyConditionExpression": Key("applicantIdGsi").eq(sub),
+        "Limit": page_size,
+    }
+    start_key = cursor.decode(qs.get("nextToken"), cursor.APPS_BY_APPLICANT, applicantIdGsi=sub, applicantId=sub)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    return kwargs
+
+
+def _owner_denied(tr: Optional[Dict[str, Any]], sub: str) -> Optional[dict[str, Any]]:
+    """Return the error response if ``sub`` may not read the tryout's applications."""
+    if not tr:
+        return _resp(404, {"message": "Tryout not found"})
+    if tr.get("ownerId") != sub:
+        return _resp(403, {"message": "Not your tryout"})
+    return None
+
+
+def _tryout_apps_page(r: Dict[str, Any], tryout_id: str, qs: dict, req_id: str) -> dict[str, Any]:
+    apps = r.get("Items", [])
+    next_token = cursor.encode(cursor.APPS_BY_TRYOUT, r.get("LastEvaluatedKey"), tryoutId=tryout_id)
+    _attach_applicant_profiles(apps, req_id, fresh=_wants_fresh(qs))
+    return _resp(200, {"items": apps, "nextToken": next_token})
+
+
+def _applicant_apps_page(r: Dict[str, Any], sub: str) -> dict[str, Any]:
+    apps = r.get("Items", [])
+    next_token = cursor.encode(cursor.APPS_BY_APPLICANT, r.get("LastEvaluatedKey"), applicantIdGsi=sub, applicantId=sub)
+    return _resp(200, {"items": apps, "nextToken": next_token})
+
+
 def _get_applications(sub: str, event) -> dict[str, Any]:
     """List applications (promoter-owner view or wrestler self view)."""
     qs = _qs(event)
-    cfg = get_config()
-    des = cfg.deserializer
     req_id = _request_id(event)
     page_size = _bounded_page_size(qs, default=100, min_v=1, max_v=200)
-    start_key = _decode_next_token(qs.get("nextToken"))
     if "tryoutId" in qs:
         tryout_id = (qs["tryoutId"] or "").strip()
         if not tryout_id:
             return _resp(400, {"message": "tryoutId required"})
-        tr = T_TRY.get_item(Key={"tryoutId": tryout_id}).get("Item")
-        if not tr:
-            return _resp(404, {"message": "Tryout not found"})
-        if tr.get("ownerId") != sub:
-            return _resp(403, {"message": "Not your tryout"})
-        kwargs = {
-            "KeyConditionExpression": Key("tryoutId").eq(tryout_id),
-            "Limit": page_size,
-        }
-        if start_key:
-            kwargs["ExclusiveStartKey"] = start_key
-
-        r = T_APP.query(**kwargs)
-        apps = r.get("Items", [])
-        next_token = _encode_next_token(r.get("LastEvaluatedKey"))
-        if apps:
-            ids = sorted({a.get("applicantId") for a in apps if a.get("applicantId")})
-            profiles: dict[str, dict] = {}
-            allowed_fields, proj, ean = _profile_projection()
-            for chunk in _chunked(ids, BATCH_GET_LIMIT):
-                try:
-                    av_items = batch_get_wrestlers(
-                        ids=chunk,
-                        allowed_fields=allowed_fields,
-                        consistent_read=False,
-                    )
-                    for av in av_items:
-                        p = {k: des.deserialize(v) for k, v in av.items()}
-                        p["stageName"] = p.get("stageName") or p.get("name") or None
-                        uid = p.get("userId")
-                        if uid:
-                            profiles[uid] = p
-                except Exception as exc:
-                    LOGGER.info("batch_get_profiles_failed requestId=%s err=%s", req_id, exc)
-            if ids:
-                pk = get_wrestler_pk()
-                for uid in ids:
-                    if uid in profiles:
-                        continue
-                    key = {"userId": uid}
-                    if len(pk) == 2 and "role" in pk:
-                        key["role"] = "Wrestler"
-                    try:
-                        gi = T_WREST.get_item(
-                            Key=key,
-                            ProjectionExpression=proj,
-                            ExpressionAttributeNames=ean,
-                        )
-                        it = gi.get("Item")
-                        if it:
-                            it["stageName"] = it.get("stageName") or it.get("name") or None
-                            profiles[uid] = it
-                    except Exception as exc:
-                        LOGGER.info(
-                            "get_item_profile_fallback_failed requestId=%s uid=%s err=%s",
-                            req_id,
-                            uid,
-                            exc,
-                        )
-            for a in apps:
-                uid = a.get("applicantId")
-                a["applicantProfile"] = profiles.get(uid, {})
-        return _resp(200, {"items": apps, "nextToken": next_token})
-    kwargs = {
-        "IndexName": "ByApplicant",
-        "KeyConditionExpression": Key("applicantIdGsi").eq(sub),
-        "Limit": page_size,
+        kwargs = _tryout_apps_query(qs, tryout_id, page_size)
+        denied = _owner_denied(loader.current().load(T_TRY, {"tryoutId": tryout_id}), sub)
+        if denied:
+            return denied
+        return _tryout_apps_page(T_APP.query(**kwargs), tryout_id, qs, req_id)
+    return _applicant_apps_page(T_APP.query(**_applicant_apps_query(qs, sub, page_size)), sub)
+
+
+async def _get_applications_async(sub: str, event) -> dict[str, Any]:
+    """
+    :func:`_get_applications` for the async mode.
+
+    The owner check and the page query run concurrently; a page read for
+    a caller who turns out not to own the tryout is dropped.
+    """
+    import asyncio  # async machinery loads only in API_ASYNC mode
+
+    import aio
+
+    qs = _qs(event)
+    req_id = _request_id(event)
+    page_size = _bounded_page_size(qs, default=100, min_v=1, max_v=200)
+    apps_table = aio.AsyncTable(T_APP)
+    if "tryoutId" not in qs:
+        r = await apps_table.query(**_applicant_apps_query(qs, sub, page_size))
+        return await aio.call(_applicant_apps_page, r, sub)
+    tryout_id = (qs["tryoutId"] or "").strip()
+    if not tryout_id:
+        return _resp(400, {"message": "tryoutId required"})
+    tr, r = await asyncio.gather(
+        aio.call(loader.current().load, T_TRY, {"tryoutId": tryout_id}),
+        apps_table.query(**_tryout_apps_query(qs, tryout_id, page_size)),
+    )
+    denied = _owner_denied(tr, sub)
+    if denied:
+        return denied
+    return await aio.call(_tryout_apps_page, r, tryout_id, qs, req_id)
+
+
+def _bulk_update_status(sub: str, event) -> dict[str, Any]:
+    """Set the status of many applications on the caller's tryouts; reports a result per update (each application at most once)."""
+    req_id = _request_id(event)
+    updates = (_json(event) or {}).get("updates")
+    if not isinstance(updates, list) or not updates:
+        return _resp(400, {"message": "updates must be a non-empty list"})
+    if len(updates) > MAX_BULK_UPDATES:
+        return _resp(400, {"message": f"at most {MAX_BULK_UPDATES} updates per request"})
+
+    wanted: Dict[Tuple[str, str], str] = {}
+    errors: Dict[Tuple[str, str], str] = {}
+    for u in updates:
+        u = u if isinstance(u, dict) else {}
+        key = (str(u.get("tryoutId") or "").strip(), str(u.get("applicantId") or "").strip())
+        status = str(u.get("status") or "").strip().lower()
+        if not all(key):
+            return _resp(400, {"message": "each update needs tryoutId and applicantId"})
+        if key in wanted:
+            return _resp(400, {"message": "each application may appear only once in updates", "tryoutId": key[0], "applicantId": key[1]})
+        wanted[key] = status
+        if status not in APPLICATION_STATUSES:
+            errors[key] = "invalid_status"
+
+    ld = loader.current()
+    tryout_ids = list(dict.fromkeys(t for t, _ in wanted))
+    owners = {
+        t: (row or {}).get("ownerId")
+        for t, row in zip(tryout_ids, ld.load_many(T_TRY, [{"tryoutId": t} for t in tryout_ids]))
     }
-    if start_key:
-        kwargs["ExclusiveStartKey"] = start_key
+    for key in wanted:
+        if key in errors:
+            continue
+        owner = owners.get(key[0])
+        if owner is None:
+            errors[key] = "tryout_not_found"
+        elif owner != sub:
+            errors[key] = "forbidden"
+
+    todo = [(t, a, st) for (t, a), st in wanted.items() if (t, a) not in errors]
+    errors.update({k: v for k, v in set_statuses(todo, actor=sub, now=_now_iso()).items() if v})
+    for t, a, _ in todo:
+        ld.forget(T_APP, {"tryoutId": t, "applicantId": a})
+
+    results = [
+        {"tryoutId": t, "applicantId": a, "status": st, "ok": (t, a) not in errors, "error": errors.get((t, a))}
+        for (t, a), st in wanted.items()
+    ]
+    LOGGER.info("bulk_status requestId=%s count=%d failed=%d", req_id, len(results), len(errors))
+    return _resp(200, {"updated": len(results) - len(errors), "failed": len(errors), "results": results})
+
+
+def _csv_cell(v: Any) -> Any:
+    """Neutralise values a spreadsheet would run as a formula."""
+    if isinstance(v, str) and v[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + v
+    return "" if v is None else v
+
+
+def _export_rows(apps: List[Dict[str, Any]], fmt: str) -> str:
+    """Render one page of applications (with applicant profile fields) as NDJSON or CSV rows."""
+    if fmt == "ndjson":
+        return "".join(
+            dumps({
+                **{k: a[k] for k in EXPORT_APP_FIELDS if k in a},
+                "applicantProfile": a.get("applicantProfile") or {},
+            }) + "\n"
+            for a in apps
+        )
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    for a in apps:
+        p = a.get("applicantProfile") or {}
+        w.writerow([_csv_cell(a.get(k)) for k in EXPORT_APP_FIELDS] + [_csv_cell(p.get(k)) for k in EXPORT_PROFILE_FIELDS])
+    return buf.getvalue()
+
+
+def _export_applications(sub: str, event) -> dict[str, Any]:
+    """
+    Export every application to one of the caller's tryouts as NDJSON or CSV.
 
-    r = T_APP.query(**kwargs)
-    next_token = _encode_next_token(r.get("LastEvaluatedKey"))
-    return _resp(200, {"items": r.get("Items", []), "nextToken": next_token})
\ No newline at end of file
+    Each response holds as many 100-item pages as fit the route's read and
+    time budget and ~4 MB of body; ``X-Next-Token`` resumes the export
+    where it stopped (absent on the last part). CSV has a header row on
+    the first part only, so the parts concatenate into one file.
+    """
+    qs = _qs(event)
+    req_id = _request_id(event)
+    tryout_id = (qs.get("tryoutId") or "").strip()
+    fmt = (qs.get("format") or "ndjson").strip().lower()
+    fresh = _wants_fresh(qs)
+    if not tryout_id:
+        return _resp(400, {"message": "tryoutId required"})
+    if fmt not in EXPORT_FORMATS:
+        return _resp(400, {"message": "format must be ndjson or csv"})
+    token = qs.get("nextToken")
+    start_key = cursor.decode(token, cursor.APPS_BY_TRYOUT, tryoutId=tryout_id)
+    if token and not start_key:
+        return _resp(400, {"message": "Invalid nextToken"})
+    tr = loader.current().load(T_TRY, {"tryoutId": tryout_id})
+    if not tr:
+        return _resp(404, {"message": "Tryout not found"})
+    if tr.get("ownerId") != sub:
+        return _resp(403, {"message": "Not your tryout"})
+
+    budget = for_route("export_applications")
+    deadline = time.monotonic() + budget.time_ms / 1000.0
+    parts: List[str] = []
+    if fmt == "csv" and not start_key:
+        parts.append(",".join(EXPORT_APP_FIELDS + EXPORT_PROFILE_FIELDS) + "\n")
+    size = rows = 0
+    read_units = 0.0
+    last_key: Optional[Dict[str, Any]] = start_key
+    while True:
+        try:
+            page = fill_page(
+                T_APP.query,
+                {"KeyConditionExpression": Key("tryoutId").eq(tryout_id)},
+                limit=EXPORT_PAGE_SIZE,
+                key_of=lambda it: {"tryoutId": it["tryoutId"], "applicantId": it["applicantId"]},
+                start_key=last_key,
+                max_reads=1,
+                max_read_units=budget.read_units,
+            )
+        except DeadlineExceeded:
+            if not rows:
+                raise
+            break
+        read_units += page.read_units
+        if page.items:
+            _attach_applicant_profiles(page.items, req_id, fresh=fresh)
+            chunk = _export_rows(page.items, fmt)
+            parts.append(chunk)
+            size += len(chunk.encode("utf-8"))
+            rows += len(page.items)
+        last_key = page.last_key
+        if not last_key or size >= EXPORT_MAX_BYTES or read_units >= budget.read_units or time.monotonic() >= deadline:
+            break
+
+    next_token = cursor.encode(cursor.APPS_BY_TRYOUT, last_key, tryoutId=tryout_id)
+    LOGGER.info("export_applications requestId=%s tryout=%s rows=%d bytes=%d rcu=%.1f more=%s",
+                req_id, tryout_id, rows, size, read_units, bool(next_token))
+    headers = {"content-disposition": f'attachment; filename="applications-{tryout_id}.{fmt}"'}
+    if next_token:
+        headers["x-next-token"] = next_token
+    return text_response(
+        200,
+        "".join(parts),
+        content_type=EXPORT_FORMATS[fmt],
+        headers=headers,
+        gzip_body=accepts_gzip(event),
+    )
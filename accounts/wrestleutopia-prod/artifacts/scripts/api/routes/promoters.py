@@ -1,14 +1,17 @@
 from __future__ import annotations
-import base64
-import json
 import re
 from typing import Any, Dict, Optional, Set
 
 from boto3.dynamodb.conditions import Attr
 from botocore.exceptions import BotoCoreError, ClientError
 
+import cursor
 from auth import _is_promoter, _is_wrestler
+from db import search
+from db.budget import for_route
+from db.cache import PROMOTER_PUBLIC
 from db.tables import T_PROMO
+from db.updates import ConditionFailed, build_update, update_item
 from http_utils import _json, _now_iso, _qs, _resp
 from media import _normalize_media_key
 
@@ -25,6 +28,10 @@ _MAX_STR = 2000
 _MAX_BIO = 10000
 _MAX_ARRAY = 200
 _MAX_LIMIT = 100
+_PROFILE_FIELDS = frozenset({
+    "role", "orgName", "address", "city", "region", "country", "website", "contact",
+    "bio", "logoKey", "socials", "mediaKeys", "highlights",
+})
 _DEFAULT_LIMIT = 50
 
 
@@ -67,25 +74,6 @@ def _cap_list_str(values: Any, *, max_items: int = _MAX_ARRAY) -> list[str]:
     return out
 
 
-def _decode_next_token(token: Optional[str]) -> Optional[Dict[str, Any]]:
-    """Base64 JSON decode of the pagination token."""
-    if not token:
-        return None
-    try:
-        data = base64.urlsafe_b64decode(token.encode("utf-8"))
-        return json.loads(data.decode("utf-8"))
-    except Exception:
-        return None
-
-
-def _encode_next_token(lek: Optional[Dict[str, Any]]) -> Optional[str]:
-    """Base64 JSON encode of LastEvaluatedKey."""
-    if not lek:
-        return None
-    raw = json.dumps(lek).encode("utf-8")
-    return base64.urlsafe_b64encode(raw).decode("utf-8")
-
-
 def _upsert_promoter_profile(sub: str, groups: Set[str], event) -> Dict[str, Any]:
     """Create or update a promoter profile."""
     if not _is_promoter(groups):
@@ -97,13 +85,8 @@ def _upsert_promoter_profile(sub: str, groups: Set[str], event) -> Dict[str, Any
     if not org:
         return _resp(400, {"message": "Missing required fields (orgName, address)"})
 
-    try:
-        existing = T_PROMO.get_item(Key={"userId": sub}).get("Item") or {}
-    except (ClientError, BotoCoreError) as exc:
-        _log.error("promo_get_item_failed err=%s", exc)
-        return _resp(500, {"message": "Server error"})
+    changes: Dict[str, Any] = {"role": "Promoter", "orgName": org, "address": address}
 
-    socials = existing.get("socials") or None
     raw_socials = data.get("socials")
     if isinstance(raw_socials, dict):
         tmp = {}
@@ -112,13 +95,13 @@ def _upsert_promoter_profile(sub: str, groups: Set[str], event) -> Dict[str, Any
                 url = _safe_url(v)
                 if url:
                     tmp[k] = url
-        socials = tmp or None
+        changes["socials"] = tmp or None
 
     raw_logo = _safe_str(data.get("logoKey"), max_len=512)
     if raw_logo:
-        logo_key = _normalize_media_key(raw_logo, sub, actor="promoter", kind="logo") or existing.get("logoKey")
-    else:
-        logo_key = existing.get("logoKey")
+        logo_key = _normalize_media_key(raw_logo, sub, actor="promoter", kind="logo")
+        if logo_key:
+            changes["logoKey"] = logo_key
 
     if isinstance(data.get("mediaKeys"), list):
         media_keys: list[str] = []
@@ -130,50 +113,35 @@ def _upsert_promoter_profile(sub: str, groups: Set[str], event) -> Dict[str, Any
                     media_keys.append(nk)
         seen = set()
         media_keys = [m for m in media_keys if not (m in seen or seen.add(m))]
-        media_keys = media_keys[:_MAX_ARRAY]
-    else:
-        media_keys = existing.get("mediaKeys", [])
+        changes["mediaKeys"] = media_keys[:_MAX_ARRAY]
 
     if isinstance(data.get("highlights"), list):
-        highlights = _cap_list_str(data["highlights"], max_items=_MAX_ARRAY)
-    else:
-        highlights = existing.get("highlights", [])
-
-    city = _safe_str(data.get("city"), max_len=128) or existing.get("city") or None
-    region = _safe_str(data.get("region"), max_len=128) or existing.get("region") or None
-    country = _safe_str(data.get("country"), max_len=128) or existing.get("country") or None
-    website = _safe_url(data.get("website")) or existing.get("website") or None
-    contact = _safe_str(data.get("contact"), max_len=256) or existing.get("contact") or None
-    bio_in = _safe_str(data.get("bio"), max_len=_MAX_BIO)
-    bio = bio_in if bio_in is not None else (existing.get("bio") or None)
-
-    item = {
-        **existing,
-        "userId": sub,
-        "role": "Promoter",
-        "orgName": org,
-        "address": address,
-        "city": city,
-        "region": region,
-        "country": country,
-        "website": website,
-        "contact": contact,
-        "bio": bio,
-        "logoKey": logo_key,
-        "socials": socials,
-        "mediaKeys": media_keys,
-        "highlights": highlights,
-        "updatedAt": _now_iso(),
-    }
-    item.setdefault("createdAt", existing.get("createdAt") or _now_iso())
-
+        changes["highlights"] = _cap_list_str(data["highlights"], max_items=_MAX_ARRAY)
+
+    for name, value in (
+        ("city", _safe_str(data.get("city"), max_len=128)),
+        ("region", _safe_str(data.get("region"), max_len=128)),
+        ("country", _safe_str(data.get("country"), max_len=128)),
+        ("website", _safe_url(data.get("website"))),
+        ("contact", _safe_str(data.get("contact"), max_len=256)),
+        ("bio", _safe_str(data.get("bio"), max_len=_MAX_BIO)),
+    ):
+        if value is not None:
+            changes[name] = value
+
+    upd = build_update(changes, _PROFILE_FIELDS, now=_now_iso(), expected_version=data.get("version"))
     try:
-        T_PROMO.put_item(Item=item)
+        old = update_item(T_PROMO, {"userId": sub}, upd)
+    except ConditionFailed as cf:
+        return _resp(409, {"message": "Profile changed; reload and retry", "version": cf.item.get("version")})
     except (ClientError, BotoCoreError) as exc:
-        _log.error("promo_put_item_failed err=%s", exc)
+        _log.error("promo_update_item_failed err=%s", exc)
         return _resp(500, {"message": "Server error"})
+    item = upd.apply(old, key={"userId": sub})
+    PROMOTER_PUBLIC.invalidate(sub)
 
-    _log.info("promoter_upsert ok user=%s has_logo=%s media_count=%d", sub, bool(logo_key), len(media_keys))
+    _log.info("promoter_upsert ok user=%s has_logo=%s media_count=%d",
+              sub, bool(item.get("logoKey")), len(item.get("mediaKeys") or []))
     return _resp(200, item)
 
 
@@ -201,8 +169,9 @@ def _get_promoter_profile(sub: str) -> Dict[str, Any]:
 
 
 def _get_promoter_public(user_id: str) -> Dict[str, Any]:
-    """Return a public (redacted) promoter profile by userId."""
-    try:
+    """Return a public (redacted) promoter profile by userId (read-through cached)."""
+
+    def _load() -> Optional[Dict[str, Any]]:
         res = T_PROMO.get_item(
             Key={"userId": user_id},
             ProjectionExpression=(
@@ -212,7 +181,10 @@ def _get_promoter_public(user_id: str) -> Dict[str, Any]:
             ),
             ExpressionAttributeNames={"#r": "region", "#role": "role"},
         )
-        item = res.get("Item")
+        return res.get("Item")
+
+    try:
+        item = PROMOTER_PUBLIC.get_or_load(user_id, _load)
     except (ClientError, BotoCoreError) as exc:
         _log.error("promo_get_public_failed err=%s", exc)
         return _resp(500, {"message": "Server error"})
@@ -227,16 +199,19 @@ def _get_promoter_public(user_id: str) -> Dict[str, Any]:
 
 
 def _list_promoters(groups: Set[str], event) -> Dict[str, Any]:
-    """List promoters with optional filters, pagination, and limits."""
+    """List promoters by city/region via the search index, with an optional text filter."""
     if not (_is_wrestler(groups) or _is_promoter(groups)):
         return _resp(403, {"message": "Wrestler or promoter role required"})
 
     qs = _qs(event)
     city = _safe_str(qs.get("city"), max_len=128)
+    region = _safe_str(qs.get("region"), max_len=128)
     q = _safe_str(qs.get("q"), max_len=128)
     limit_str = _safe_str(qs.get("limit"))
     next_token = _safe_str(qs.get("next"))
-    last_evaluated_key = _decode_next_token(next_token)
+    facets = {"city": city or "", "region": region or ""}
+    pk = search.partition_key(search.PROMOTER, facets)
+    last_evaluated_key = cursor.decode(next_token, cursor.SEARCH, pk=pk)
 
     try:
         limit = int(limit_str) if limit_str is not None else _DEFAULT_LIMIT
@@ -247,33 +222,20 @@ def _list_promoters(groups: Set[str], event) -> Dict[str, Any]:
     if limit > _MAX_LIMIT:
         limit = _MAX_LIMIT
 
-    fe = None
-    if city:
-        cond = Attr("city").contains(city)
-        fe = cond if fe is None else fe & cond
+    extra = None
     if q:
-        cond = (Attr("orgName").contains(q) | Attr("bio").contains(q))
-        fe = cond if fe is None else fe & cond
+        extra = Attr("orgName").contains(q) | Attr("bio").contains(q)
 
     try:
-        scan_params = {
-            "Limit": limit,
-            "ProjectionExpression": (
-                "userId, #role, orgName, city, #r, country, "
-                "website, bio, logoKey, socials, mediaKeys, highlights, "
-                "createdAt, updatedAt"
-            ),
-            "ExpressionAttributeNames": {"#r": "region", "#role": "role"},
-        }
-        if last_evaluated_key:
-            scan_params["ExclusiveStartKey"] = last_evaluated_key
-        if fe is not None:
-            scan_params["FilterExpression"] = fe
-        r = T_PROMO.scan(**scan_params)
-        items = r.get("Items", [])
-        lek = r.get("LastEvaluatedKey")
-        resp = {"items": items, "next": _encode_next_token(lek)}
-        return _resp(200, resp)
+        items, lek = search.query(
+            search.PROMOTER,
+            facets,
+            limit=limit,
+            start_key=last_evaluated_key,
+            extra_filter=extra,
+            budget=for_route("list_promoters"),
+        )
+        return _resp(200, {"items": items, "next": cursor.encode(cursor.SEARCH, lek, pk=pk)})
     except (ClientError, BotoCoreError) as exc:
-        _log.error("promoters_scan_error err=%s", exc)
-        return _resp(500, {"message": "Server error", "where": "list_promoters"})
\ No newline at end of file
+        _log.error("promoters_search_error err=%s", exc)
+        return _resp(500, {"message": "Server error", "where": "list_promoters"})
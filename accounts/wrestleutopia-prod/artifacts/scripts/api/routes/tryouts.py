@@ -1,18 +1,23 @@
 from __future__ import annotations
 
-import base64
-import json
 import logging
 import re
 import uuid
-from typing import Any, Dict, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Any, Dict
 
 import boto3
-from boto3.dynamodb.conditions import Attr, Key
-from botocore.exceptions import ClientError, ParamValidationError
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import BotoCoreError, ClientError
 
+import cursor
 from auth import _is_promoter
 from config import get_config
+from db import loader
+from db.budget import for_route
+from db.cache import FEED_LAST_MONTH, OWNER_OPEN_TRYOUTS, TRYOUT, invalidate_owner_tryouts
+from db.feed import feed_keys, open_feed
+from db.paginate import fill_page
 from db.tables import T_TRY
 from http_utils import _now_iso, _qs, _resp
 
@@ -28,7 +33,7 @@ _TRYOUT_PROJECTION = (
     "tryoutId, ownerId, orgName, eventName, city, #d, slots, requirements, contact, "
     "#s, createdAt"
 )
-_TRYOUT_EAN = {"#d": "date", "#s": "status", "#e": "eventName"}
+_TRYOUT_EAN = {"#d": "date", "#s": "status"}
 
 
 def _request_id(event: Dict[str, Any]) -> str:
@@ -37,33 +42,13 @@ def _request_id(event: Dict[str, Any]) -> str:
     return str(ctx.get("requestId") or "unknown")
 
 
-def _parse_pagination(qs: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
-    """Parse 'limit' and 'cursor' (base64 JSON) from querystring."""
+def _parse_limit(qs: Dict[str, Any]) -> int:
+    """Parse and bound 'limit' from the querystring."""
     try:
         limit = int(qs.get("limit", _DEFAULT_LIMIT))
     except Exception:
         limit = _DEFAULT_LIMIT
-    limit = max(1, min(limit, _MAX_SCAN_LIMIT))
-
-    cursor_raw = qs.get("cursor")
-    exclusive_start_key = None
-    if cursor_raw:
-        try:
-            decoded = base64.urlsafe_b64decode(cursor_raw.encode("utf-8")).decode(
-                "utf-8"
-            )
-            exclusive_start_key = json.loads(decoded)
-        except Exception:
-            exclusive_start_key = None
-    return limit, exclusive_start_key
-
-
-def _encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
-    """Encode a DynamoDB LastEvaluatedKey into a cursor string."""
-    if not last_evaluated_key:
-        return None
-    s = json.dumps(last_evaluated_key, separators=(",", ":"))
-    return base64.urlsafe_b64encode(s.encode("utf-8")).decode("utf-8")
+    return max(1, min(limit, _MAX_SCAN_LIMIT))
 
 
 def _validate_date(yyyy_mm_dd: str) -> bool:
@@ -89,105 +74,58 @@ def _normalize_tryout_item(it: dict) -> dict:
 
 
 def _get_tryouts(event):
-    """Return open tryouts with optional pagination, preferring the GSI."""
+    """
+    Return open tryouts in date order from the sharded OpenFeed index.
+
+    A page can hold fewer than ``limit`` items and still carry a cursor when
+    the feed is sparse (see ``db.feed.open_feed``); only a null cursor means
+    the end of the feed.
+    """
     req_id = _request_id(event)
     qs = _qs(event)
-    limit, eks = _parse_pagination(qs)
+    limit = _parse_limit(qs)
+    after = (cursor.decode(qs.get("cursor"), cursor.TRYOUT_FEED) or {}).get("feedSort")
+    from_date = (qs.get("from") or "").strip()
+    if from_date and not _validate_date(from_date):
+        return _resp(400, {"message": "from must be YYYY-MM-DD"})
+    from_date = from_date or datetime.now(timezone.utc).date().isoformat()
 
     LOGGER.info("get_tryouts start req_id=%s", req_id)
 
-    items = []
-    last_key = None
-
-    q_kwargs = {
-        "IndexName": "OpenByDate",
-        "KeyConditionExpression": Key("status").eq("open"),
-        "ScanIndexForward": True,
-        "Limit": limit,
-    }
-    if eks:
-        q_kwargs["ExclusiveStartKey"] = eks
-
     try:
-        resp = T_TRY.query(**q_kwargs)
-        items = resp.get("Items", []) or []
-        last_key = resp.get("LastEvaluatedKey")
-        LOGGER.debug(
-            "get_tryouts gsi_ok req_id=%s count=%d has_more=%s",
-            req_id,
-            len(items),
-            bool(last_key),
-        )
-    except ParamValidationError as exc:
-        LOGGER.warning("get_tryouts gsi_param_err req_id=%s err=%s", req_id, exc)
-        try:
-            q_kwargs.pop("ExclusiveStartKey", None)
-            resp = T_TRY.query(**q_kwargs)
-            items = resp.get("Items", []) or []
-            last_key = resp.get("LastEvaluatedKey")
-            LOGGER.debug(
-                "get_tryouts gsi_retry_no_cursor req_id=%s count=%d has_more=%s",
-                req_id,
-                len(items),
-                bool(last_key),
-            )
-        except Exception as exc2:
-            LOGGER.error("get_tryouts gsi_retry_failed req_id=%s err=%s", req_id, exc2)
-    except Exception as exc:
-        LOGGER.error("get_tryouts gsi_error req_id=%s err=%s", req_id, exc)
-
-    if not items:
-        scan_kwargs = {
-            "FilterExpression": Attr("status").eq("open"),
-            "ProjectionExpression": _TRYOUT_PROJECTION,
-            "ExpressionAttributeNames": _TRYOUT_EAN,
-            "Limit": limit,
-        }
-        if eks:
-            scan_kwargs["ExclusiveStartKey"] = eks
-
-        try:
-            resp2 = T_TRY.scan(**scan_kwargs)
-            items = resp2.get("Items", []) or []
-            last_key = resp2.get("LastEvaluatedKey")
-            LOGGER.warning(
-                "get_tryouts scan_fallback req_id=%s count=%d has_more=%s",
-                req_id,
-                len(items),
-                bool(last_key),
-            )
-        except ParamValidationError as exc:
-            LOGGER.warning("get_tryouts scan_param_err req_id=%s err=%s", req_id, exc)
-            try:
-                scan_kwargs.pop("ExclusiveStartKey", None)
-                resp2 = T_TRY.scan(**scan_kwargs)
-                items = resp2.get("Items", []) or []
-                last_key = resp2.get("LastEvaluatedKey")
-                LOGGER.warning(
-                    "get_tryouts scan_retry_no_cursor req_id=%s count=%d has_more=%s",
-                    req_id,
-                    len(items),
-                    bool(last_key),
-                )
-            except Exception as exc2:
-                LOGGER.error("get_tryouts scan_retry_failed req_id=%s err=%s", req_id, exc2)
-                return _resp(500, {"message": "Server error", "where": "_get_tryouts"})
-        except Exception as exc:
-            LOGGER.error("get_tryouts scan_error req_id=%s err=%s", req_id, exc)
-            return _resp(500, {"message": "Server error", "where": "_get_tryouts"})
-
-    items = [_normalize_tryout_item(it) for it in (items or [])]
+        items, last_sort = open_feed(limit, from_date=from_date, after=after)
+    except (ClientError, BotoCoreError) as exc:
+        LOGGER.error("get_tryouts feed_error req_id=%s err=%s", req_id, exc)
+        return _resp(500, {"message": "Server error", "where": "_get_tryouts"})
+
+    LOGGER.debug("get_tryouts feed_ok req_id=%s count=%d has_more=%s", req_id, len(items), bool(last_sort))
+    items = [_normalize_tryout_item(it) for it in items]
 
     return _resp(
         200,
         {
             "items": items,
-            "cursor": _encode_cursor(last_key),
+            "cursor": cursor.encode(cursor.TRYOUT_FEED, {"feedSort": last_sort} if last_sort else None),
             "limit": limit,
         },
     )
 
 
+def _get_my_tryouts(sub: str, ids: Dict[str, str]):
+    """Return the caller's own tryouts, newest first."""
+    try:
+        result = T_TRY.query(
+            IndexName="ByOwner",
+            KeyConditionExpression=Key("ownerId").eq(sub),
+            ScanIndexForward=False,
+            Limit=100,
+        )
+        return _resp(200, {**ids, "items": result.get("Items", [])})
+    except (ClientError, BotoCoreError) as exc:
+        LOGGER.error("tryouts.mine.query_failed err=%s", exc, extra=ids)
+        return _resp(500, {"message": "Server error", **ids})
+
+
 def _post_tryout(sub, groups, event):
     """Create a tryout (promoter-only) with strict validation and idempotency."""
     from http_utils import _json
@@ -236,6 +174,7 @@ def _post_tryout(sub, groups, event):
         "status": status_in,
         "createdAt": _now_iso(),
     }
+    item.update(feed_keys(item))
 
     try:
         T_TRY.put_item(
@@ -249,19 +188,22 @@ def _post_tryout(sub, groups, event):
         LOGGER.error("post_tryout put_error req_id=%s err=%s", req_id, exc)
         return _resp(500, {"message": "Server error", "where": "_post_tryout"})
 
+    invalidate_owner_tryouts(sub)
+    FEED_LAST_MONTH.clear()
     LOGGER.info("post_tryout ok req_id=%s tryoutId=%s", req_id, tryout_id)
     return _resp(200, item)
 
 
 def _get_tryout(tryout_id: str):
-    """Fetch a single tryout by ID (public)."""
-    item = T_TRY.get_item(Key={"tryoutId": tryout_id}).get("Item")
+    """Fetch a single tryout by ID (public, read-through cached)."""
+    item = TRYOUT.get_or_load(tryout_id, lambda: loader.current().load(T_TRY, {"tryoutId": tryout_id}))
     return _resp(200, item or {})
 
 
 def _delete_tryout(sub: str, tryout_id: str):
     """Delete a tryout if caller owns it, guarding with a conditional delete."""
-    item = T_TRY.get_item(Key={"tryoutId": tryout_id}).get("Item")
+    ld = loader.current()
+    item = ld.load(T_TRY, {"tryoutId": tryout_id})
     if not item:
         return _resp(404, {"message": "Not found"})
     if item.get("ownerId") != sub:
@@ -280,6 +222,8 @@ def _delete_tryout(sub: str, tryout_id: str):
         LOGGER.error("delete_tryout error tryoutId=%s err=%s", tryout_id, exc)
         return _resp(500, {"message": "Server error"})
 
+    ld.put(T_TRY, {"tryoutId": tryout_id}, None)
+    invalidate_owner_tryouts(sub, tryout_id)
     return _resp(200, {"ok": True})
 
 
@@ -288,17 +232,7 @@ def _get_open_tryouts_by_owner(
 ):
     """Return open tryouts for a given owner with pagination."""
     qs = (event or {}).get("queryStringParameters") or {}
-    next_token = (qs.get("nextToken") or "").strip()
-
-    start_key = None
-    if next_token:
-        try:
-            import base64, json as _json
-            start_key = _json.loads(
-                base64.urlsafe_b64decode(next_token.encode("utf-8")).decode("utf-8")
-            )
-        except Exception:
-            start_key = None
+    start_key = cursor.decode((qs.get("nextToken") or "").strip(), cursor.TRYOUTS_BY_OWNER, ownerId=owner_id)
 
     params = {
         "IndexName": "ByOwner",
@@ -310,9 +244,12 @@ def _get_open_tryouts_by_owner(
     if start_key:
         params["ExclusiveStartKey"] = start_key
 
-    try:
+    def _load() -> list:
         result = T_TRY.query(**params)
-        items = [it for it in (result.get("Items") or []) if (it.get("status") or "") == "open"]
+        return [it for it in (result.get("Items") or []) if (it.get("status") or "") == "open"]
+
+    try:
+        items = OWNER_OPEN_TRYOUTS.get_or_load(owner_id, _load) if not start_key else _load()
         return _resp(200, items)
     except Exception as exc:
         LOGGER.error("owner_tryouts_query_failed err=%s", exc)
@@ -322,14 +259,20 @@ def _get_open_tryouts_by_owner(
 def _debug_tryouts():
     """Return a small, non-sensitive diagnostic payload."""
     info = {"region": _CFG.aws_region, "table": T_TRY.name}
+    budget = for_route("debug_tryouts")
     try:
-        resp = T_TRY.scan(
-            Limit=5,
-            ProjectionExpression=_TRYOUT_PROJECTION,
-            ExpressionAttributeNames=_TRYOUT_EAN,
+        page = fill_page(
+            T_TRY.scan,
+            {"ProjectionExpression": _TRYOUT_PROJECTION, "ExpressionAttributeNames": _TRYOUT_EAN},
+            limit=5,
+            key_of=lambda it: {"tryoutId": it["tryoutId"]},
+            max_reads=1,
+            time_budget_ms=budget.time_ms,
+            max_read_units=budget.read_units,
         )
-        items = resp.get("Items", []) or []
+        items = page.items
         info["sample_count"] = len(items)
+        info["read_units"] = page.read_units
         if items:
             info["sample"] = [
                 {
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
-import base64
-import json
 import logging
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from boto3.dynamodb.conditions import Attr, Key
-from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Key
 
+import cursor
 from auth import _is_promoter, _is_wrestler
 from config import HANDLE_RE, get_config
-from db.tables import T_HANDLES, T_WREST
+from db import search
+from db.budget import DeadlineExceeded, for_route
+from db.cache import PROFILE_BY_HANDLE
+from db.handles import HandleConflict, allocate_and_write
+from db.tables import T_WREST
+from db.updates import ConditionFailed, build_update, update_item
 from http_utils import _json, _now_iso, _qs, _resp
 from media import _normalize_media_key
 
@@ -19,6 +22,13 @@ CFG = get_config()
 LOG = logging.getLogger("wrestleutopia.routes.wrestlers")
 
 
+_PROFILE_FIELDS = frozenset({
+    "stageName", "firstName", "middleName", "lastName", "name", "dob",
+    "city", "region", "country", "heightIn", "weightLb", "bio", "gimmicks",
+    "socials", "experienceYears", "achievements", "photoKey", "mediaKeys", "highlights",
+})
+
+
 def _slugify_handle(stage_name: str) -> Optional[str]:
     """Convert a stage name into a lowercase, hyphenated handle."""
     s = (stage_name or "").strip().lower()
@@ -26,31 +36,6 @@ def _slugify_handle(stage_name: str) -> Optional[str]:
     return s or None
 
 
-def _safe_cursor_encode(key: Optional[Dict[str, Any]]) -> Optional[str]:
-    """Encode a Dynamo LastEvaluatedKey into an opaque cursor string."""
-    if not key:
-        return None
-    try:
-        raw = json.dumps(key, separators=(",", ":"), ensure_ascii=False)
-        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
-    except Exception:
-        return None
-
-
-def _safe_cursor_decode(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
-    """Decode an opaque cursor back into a Dynamo LastEvaluatedKey."""
-    if not cursor:
-        return None
-    try:
-        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
-        key = json.loads(raw)
-        if isinstance(key, dict):
-            return key
-    except Exception:
-        return None
-    return None
-
-
 def _bounded_limit(qs: Dict[str, str], *, default: int = 50, min_v: int = 10, max_v: int = 100) -> int:
     """Parse and bound a 'limit' query parameter for scans/queries."""
     val = (qs.get("limit") or "").strip()
@@ -63,76 +48,56 @@ def _bounded_limit(qs: Dict[str, str], *, default: int = 50, min_v: int = 10, ma
     return max(min_v, min(max_v, i))
 
 
-def _projection_for_promoter_list() -> Tuple[str, Dict[str, str]]:
-    """Return a projection expression to minimize data returned to promoters."""
-    fields = [
-        "userId", "handle", "stageName", "name",
-        "city", "#r", "country", "photoKey",
-        "gimmicks", "experienceYears",
-    ]
-    ean = {"#r": "region"}
-    proj = ", ".join(fields)
-    return proj, ean
-
-
 def _upsert_wrestler_profile(sub: str, groups: set[str], event) -> dict[str, Any]:
     """Legacy upsert for wrestler profiles (kept for backwards compatibility)."""
     if not _is_wrestler(groups):
         return _resp(403, {"message": "Wrestler role required"})
     data = _json(event) or {}
-    data["userId"] = sub
-    existing = T_WREST.get_item(Key={"userId": sub}).get("Item") or {}
-    merged = {**existing, **data}
-    if "mediaKeys" not in merged or not isinstance(merged["mediaKeys"], list):
-        merged["mediaKeys"] = existing.get("mediaKeys", [])
-    if "highlights" not in merged or not isinstance(merged["highlights"], list):
-        merged["highlights"] = existing.get("highlights", [])
-    merged.setdefault("role", "Wrestler")
-    merged.setdefault("createdAt", existing.get("createdAt") or _now_iso())
-    merged["updatedAt"] = _now_iso()
-    T_WREST.put_item(Item=merged)
+    changes = {k: v for k, v in data.items() if k in _PROFILE_FIELDS}
+    for k in ("mediaKeys", "highlights"):
+        if k in changes and not isinstance(changes[k], list):
+            del changes[k]
+    upd = build_update(
+        changes,
+        _PROFILE_FIELDS,
+        now=_now_iso(),
+        defaults={"role": "Wrestler"},
+        expected_version=data.get("version"),
+    )
+    try:
+        old = update_item(T_WREST, {"userId": sub}, upd)
+    except ConditionFailed as cf:
+        return _resp(409, {"message": "Profile changed; reload and retry", "version": cf.item.get("version")})
+    new = upd.apply(old, key={"userId": sub})
+    if new.get("handle"):
+        PROFILE_BY_HANDLE.invalidate(new["handle"])
     return _resp(200, {"ok": True, "userId": sub})
 
 
 def _list_wrestlers(groups: set[str], event) -> dict[str, Any]:
-    """List wrestlers for promoters with optional filters."""
+    """List wrestlers for promoters, filtered by style/city/region/verified via the search index."""
     if not _is_promoter(groups):
         return _resp(403, {"message": "Promoter role required to view wrestler profiles"})
     qs = _qs(event)
-    style = (qs.get("style") or "").strip()
-    city = (qs.get("city") or "").strip()
-    verified = (qs.get("verified") or "").strip().lower()
+    facets = {
+        "gimmick": qs.get("style") or "",
+        "city": qs.get("city") or "",
+        "region": qs.get("region") or "",
+    }
+    if (qs.get("verified") or "").strip().lower() in {"true", "1", "yes"}:
+        facets["verified"] = "1"
     limit = _bounded_limit(qs)
-    start_key = _safe_cursor_decode(qs.get("cursor"))
-    fe = None
+    pk = search.partition_key(search.WRESTLER, facets)
+    start_key = cursor.decode(qs.get("cursor"), cursor.SEARCH, pk=pk)
     try:
-        if style:
-            cond = Attr("gimmicks").contains(style)
-            fe = cond if fe is None else fe & cond
-        if city:
-            cond = Attr("city").contains(city)
-            fe = cond if fe is None else fe & cond
-        if verified in {"true", "1", "yes"}:
-            cond = Attr("verified_school").eq(True)
-            fe = cond if fe is None else fe & cond
-        proj, ean = _projection_for_promoter_list()
-        scan_kwargs = {
-            "Limit": limit,
-            "ProjectionExpression": proj,
-            "ExpressionAttributeNames": ean,
-        }
-        if start_key:
-            scan_kwargs["ExclusiveStartKey"] = start_key
-        if fe is not None:
-            scan_kwargs["FilterExpression"] = fe
-
-        r = T_WREST.scan(**scan_kwargs)
-        items = r.get("Items", [])
-        next_key = r.get("LastEvaluatedKey")
-        cursor = _safe_cursor_encode(next_key)
-        return _resp(200, {"items": items, "cursor": cursor})
+        items, next_key = search.query(
+            search.WRESTLER, facets, limit=limit, start_key=start_key, budget=for_route("list_wrestlers")
+        )
+        return _resp(200, {"items": items, "cursor": cursor.encode(cursor.SEARCH, next_key, pk=pk)})
+    except DeadlineExceeded:
+        raise
     except Exception as exc:
-        LOG.error("wrestlers_scan_error err=%s", exc)
+        LOG.error("wrestlers_search_error err=%s", exc)
         return _resp(500, {"message": "Server error", "where": "list_wrestlers"})
 
 
@@ -199,20 +164,7 @@ def _put_me_profile(sub: str, groups: set[str], event) -> dict[str, Any]:
     except Exception:
         exp_years = None
     achievements = (data.get("achievements") or "").strip() or None
-    existing = T_WREST.get_item(Key={"userId": sub}).get("Item") or {}
-    current_handle = (existing.get("handle") or "").strip() or None
-    raw_key = (data.get("photoKey") or "").strip()
-    norm_key = (
-        _normalize_media_key(raw_key, sub, actor="wrestler", kind="avatar")
-        if raw_key
-        else existing.get("photoKey") or None
-    )
-    now = _now_iso()
-    base_profile = {
-        "userId": sub,
-        "role": "Wrestler",
-        "updatedAt": now,
-        "createdAt": existing.get("createdAt") or now,
+    changes: Dict[str, Any] = {
         "stageName": stage,
         "firstName": first,
         "middleName": middle,
@@ -229,8 +181,10 @@ def _put_me_profile(sub: str, groups: set[str], event) -> dict[str, Any]:
         "experienceYears": exp_years,
         "achievements": achievements,
         "name": f"{first} {last}",
-        "photoKey": norm_key,
     }
+    raw_key = (data.get("photoKey") or "").strip()
+    if raw_key:
+        changes["photoKey"] = _normalize_media_key(raw_key, sub, actor="wrestler", kind="avatar")
     incoming_media = data.get("mediaKeys")
     if isinstance(incoming_media, list):
         media_keys: List[str] = []
@@ -239,82 +193,70 @@ def _put_me_profile(sub: str, groups: set[str], event) -> dict[str, Any]:
                 nk = _normalize_media_key(x, sub, actor="wrestler")
                 if nk:
                     media_keys.append(nk)
-    else:
-        media_keys = existing.get("mediaKeys", [])
+        pk = changes.get("photoKey") or ""
+        if pk and pk not in media_keys:
+            if pk.startswith(("public/wrestlers/gallery/", "public/wrestlers/images/")):
+                media_keys = [pk] + media_keys
+        changes["mediaKeys"] = media_keys
     incoming_highlights = data.get("highlights")
     if isinstance(incoming_highlights, list):
-        highlights_arr = [str(x) for x in incoming_highlights if isinstance(x, str) and x.strip()]
-    else:
-        highlights_arr = existing.get("highlights", [])
-    pk = base_profile.get("photoKey") or ""
-    if pk and pk not in media_keys:
-        if pk.startswith(("public/wrestlers/gallery/", "public/wrestlers/images/")):
-            media_keys = [pk] + media_keys
-    item_out = {
-        **existing,
-        **base_profile,
-        "mediaKeys": media_keys,
-        "highlights": highlights_arr,
-    }
+        changes["highlights"] = [str(x) for x in incoming_highlights if isinstance(x, str) and x.strip()]
 
-    def _reserve_handle(owner: str, h: str) -> bool:
-        """Reserve a handle idempotently for an owner."""
+    upd = build_update(
+        changes,
+        _PROFILE_FIELDS,
+        now=_now_iso(),
+        defaults={"role": "Wrestler"},
+        expected_version=data.get("version"),
+    )
+    try:
+        old = update_item(T_WREST, {"userId": sub}, upd, condition="attribute_exists(handle)")
+    except ConditionFailed as cf:
+        old = cf.item
+        if old.get("handle"):
+            return _resp(409, {"message": "Profile changed; reload and retry", "version": old.get("version")})
+        desired = _slugify_handle(stage) or "wrestler"
         try:
-            T_HANDLES.put_item(
-                Item={"handle": h, "owner": owner},
-                ConditionExpression="attribute_not_exists(handle) OR #owner = :u",
-                ExpressionAttributeNames={"#owner": "owner"},
-                ExpressionAttributeValues={":u": owner},
-            )
-            return True
-        except ClientError as exc:
-            code = exc.response.get("Error", {}).get("Code")
-            if code in ("ConditionalCheckFailedException", "TransactionCanceledException"):
-                return False
-            raise
+            upd = upd.with_sets(handle=allocate_and_write(desired, sub, upd))
+        except HandleConflict:
+            LOG.warning("handle_allocation_exhausted user=%s base=%s", sub, desired)
+            return _resp(409, {"message": "Could not reserve a handle; please retry"})
+        except ConditionFailed:
+            return _resp(409, {"message": "Profile changed; reload and retry"})
 
-    def _pick_unique_handle(base: str, owner: str) -> str:
-        """Pick a unique handle by trying base, then fallbacks."""
-        base_slug = _slugify_handle(base) or "wrestler"
-        for i in range(0, 50):
-            h = base_slug if i == 0 else f"{base_slug}-{i + 1}"
-            if _reserve_handle(owner, h):
-                return h
-        fallback = f"u-{owner[:8].lower()}"
-        if _reserve_handle(owner, fallback):
-            return fallback
-        import random
-        import string
-        for _ in range(20):
-            rnd = "".join(random.choice(string.ascii_lowercase + string.digits) for _ in range(4))
-            h = f"{fallback}-{rnd}"
-            if _reserve_handle(owner, h):
-                return h
-        return fallback
-
-    if current_handle:
-        item_out["handle"] = current_handle
-    else:
-        desired = _slugify_handle(stage) or "wrestler"
-        item_out["handle"] = _pick_unique_handle(desired, sub)
-    T_WREST.put_item(Item=item_out)
+    item_out = upd.apply(old, key={"userId": sub})
+    PROFILE_BY_HANDLE.invalidate(item_out["handle"])
+    item_out.setdefault("mediaKeys", [])
+    item_out.setdefault("highlights", [])
     return _resp(200, item_out)
 
 
+def _get_own_profile(sub: str, ids: Dict[str, str]) -> dict[str, Any]:
+    """Return the caller's own wrestler item with list defaults and correlation IDs."""
+    item = T_WREST.get_item(Key={"userId": sub}).get("Item") or {}
+    item.setdefault("mediaKeys", [])
+    item.setdefault("highlights", [])
+    return _resp(200, {**item, **ids})
+
+
 def _get_profile_by_handle(handle: str) -> dict[str, Any]:
-    """Fetch a wrestler profile by handle using GSI 'ByHandle'."""
+    """Fetch a wrestler profile by handle using GSI 'ByHandle' (read-through cached)."""
     if not handle:
         return _resp(400, {"message": "handle required"})
-    try:
+
+    def _load() -> Optional[dict[str, Any]]:
         r = T_WREST.query(
             IndexName="ByHandle",
             KeyConditionExpression=Key("handle").eq(handle),
             Limit=1,
         )
         items = r.get("Items") or []
-        if not items:
+        return items[0] if items else None
+
+    try:
+        item = PROFILE_BY_HANDLE.get_or_load(handle, _load)
+        if not item:
             return _resp(404, {"message": "Not found"})
-        item = items[0]
         item.setdefault("mediaKeys", [])
         item.setdefault("highlights", [])
         return _resp(200, item)
@@ -0,0 +1,56 @@
+"""
+DynamoDB Streams consumer for the wrestlers and promoters tables.
+
+Keeps the ProfileSearch index (see ``db.search``) in step with every
+profile write, whoever makes it: the API, the post-confirmation Lambda
+that creates profiles at signup, or a manual edit. It ships in the API
+bundle and runs as its own function (handler ``search_sync.lambda_handler``)
+with ReportBatchItemFailures enabled.
+
+The stream starts at LATEST, so profiles written before the function was
+deployed are indexed by the backfill (``python -m db.search``); run it
+after deploying this function and before the listing routes read the index.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional
+
+import config
+from db import search
+from log import get_logger
+
+_LOG = get_logger("search_sync")
+
+
+def _image(rec: Mapping[str, Any], which: str) -> Optional[Dict[str, Any]]:
+    raw = (rec.get("dynamodb") or {}).get(which)
+    return {k: config._DESERIALIZER.deserialize(v) for k, v in raw.items()} if raw else None
+
+
+def _kind(rec: Mapping[str, Any]) -> Optional[str]:
+    """Profile kind from the record's source table (ARN ``...:table/<name>/stream/<label>``)."""
+    cfg = config.get_config()
+    table = str(rec.get("eventSourceARN") or "").split(":table/", 1)[-1].split("/", 1)[0]
+    return {cfg.table_wrestlers: search.WRESTLER, cfg.table_promoters: search.PROMOTER}.get(table)
+
+
+def lambda_handler(event: Mapping[str, Any], _ctx: Any) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Apply each profile change to the index in stream order.
+
+    A batch comes from one shard, so the first failure is reported and the
+    rest of the batch is left for the retry, which keeps changes to the same
+    profile in order.
+    """
+    for rec in event.get("Records") or []:
+        kind = _kind(rec)
+        if kind is None:
+            _LOG.warning("search_sync_unknown_source arn=%s", rec.get("eventSourceARN"))
+            continue
+        old, new = _image(rec, "OldImage"), _image(rec, "NewImage")
+        try:
+            search.sync_profile(kind, old, new)
+        except Exception as exc:  # noqa: BLE001
+            _LOG.error("search_sync_failed kind=%s user=%s err=%s", kind, (new or old or {}).get("userId"), exc)
+            return {"batchItemFailures": [{"itemIdentifier": rec["dynamodb"]["SequenceNumber"]}]}
+    return {"batchItemFailures": []}
@@ -66,6 +66,35 @@ resource "aws_dynamodb_table" "profile_handles" {
   stream_view_type = "NEW_AND_OLD_IMAGES"
 }
 
+#############################
+# Profile Search Index (facet partitions, maintained by the API on profile writes)
+#############################
+
+resource "aws_dynamodb_table" "profile_search" {
+  name         = "${var.project_name}-ProfileSearch"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "pk"
+  range_key    = "sk"
+
+  attribute {
+    name = "pk"
+    type = "S"
+  }
+
+  attribute {
+    name = "sk"
+    type = "S"
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+}
+
 #############################
 # Promoter Profiles
 #############################
@@ -119,6 +148,14 @@ resource "aws_dynamodb_table" "tryouts" {
     name = "date"
     type = "S"
   }
+  attribute {
+    name = "feedBucket"
+    type = "S"
+  }
+  attribute {
+    name = "feedSort"
+    type = "S"
+  }
 
   global_secondary_index {
     name            = "ByOwner"
@@ -133,6 +170,14 @@ resource "aws_dynamodb_table" "tryouts" {
     projection_type = "ALL"
   }
 
+  # Sparse: only open, dated tryouts carry feedBucket ("YYYY-MM#<shard>").
+  global_secondary_index {
+    name            = "OpenFeed"
+    hash_key        = "feedBucket"
+    range_key       = "feedSort"
+    projection_type = "ALL"
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -373,9 +373,11 @@ resource "aws_iam_policy" "api_dynamo_policy" {
         "dynamodb:BatchGetItem",
         "dynamodb:UpdateItem",
         "dynamodb:DeleteItem",
+        "dynamodb:BatchWriteItem",
         "dynamodb:Query",
         "dynamodb:Scan",
         "dynamodb:TransactWriteItems",
+        "dynamodb:TransactGetItems",
         "dynamodb:ConditionCheckItem",
         "dynamodb:DescribeTable"
       ],
@@ -387,7 +389,8 @@ resource "aws_iam_policy" "api_dynamo_policy" {
         aws_dynamodb_table.applications.arn,
         "${aws_dynamodb_table.applications.arn}/index/*",
         aws_dynamodb_table.profile_handles.arn,
-        "${aws_dynamodb_table.wrestlers.arn}/index/*"
+        "${aws_dynamodb_table.wrestlers.arn}/index/*",
+        aws_dynamodb_table.profile_search.arn
       ]
     }]
   })
@@ -445,6 +448,110 @@ resource "aws_lambda_permission" "api_invoke" {
   source_arn    = "${aws_apigatewayv2_api.http.execution_arn}/*/*"
 }
 
+#############################
+# Lambda IAM — Applicant Sync (Wrestlers stream)
+#############################
+
+resource "aws_iam_role" "applicant_sync_role" {
+  name               = "${var.project_name}-applicant-sync-role"
+  assume_role_policy = data.aws_iam_policy_document.assume_lambda.json
+}
+
+resource "aws_iam_policy" "applicant_sync_policy" {
+  name        = "${var.project_name}-applicant-sync"
+  description = "Read the WrestlerProfiles stream and refresh applicant summaries on Applications"
+  policy = jsonencode({
+    Version = "2012-10-17",
+    Statement = [
+      {
+        Sid    = "ReadWrestlersStream",
+        Effect = "Allow",
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ],
+        Resource = aws_dynamodb_table.wrestlers.stream_arn
+      },
+      {
+        Sid      = "UpdateApplications",
+        Effect   = "Allow",
+        Action   = ["dynamodb:Query", "dynamodb:UpdateItem"],
+        Resource = [aws_dynamodb_table.applications.arn, "${aws_dynamodb_table.applications.arn}/index/ByApplicant"]
+      },
+      {
+        Sid      = "SendToDLQ",
+        Effect   = "Allow",
+        Action   = ["sqs:SendMessage"],
+        Resource = aws_sqs_queue.applicant_sync_dlq.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "applicant_sync_logs_attach" {
+  role       = aws_iam_role.applicant_sync_role.name
+  policy_arn = aws_iam_policy.lambda_logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "applicant_sync_attach" {
+  role       = aws_iam_role.applicant_sync_role.name
+  policy_arn = aws_iam_policy.applicant_sync_policy.arn
+}
+
+#############################
+# Lambda IAM — Search Sync (Profile streams)
+#############################
+
+resource "aws_iam_role" "search_sync_role" {
+  name               = "${var.project_name}-search-sync-role"
+  assume_role_policy = data.aws_iam_policy_document.assume_lambda.json
+}
+
+resource "aws_iam_policy" "search_sync_policy" {
+  name        = "${var.project_name}-search-sync"
+  description = "Read the profile table streams and maintain the ProfileSearch index"
+  policy = jsonencode({
+    Version = "2012-10-17",
+    Statement = [
+      {
+        Sid    = "ReadProfileStreams",
+        Effect = "Allow",
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ],
+        Resource = [aws_dynamodb_table.wrestlers.stream_arn, aws_dynamodb_table.promoters.stream_arn]
+      },
+      {
+        Sid      = "WriteSearchIndex",
+        Effect   = "Allow",
+        Action   = ["dynamodb:BatchWriteItem"],
+        Resource = aws_dynamodb_table.profile_search.arn
+      },
+      {
+        Sid      = "SendToDLQ",
+        Effect   = "Allow",
+        Action   = ["sqs:SendMessage"],
+        Resource = aws_sqs_queue.search_sync_dlq.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "search_sync_logs_attach" {
+  role       = aws_iam_role.search_sync_role.name
+  policy_arn = aws_iam_policy.lambda_logs.arn
+}
+
+resource "aws_iam_role_policy_attachment" "search_sync_attach" {
+  role       = aws_iam_role.search_sync_role.name
+  policy_arn = aws_iam_policy.search_sync_policy.arn
+}
+
 #############################
 # Lambda IAM — Presign (S3 PUT)
 #############################
@@ -56,6 +56,13 @@ resource "aws_lambda_function" "cognito_cleanup" {
 # API (CRUD)
 #############################
 
+# HMAC key for pagination cursors. Set the old value as CURSOR_SECRET_PREVIOUS
+# on the function while rotating so cursors already handed out keep working.
+resource "random_password" "cursor_secret" {
+  length  = 48
+  special = false
+}
+
 resource "aws_lambda_function" "api" {
   function_name    = "${var.project_name}-api"
   filename         = "${path.module}/artifacts/scripts/api/api.zip"
@@ -65,22 +72,137 @@ resource "aws_lambda_function" "api" {
   role             = aws_iam_role.api_lambda_role.arn
   timeout          = 15
 
+  environment {
+    variables = {
+      TABLE_WRESTLERS   = aws_dynamodb_table.wrestlers.name
+      TABLE_PROMOTERS   = aws_dynamodb_table.promoters.name
+      TABLE_TRYOUTS     = aws_dynamodb_table.tryouts.name
+      TABLE_APPS        = aws_dynamodb_table.applications.name
+      MEDIA_BUCKET      = aws_s3_bucket.media_bucket.bucket
+      TABLE_HANDLES     = aws_dynamodb_table.profile_handles.name
+      TABLE_SEARCH      = aws_dynamodb_table.profile_search.name
+      ENVIRONMENT       = var.environment
+      LOG_LEVEL         = var.environment == "prod" ? "ERROR" : "DEBUG"
+      METRICS_NAMESPACE = "WrestleUtopia/Api"
+      CURSOR_SECRET     = random_password.cursor_secret.result
+      API_ASYNC         = "0"
+    }
+  }
+
+  tracing_config { mode = "Active" }
+}
+
+#############################
+# Applicant Sync (Wrestlers stream -> Applications)
+#############################
+
+resource "aws_lambda_function" "applicant_sync" {
+  function_name    = "${var.project_name}-applicant-sync"
+  filename         = "${path.module}/artifacts/scripts/api/api.zip"
+  source_code_hash = filebase64sha256("${path.module}/artifacts/scripts/api/api.zip")
+  handler          = "applicant_sync.lambda_handler"
+  runtime          = "python3.12"
+  role             = aws_iam_role.applicant_sync_role.arn
+  timeout          = 60
+
+  environment {
+    variables = {
+      TABLE_WRESTLERS = aws_dynamodb_table.wrestlers.name
+      TABLE_PROMOTERS = aws_dynamodb_table.promoters.name
+      TABLE_TRYOUTS   = aws_dynamodb_table.tryouts.name
+      TABLE_APPS      = aws_dynamodb_table.applications.name
+      TABLE_HANDLES   = aws_dynamodb_table.profile_handles.name
+      TABLE_SEARCH    = aws_dynamodb_table.profile_search.name
+      ENVIRONMENT     = var.environment
+      LOG_LEVEL       = var.environment == "prod" ? "ERROR" : "DEBUG"
+      METRICS_ENABLED = "0"
+    }
+  }
+
+  tracing_config { mode = "Active" }
+}
+
+resource "aws_lambda_event_source_mapping" "wrestlers_to_applicant_sync" {
+  event_source_arn                   = aws_dynamodb_table.wrestlers.stream_arn
+  function_name                      = aws_lambda_function.applicant_sync.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 5
+  maximum_retry_attempts             = 5
+  bisect_batch_on_function_error     = true
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.applicant_sync_dlq.arn
+    }
+  }
+}
+
+#############################
+# Search Sync (Profile streams -> ProfileSearch)
+#############################
+
+resource "aws_lambda_function" "search_sync" {
+  function_name    = "${var.project_name}-search-sync"
+  filename         = "${path.module}/artifacts/scripts/api/api.zip"
+  source_code_hash = filebase64sha256("${path.module}/artifacts/scripts/api/api.zip")
+  handler          = "search_sync.lambda_handler"
+  runtime          = "python3.12"
+  role             = aws_iam_role.search_sync_role.arn
+  timeout          = 60
+
   environment {
     variables = {
       TABLE_WRESTLERS = aws_dynamodb_table.wrestlers.name
       TABLE_PROMOTERS = aws_dynamodb_table.promoters.name
       TABLE_TRYOUTS   = aws_dynamodb_table.tryouts.name
       TABLE_APPS      = aws_dynamodb_table.applications.name
-      MEDIA_BUCKET    = aws_s3_bucket.media_bucket.bucket
       TABLE_HANDLES   = aws_dynamodb_table.profile_handles.name
+      TABLE_SEARCH    = aws_dynamodb_table.profile_search.name
       ENVIRONMENT     = var.environment
       LOG_LEVEL       = var.environment == "prod" ? "ERROR" : "DEBUG"
+      METRICS_ENABLED = "0"
     }
   }
 
   tracing_config { mode = "Active" }
 }
 
+resource "aws_lambda_event_source_mapping" "wrestlers_to_search_sync" {
+  event_source_arn                   = aws_dynamodb_table.wrestlers.stream_arn
+  function_name                      = aws_lambda_function.search_sync.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 5
+  maximum_retry_attempts             = 5
+  bisect_batch_on_function_error     = true
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.search_sync_dlq.arn
+    }
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "promoters_to_search_sync" {
+  event_source_arn                   = aws_dynamodb_table.promoters.stream_arn
+  function_name                      = aws_lambda_function.search_sync.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 5
+  maximum_retry_attempts             = 5
+  bisect_batch_on_function_error     = true
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.search_sync_dlq.arn
+    }
+  }
+}
+
 #############################
 # Presign (S3 PUT Signer)
 #############################
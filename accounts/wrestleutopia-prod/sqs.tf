@@ -9,4 +9,14 @@ resource "aws_sqs_queue" "imgproc_dlq" {
 resource "aws_sqs_queue" "image_processor_dlq" {
   name                      = "${var.project_name}-image-processor-dlq"
   message_retention_seconds = 1209600
-}
\ No newline at end of file
+}
+
+resource "aws_sqs_queue" "applicant_sync_dlq" {
+  name                      = "${var.project_name}-applicant-sync-dlq"
+  message_retention_seconds = 1209600
+}
+
+resource "aws_sqs_queue" "search_sync_dlq" {
+  name                      = "${var.project_name}-search-sync-dlq"
+  message_retention_seconds = 1209600
+}
@@ -1,6 +1,11 @@
+import hashlib
 import logging
+import math
 import os
-from typing import Any, Dict
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
 
 import boto3
 import botocore
@@ -10,6 +15,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 NOT_FOUND_ERROR_CODE = "404"
+NO_SUCH_KEY_ERROR_CODE = "NoSuchKey"
 
 MARKER_PREFIX = "post_markers"
 
@@ -20,13 +26,222 @@ except KeyError as exc:
         "IDEMPOTENCY_BUCKET environment variable is not set."
     ) from exc
 
+SEEN_CACHE_SIZE = int(os.getenv("SEEN_CACHE_SIZE", "256"))
+BLOOM_SNAPSHOT_KEY = os.getenv("BLOOM_SNAPSHOT_KEY", "").strip()
+BLOOM_CAPACITY = int(os.getenv("BLOOM_CAPACITY", "50000"))
+BLOOM_ERROR_RATE = float(os.getenv("BLOOM_ERROR_RATE", "0.000001"))
+BLOOM_REFRESH_SECONDS = int(os.getenv("BLOOM_REFRESH_SECONDS", "900"))
+
 S3_CLIENT = boto3.client("s3")
 
 
+class BloomFilter:
+    """
+    Compact, fixed-size Bloom filter over post IDs.
+
+    Negative answers are exact; positive answers are wrong with a probability
+    bounded by the error rate the filter was sized for. The serialized form is
+    a 12-byte header (bit count, hash count, item count) followed by the bits.
+    """
+
+    _HEADER = struct.Struct(">IIi")
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None,
+                 count: int = 0) -> None:
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """
+        Build an empty filter sized for *capacity* items at *error_rate*.
+
+        Args:
+            capacity (int): Expected number of distinct post IDs.
+            error_rate (float): Target false-positive probability.
+
+        Returns:
+            BloomFilter: An empty filter.
+        """
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        return cls(num_bits, num_hashes)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "BloomFilter":
+        """
+        Rebuild a filter from the bytes produced by :meth:`to_bytes`.
+
+        Raises:
+            ValueError: If the blob is truncated or the header is inconsistent.
+        """
+        if len(blob) < cls._HEADER.size:
+            raise ValueError("Bloom snapshot is truncated.")
+        num_bits, num_hashes, count = cls._HEADER.unpack_from(blob)
+        bits = bytearray(blob[cls._HEADER.size:])
+        if num_hashes < 1 or len(bits) != (num_bits + 7) // 8:
+            raise ValueError("Bloom snapshot header does not match its payload.")
+        return cls(num_bits, num_hashes, bits, count)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the filter for storage in S3."""
+        return self._HEADER.pack(self.num_bits, self.num_hashes, self.count) + bytes(self.bits)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        h1, h2 = struct.unpack_from(">QQ", digest)
+        h2 |= 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """Add *item* to the filter."""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def same_shape(self, other: "BloomFilter") -> bool:
+        """True if *other* uses the same bit and hash counts, so the two can be merged."""
+        return self.num_bits == other.num_bits and self.num_hashes == other.num_hashes
+
+    def covers(self, other: "BloomFilter") -> bool:
+        """True if every bit set in *other* is also set here."""
+        mine = int.from_bytes(self.bits, "big")
+        return int.from_bytes(other.bits, "big") & ~mine == 0
+
+    def merge(self, other: "BloomFilter") -> None:
+        """
+        Set every bit that is set in *other* (a filter of the same shape).
+
+        The item count becomes the larger of the two, so after a merge it is
+        a lower bound.
+        """
+        merged = int.from_bytes(self.bits, "big") | int.from_bytes(other.bits, "big")
+        self.bits = bytearray(merged.to_bytes(len(self.bits), "big"))
+        self.count = max(self.count, other.count)
+
+
+class SeenPostFilter:
+    """
+    Warm-container pre-filter in front of the S3 marker store.
+
+    Post IDs confirmed as seen are kept in a bounded LRU. When a Bloom snapshot
+    key is configured, the snapshot is loaded at cold start and refreshed every
+    ``refresh_seconds``. Only IDs that miss both structures need a round trip
+    to S3.
+
+    New IDs go into the in-memory filter and are written back on the refresh
+    cadence: the stored snapshot is re-read, merged with the local bits, and
+    saved only if it was missing some of them. A container whose write was
+    overwritten by another one finds its bits missing at its next refresh and
+    writes them again. IDs that never reach the snapshot only cost a HEAD,
+    because the marker objects stay authoritative.
+    """
+
+    def __init__(self, s3_client: Any, bucket: str, cache_size: int,
+                 snapshot_key: str = "", refresh_seconds: int = 900) -> None:
+        self._s3 = s3_client
+        self._bucket = bucket
+        self._cache_size = max(0, cache_size)
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._snapshot_key = snapshot_key
+        self._refresh_seconds = refresh_seconds
+        self._bloom: Optional[BloomFilter] = None
+        self._loaded_at = 0.0
+
+    def remember(self, post_id: str) -> None:
+        """Record *post_id* as seen in the LRU (and the in-memory Bloom filter)."""
+        if self._cache_size:
+            self._lru[post_id] = None
+            self._lru.move_to_end(post_id)
+            while len(self._lru) > self._cache_size:
+                self._lru.popitem(last=False)
+        if self._bloom is not None and post_id not in self._bloom:
+            self._bloom.add(post_id)
+
+    def seen(self, post_id: str) -> Optional[str]:
+        """
+        Answer locally whether *post_id* has been seen before.
+
+        Returns:
+            Optional[str]: ``"lru"`` or ``"bloom"`` naming the structure that
+            matched, or None if the authoritative store must be consulted.
+        """
+        if post_id in self._lru:
+            self._lru.move_to_end(post_id)
+            return "lru"
+
+        self._maybe_refresh()
+        if self._bloom is not None and post_id in self._bloom:
+            self.remember(post_id)
+            return "bloom"
+        return None
+
+    def _maybe_refresh(self) -> None:
+        if not self._snapshot_key:
+            return
+        if self._bloom is not None and time.monotonic() - self._loaded_at < self._refresh_seconds:
+            return
+        self._loaded_at = time.monotonic()
+
+        try:
+            obj = self._s3.get_object(Bucket=self._bucket, Key=self._snapshot_key)
+            fresh = BloomFilter.from_bytes(obj["Body"].read())
+        except botocore.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] not in (NO_SUCH_KEY_ERROR_CODE, NOT_FOUND_ERROR_CODE):
+                logger.warning("Could not load Bloom snapshot: %s", error)
+                return
+            fresh = BloomFilter.for_capacity(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+            logger.info("No Bloom snapshot at %s; starting an empty one.", self._snapshot_key)
+        except ValueError as error:
+            logger.warning("Discarding corrupt Bloom snapshot: %s", error)
+            fresh = BloomFilter.for_capacity(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+
+        local = self._bloom
+        stale = local is not None and fresh.same_shape(local) and not fresh.covers(local)
+        if stale:
+            fresh.merge(local)
+        for post_id in self._lru:
+            if post_id not in fresh:
+                fresh.add(post_id)
+        self._bloom = fresh
+        logger.info("Bloom snapshot loaded with %d item(s).", fresh.count)
+        if stale:
+            self._persist()
+
+    def _persist(self) -> None:
+        try:
+            self._s3.put_object(
+                Bucket=self._bucket,
+                Key=self._snapshot_key,
+                Body=self._bloom.to_bytes(),
+                ContentType="application/octet-stream",
+            )
+        except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as error:
+            logger.warning("Could not persist Bloom snapshot: %s", error)
+
+
+SEEN_FILTER = SeenPostFilter(
+    S3_CLIENT,
+    BUCKET_NAME,
+    SEEN_CACHE_SIZE,
+    snapshot_key=BLOOM_SNAPSHOT_KEY,
+    refresh_seconds=BLOOM_REFRESH_SECONDS,
+)
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda entry point to process an incoming event. It checks for
     the existence of a marker file in S3 for idempotent handling of a post.
+    IDs already seen by this container (or present in the Bloom snapshot)
+    are answered without contacting S3.
 
     Args:
         event (dict): The event data passed by AWS Lambda. Must contain a
@@ -47,12 +262,18 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.warning("No 'post_id' provided in the event.")
         return {"status": "error", "message": "No post_id provided"}
 
+    source = SEEN_FILTER.seen(post_id)
+    if source:
+        logger.info("Duplicate post_id=%s. Answered from %s.", post_id, source)
+        return {"status": "duplicate", "post_id": post_id}
+
     marker_key = f"{MARKER_PREFIX}/{post_id}.marker"
     logger.info("Checking marker: %s in bucket: %s", marker_key, BUCKET_NAME)
 
     try:
         S3_CLIENT.head_object(Bucket=BUCKET_NAME, Key=marker_key)
         logger.info("Duplicate post_id=%s. Marker file found.", post_id)
+        SEEN_FILTER.remember(post_id)
         return {"status": "duplicate", "post_id": post_id}
     except botocore.exceptions.ClientError as error:
         if error.response["Error"]["Code"] == NOT_FOUND_ERROR_CODE:
@@ -64,6 +285,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 Key=marker_key,
                 Body=b""
             )
+            SEEN_FILTER.remember(post_id)
             return {"status": "post_found", "post_id": post_id}
 
         logger.error(
@@ -33,14 +33,6 @@ resource "aws_iam_role_policy_attachment" "lambda_s3_full_access" {
   policy_arn = aws_iam_policy.s3_full_policy.arn
 }
 
-resource "aws_lambda_permission" "allow_sns_invoke" {
-  statement_id  = "AllowExecutionFromSNS"
-  action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.sns_to_teams.function_name
-  principal     = "sns.amazonaws.com"
-  source_arn    = aws_sns_topic.monitoring_topic.arn
-}
-
 resource "aws_iam_role_policy_attachment" "lambda_insights_policy" {
   role       = aws_iam_role.lambda_role.name
   policy_arn = "arn:aws:iam::aws:policy/CloudWatchLambdaInsightsExecutionRolePolicy"
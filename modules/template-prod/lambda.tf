@@ -44,6 +44,7 @@ resource "aws_lambda_function" "check_duplicate" {
   environment {
     variables = {
       IDEMPOTENCY_BUCKET = var.s3_bucket_name
+      BLOOM_SNAPSHOT_KEY = "post_filters/seen.bloom"
     }
   }
 
@@ -71,7 +72,7 @@ resource "aws_lambda_function" "notify_post" {
   handler          = "lambda_function.lambda_handler"
   runtime          = "python3.9"
   role             = aws_iam_role.lambda_role.arn
-  timeout          = 5
+  timeout          = 30
 
   environment {
     variables = {
@@ -81,7 +82,6 @@ resource "aws_lambda_function" "notify_post" {
   }
 
   layers = [
-    "arn:aws:lambda:us-east-2:825765422855:layer:Python_Requests:1",
     "arn:aws:lambda:us-east-2:580247275435:layer:LambdaInsightsExtension:14"
   ]
 
@@ -105,7 +105,7 @@ resource "aws_lambda_function" "sns_to_teams" {
   role             = aws_iam_role.lambda_role.arn
   filename         = "${path.module}/artifacts/scripts/sns_to_teams/sns_to_teams.zip"
   source_code_hash = filebase64sha256("${path.module}/artifacts/scripts/sns_to_teams/sns_to_teams.zip")
-  timeout          = 5
+  timeout          = 30
 
   environment {
     variables = {
@@ -121,3 +121,15 @@ resource "aws_lambda_function" "sns_to_teams" {
     mode = "Active"
   }
 }
+
+resource "aws_lambda_event_source_mapping" "sns_to_teams_digest" {
+  event_source_arn                   = aws_sqs_queue.alarm_digest_queue.arn
+  function_name                      = aws_lambda_function.sns_to_teams.arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 60
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  scaling_config {
+    maximum_concurrency = 2
+  }
+}
@@ -46,4 +46,17 @@ resource "aws_s3_bucket_lifecycle_configuration" "media_bucket_lifecycle" {
       days = 7
     }
   }
+
+  rule {
+    id = "expire_old_post_filter_snapshots"
+    filter {
+      prefix = "post_filters/"
+    }
+
+    status = "Enabled"
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
 }
@@ -0,0 +1,189 @@
+"""
+Cold-start budget check for the wrestleutopia API Lambda.
+
+Imports ``app`` in fresh interpreters under ``-X importtime`` (the same
+report Lambda prints when PYTHONPROFILEIMPORTTIME=1 is set on the
+function), dispatches one ``/health`` request, and compares the result with
+``baseline.json``:
+
+* modules listed under ``forbidden`` (boto3/botocore by default) may not be
+  imported by INIT or by the ``/health`` request;
+* INIT may not load API modules (files under the Lambda's source directory)
+  beyond the ``app_modules`` recorded in the baseline;
+* INIT time (median over ``--rounds``) may not exceed the baseline by more
+  than ``--tolerance`` (relative) plus ``--slack-ms`` (absolute). Timings
+  depend on the interpreter and machine, so this check only runs when the
+  baseline's ``interpreter`` matches the one running the check.
+
+The total number of modules loaded at INIT is reported but not gated: it
+varies with the Python version and with optional packages (orjson, ...).
+
+Exits 1 on any regression so it can gate CI. The slowest imports by
+cumulative time are printed either way.
+
+Usage::
+
+    python tools/api_init_budget/api_init_budget.py [--rounds N] [--json]
+    python tools/api_init_budget/api_init_budget.py --update-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+API_DIR = REPO_ROOT / "accounts" / "wrestleutopia-prod" / "artifacts" / "scripts" / "api"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+DEFAULT_FORBIDDEN = ["boto3", "botocore", "s3transfer"]
+
+FAKE_ENV = {
+    "ENVIRONMENT": "test",
+    "AWS_REGION": "us-east-2",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "TABLE_WRESTLERS": "bench-WrestlerProfiles",
+    "TABLE_PROMOTERS": "bench-PromoterProfiles",
+    "TABLE_TRYOUTS": "bench-Tryouts",
+    "TABLE_APPS": "bench-Applications",
+    "TABLE_HANDLES": "bench-ProfileHandles",
+    "TABLE_SEARCH": "bench-ProfileSearch",
+    "LOG_LEVEL": "ERROR",
+}
+
+# Runs inside the child interpreter: time INIT, dispatch /health, report.
+CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import app
+init_ms = (time.perf_counter() - t0) * 1000
+init_modules = set(sys.modules)
+here = os.getcwd() + os.sep
+app_modules = sorted(n for n in init_modules if str(getattr(sys.modules[n], "__file__", None) or "").startswith(here))
+claims = {"sub": "bench", "token_use": "id", "exp": int(time.time()) + 300, "cognito:groups": ["wrestlers"]}
+event = {"rawPath": "/health", "headers": {},
+         "requestContext": {"requestId": "bench", "http": {"method": "GET"}, "authorizer": {"jwt": {"claims": claims}}}}
+t1 = time.perf_counter()
+status = app.lambda_handler(event, None)["statusCode"]
+health_ms = (time.perf_counter() - t1) * 1000
+print(json.dumps({"init_ms": init_ms, "health_ms": health_ms, "status": status, "app_modules": app_modules,
+                  "init_modules": sorted(init_modules), "health_modules": sorted(set(sys.modules) - init_modules)}))
+"""
+
+
+def interpreter() -> str:
+    """Identify what the timings were measured on, e.g. 'cpython-3.12/linux-x86_64'."""
+    impl = sys.implementation.name
+    return f"{impl}-{sys.version_info[0]}.{sys.version_info[1]}/{sys.platform}-{platform.machine()}"
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Return (module, cumulative_us) pairs from a -X importtime report."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[1].isdigit():
+            out.append((parts[2].strip(), int(parts[1])))
+    return out
+
+
+def run_once() -> Dict[str, Any]:
+    env = {**os.environ, **FAKE_ENV, "PYTHONPATH": str(API_DIR), "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=API_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"child failed ({proc.returncode}):\n{proc.stderr[-4000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = _parse_importtime(proc.stderr)
+    return result
+
+
+def measure(rounds: int) -> Dict[str, Any]:
+    runs = [run_once() for _ in range(max(1, rounds))]
+    last = runs[-1]
+    top = sorted(last["imports"], key=lambda x: x[1], reverse=True)[:15]
+    return {
+        "init_ms": statistics.median(r["init_ms"] for r in runs),
+        "health_ms": statistics.median(r["health_ms"] for r in runs),
+        "health_status": last["status"],
+        "init_module_count": len(last["init_modules"]),
+        "app_modules": last["app_modules"],
+        "interpreter": interpreter(),
+        "init_modules": last["init_modules"],
+        "health_modules": last["health_modules"],
+        "top_imports_ms": [(name, round(us / 1000, 1)) for name, us in top],
+    }
+
+
+def check(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, slack_ms: float) -> List[str]:
+    problems = []
+    forbidden = baseline.get("forbidden", DEFAULT_FORBIDDEN)
+    for phase in ("init_modules", "health_modules"):
+        loaded = {m.split(".")[0] for m in result[phase]}
+        for name in forbidden:
+            if name in loaded:
+                problems.append(f"{name} imported during {phase.split('_')[0]}")
+    if result["health_status"] != 200:
+        problems.append(f"/health returned {result['health_status']}")
+    if "app_modules" in baseline:
+        extra = sorted(set(result["app_modules"]) - set(baseline["app_modules"]))
+        if extra:
+            problems.append(f"INIT loads API modules not in the baseline: {', '.join(extra)}")
+    if "init_ms" in baseline and baseline.get("interpreter") == result["interpreter"]:
+        budget = baseline["init_ms"] * (1 + tolerance) + slack_ms
+        if result["init_ms"] > budget:
+            problems.append(f"INIT {result['init_ms']:.1f}ms over budget {budget:.1f}ms (baseline {baseline['init_ms']:.1f}ms)")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative INIT growth (default 0.25)")
+    ap.add_argument("--slack-ms", type=float, default=15.0, help="absolute INIT slack for noisy runners")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    result = measure(args.rounds)
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+
+    if args.update_baseline:
+        baseline = {
+            "interpreter": result["interpreter"],
+            "init_ms": round(result["init_ms"], 1),
+            "app_modules": result["app_modules"],
+            "forbidden": baseline.get("forbidden", DEFAULT_FORBIDDEN),
+        }
+        BASELINE.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"baseline updated: {BASELINE}")
+        return 0
+
+    problems = check(result, baseline, args.tolerance, args.slack_ms)
+    if args.json:
+        print(json.dumps({**{k: v for k, v in result.items() if not k.endswith("_modules")}, "problems": problems}, indent=2))
+    else:
+        print(f"INIT {result['init_ms']:.1f}ms  /health {result['health_ms']:.2f}ms  modules {result['init_module_count']}")
+        for name, ms in result["top_imports_ms"]:
+            print(f"  {ms:8.1f}ms  {name}")
+        if baseline.get("interpreter") != result["interpreter"]:
+            print(f"note: INIT time not compared (baseline from {baseline.get('interpreter') or 'unknown'}, "
+                  f"running {result['interpreter']})")
+        for p in problems:
+            print(f"FAIL: {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
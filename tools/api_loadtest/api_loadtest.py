@@ -0,0 +1,526 @@
+"""
+Load test for the wrestleutopia API against a local DynamoDB.
+
+Starts a DynamoDB stand-in (a moto server, or an already running DynamoDB
+Local), creates the tables as ``dynamodb.tf`` defines them, seeds
+realistic volumes (10k wrestlers with their handle and search rows, 200
+promoters, 1k tryouts, 50k applications by default), then drives synthetic
+API Gateway v2 events with JWT claims through ``app.lambda_handler``.
+
+Each worker is its own process importing ``app`` once, like one warm Lambda
+container serving one request at a time; ``--concurrency`` is the number of
+containers. The first request of every worker is a cold start and is
+reported separately. Per route the report gives latency percentiles,
+DynamoDB calls, items read from DynamoDB and items returned per response,
+and read capacity (the per-request EMF metrics the API already emits).
+
+Usage::
+
+    python tools/api_loadtest/api_loadtest.py [--backend moto|local] [--endpoint-url URL]
+        [--scale F] [--requests N] [--concurrency N] [--mix ROUTE=WEIGHT,...] [--async] [--json]
+
+``--backend moto`` needs ``pip install 'moto[server]'``; ``--backend local``
+expects DynamoDB Local at ``--endpoint-url`` (default http://localhost:8000).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import socket
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("api_loadtest")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+API_DIR = REPO_ROOT / "accounts" / "wrestleutopia-prod" / "artifacts" / "scripts" / "api"
+
+BASE_ENV = {
+    "ENVIRONMENT": "test",
+    "AWS_REGION": "us-east-2",
+    "AWS_DEFAULT_REGION": "us-east-2",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "TABLE_WRESTLERS": "lt-WrestlerProfiles",
+    "TABLE_PROMOTERS": "lt-PromoterProfiles",
+    "TABLE_TRYOUTS": "lt-Tryouts",
+    "TABLE_APPS": "lt-Applications",
+    "TABLE_HANDLES": "lt-ProfileHandles",
+    "TABLE_SEARCH": "lt-ProfileSearch",
+    "LOG_LEVEL": "ERROR",
+    "METRICS_ENABLED": "1",
+    "CURSOR_SECRET": "loadtest-cursor-secret",
+}
+
+# Key schemas and GSIs as declared in dynamodb.tf (every GSI projects ALL).
+TABLES: Dict[str, Dict[str, Any]] = {
+    "TABLE_WRESTLERS": {"keys": ("userId", None), "gsis": {"ByHandle": ("handle", None)}},
+    "TABLE_PROMOTERS": {"keys": ("userId", None), "gsis": {}},
+    "TABLE_TRYOUTS": {"keys": ("tryoutId", None), "gsis": {
+        "ByOwner": ("ownerId", None),
+        "OpenByDate": ("status", "date"),
+        "OpenFeed": ("feedBucket", "feedSort"),
+    }},
+    "TABLE_APPS": {"keys": ("tryoutId", "applicantId"), "gsis": {"ByApplicant": ("applicantIdGsi", None)}},
+    "TABLE_HANDLES": {"keys": ("handle", None), "gsis": {}},
+    "TABLE_SEARCH": {"keys": ("pk", "sk"), "gsis": {}},
+}
+
+CITIES = [
+    ("Austin", "TX"), ("Dallas", "TX"), ("Houston", "TX"), ("Atlanta", "GA"), ("Orlando", "FL"),
+    ("Tampa", "FL"), ("Chicago", "IL"), ("Detroit", "MI"), ("Philadelphia", "PA"), ("Pittsburgh", "PA"),
+    ("Nashville", "TN"), ("Memphis", "TN"), ("Phoenix", "AZ"), ("Las Vegas", "NV"), ("Denver", "CO"),
+    ("Seattle", "WA"), ("Portland", "OR"), ("Los Angeles", "CA"), ("San Diego", "CA"), ("Boston", "MA"),
+    ("New York", "NY"), ("Buffalo", "NY"), ("Charlotte", "NC"), ("Columbus", "OH"), ("Cleveland", "OH"),
+]
+GIMMICKS = ["high flyer", "technician", "brawler", "powerhouse", "luchador", "strong style",
+            "hardcore", "showman", "submission", "comedy", "heel", "face"]
+STATUSES = ["submitted"] * 6 + ["reviewing"] * 2 + ["shortlisted", "accepted", "rejected"]
+DEFAULT_MIX = {
+    "tryout_feed": 25, "tryout_detail": 15, "wrestler_by_handle": 15, "list_wrestlers": 10,
+    "apps_by_tryout": 10, "my_applications": 10, "apply": 5, "owner_tryouts": 5, "export": 1,
+}
+
+
+# --------------------------------------------------------------------------- #
+# Backend
+# --------------------------------------------------------------------------- #
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_backend(backend: str, endpoint_url: Optional[str]) -> Tuple[str, Callable[[], None]]:
+    """Return (endpoint URL, stop function) for the DynamoDB stand-in."""
+    if backend == "local":
+        return endpoint_url or "http://localhost:8000", lambda: None
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError as exc:
+        raise SystemExit("moto is not installed: pip install 'moto[server]' (or use --backend local)") from exc
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    return f"http://127.0.0.1:{port}", server.stop
+
+
+def create_tables(client: Any) -> None:
+    """(Re)create every table, PAY_PER_REQUEST, with the production keys and indexes."""
+    existing = set(client.list_tables().get("TableNames", []))
+    for env_name, spec in TABLES.items():
+        name = BASE_ENV[env_name]
+        if name in existing:
+            client.delete_table(TableName=name)
+            client.get_waiter("table_not_exists").wait(TableName=name)
+        attrs = {a for a in spec["keys"] if a}
+        attrs |= {a for keys in spec["gsis"].values() for a in keys if a}
+
+        def schema(hash_key: str, range_key: Optional[str]) -> List[Dict[str, str]]:
+            out = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+            if range_key:
+                out.append({"AttributeName": range_key, "KeyType": "RANGE"})
+            return out
+
+        params: Dict[str, Any] = {
+            "TableName": name,
+            "BillingMode": "PAY_PER_REQUEST",
+            "AttributeDefinitions": [{"AttributeName": a, "AttributeType": "S"} for a in sorted(attrs)],
+            "KeySchema": schema(*spec["keys"]),
+        }
+        if spec["gsis"]:
+            params["GlobalSecondaryIndexes"] = [
+                {"IndexName": n, "KeySchema": schema(*keys), "Projection": {"ProjectionType": "ALL"}}
+                for n, keys in spec["gsis"].items()
+            ]
+        client.create_table(**params)
+        client.get_waiter("table_exists").wait(TableName=name)
+
+
+# --------------------------------------------------------------------------- #
+# Seed data
+# --------------------------------------------------------------------------- #
+
+@dataclass
+class Dataset:
+    """Ids the event generators pick from."""
+    wrestlers: List[Tuple[str, str]] = field(default_factory=list)  # (userId, handle)
+    promoters: List[str] = field(default_factory=list)
+    tryouts: List[Tuple[str, str]] = field(default_factory=list)  # (tryoutId, ownerId)
+    applied: Dict[str, List[str]] = field(default_factory=dict)  # applicantId -> tryoutIds
+
+
+def _uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def build_dataset(rng: random.Random, n_wrestlers: int, n_promoters: int, n_tryouts: int,
+                  n_apps: int) -> Tuple[Dataset, Dict[str, List[Dict[str, Any]]]]:
+    """Generate items per table env name, plus the ids the traffic generators need."""
+    from db import search
+    from db.applications import summary_attrs
+    from db.feed import feed_keys
+
+    ds = Dataset()
+    rows: Dict[str, List[Dict[str, Any]]] = {k: [] for k in TABLES}
+    now = "2026-01-01T00:00:00Z"
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for i in range(n_wrestlers):
+        uid = _uid(rng)
+        city, region = rng.choice(CITIES)
+        first, last = f"First{i}", f"Last{i}"
+        stage = f"The {rng.choice(['Mighty', 'Masked', 'Iron', 'Golden', 'Savage'])} {last}"
+        handle = f"{stage.lower().replace(' ', '-')}-{i}"
+        item = {
+            "userId": uid, "role": "Wrestler", "handle": handle, "stageName": stage, "name": f"{first} {last}",
+            "firstName": first, "lastName": last, "dob": "1995-05-05", "city": city, "region": region,
+            "country": "US", "heightIn": rng.randint(62, 80), "weightLb": rng.randint(150, 320),
+            "bio": "Trained for years on the indie circuit. " * rng.randint(1, 8),
+            "gimmicks": rng.sample(GIMMICKS, rng.randint(1, 3)), "experienceYears": rng.randint(0, 20),
+            "photoKey": f"public/wrestlers/images/{uid}/avatar.jpg", "mediaKeys": [], "highlights": [],
+            "createdAt": now, "updatedAt": now, "version": 1,
+        }
+        profiles[uid] = item
+        ds.wrestlers.append((uid, handle))
+        rows["TABLE_WRESTLERS"].append(item)
+        rows["TABLE_HANDLES"].append({"handle": handle, "owner": uid})
+        rows["TABLE_SEARCH"].extend(search.index_rows(search.WRESTLER, item))
+    for i in range(n_promoters):
+        uid = _uid(rng)
+        city, region = rng.choice(CITIES)
+        item = {"userId": uid, "role": "Promoter", "orgName": f"Promotion {i}", "city": city, "region": region,
+                "country": "US", "bio": "Monthly shows.", "createdAt": now, "updatedAt": now, "version": 1}
+        ds.promoters.append(uid)
+        rows["TABLE_PROMOTERS"].append(item)
+        rows["TABLE_SEARCH"].extend(search.index_rows(search.PROMOTER, item))
+    start = date.today()
+    for i in range(n_tryouts):
+        tid, owner = _uid(rng), rng.choice(ds.promoters)
+        city, region = rng.choice(CITIES)
+        item = {
+            "tryoutId": tid, "ownerId": owner, "orgName": f"Promotion {i % max(1, n_promoters)}",
+            "eventName": f"Open tryout {i}", "city": city, "date": (start + timedelta(days=rng.randint(1, 300))).isoformat(),
+            "slots": rng.randint(5, 40), "requirements": "Bring gear.", "contact": "booking@example.com",
+            "status": "open" if rng.random() < 0.8 else rng.choice(["closed", "filled"]), "createdAt": now,
+        }
+        item.update(feed_keys(item))
+        ds.tryouts.append((tid, owner))
+        rows["TABLE_TRYOUTS"].append(item)
+    # Popular tryouts draw most applications (Pareto-weighted picks).
+    weights = [rng.paretovariate(1.2) for _ in ds.tryouts]
+    seen: set[Tuple[str, str]] = set()
+    while len(seen) < min(n_apps, n_tryouts * n_wrestlers):
+        tid = rng.choices(ds.tryouts, weights=weights)[0][0]
+        uid = rng.choice(ds.wrestlers)[0]
+        if (tid, uid) in seen:
+            continue
+        seen.add((tid, uid))
+        ds.applied.setdefault(uid, []).append(tid)
+        rows["TABLE_APPS"].append({
+            "tryoutId": tid, "applicantId": uid, "applicantIdGsi": uid, "timestamp": now,
+            "notes": "Looking forward to it." if rng.random() < 0.5 else "", "reelLink": "",
+            "status": rng.choice(STATUSES), **summary_attrs(profiles[uid], now=now),
+        })
+    return ds, rows
+
+
+def load_rows(resource: Any, rows: Dict[str, List[Dict[str, Any]]], workers: int = 8) -> None:
+    """BatchWrite every table's rows, a few writers per table in parallel."""
+    jobs = []
+    for env_name, items in rows.items():
+        step = max(1, len(items) // workers + 1)
+        jobs += [(BASE_ENV[env_name], items[i: i + step]) for i in range(0, len(items), step)]
+
+    def _write(job: Tuple[str, List[Dict[str, Any]]]) -> int:
+        name, items = job
+        with resource.Table(name).batch_writer() as batch:
+            for it in items:
+                batch.put_item(Item=it)
+        return len(items)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(_write, jobs))
+    logger.info("seeded %d items", total)
+
+
+# --------------------------------------------------------------------------- #
+# Events
+# --------------------------------------------------------------------------- #
+
+def api_event(method: str, path: str, sub: str, group: str, *, qs: Optional[Dict[str, str]] = None,
+              body: Any = None, route_key: Optional[str] = None) -> Dict[str, Any]:
+    """An API Gateway HTTP API (payload v2) event as the JWT authorizer would pass it."""
+    now = int(time.time())
+    claims = {"sub": sub, "token_use": "id", "iat": now, "exp": now + 3600, "cognito:groups": [group],
+              "email": f"{sub[:8]}@example.com"}
+    rid = uuid.uuid4().hex
+    return {
+        "version": "2.0",
+        "routeKey": route_key or f"{method} {path}",
+        "rawPath": path,
+        "rawQueryString": "&".join(f"{k}={v}" for k, v in (qs or {}).items()),
+        "queryStringParameters": qs or None,
+        "headers": {"content-type": "application/json"},
+        "body": json.dumps(body) if body is not None else None,
+        "isBase64Encoded": False,
+        "requestContext": {
+            "requestId": rid, "timeEpoch": now * 1000,
+            "http": {"method": method, "path": path, "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1"},
+            "authorizer": {"jwt": {"claims": claims, "scopes": None}},
+        },
+    }
+
+
+Generator = Callable[[random.Random, Dataset], Dict[str, Any]]
+
+
+def _owned_tryout(rng: random.Random, ds: Dataset) -> Tuple[str, str]:
+    return rng.choice(ds.tryouts)
+
+
+GENERATORS: Dict[str, Generator] = {
+    "tryout_feed": lambda rng, ds: api_event("GET", "/tryouts", rng.choice(ds.wrestlers)[0], "wrestlers",
+                                             qs={"limit": "50"}),
+    "tryout_detail": lambda rng, ds: api_event("GET", f"/tryouts/{rng.choice(ds.tryouts)[0]}",
+                                               rng.choice(ds.wrestlers)[0], "wrestlers"),
+    "wrestler_by_handle": lambda rng, ds: api_event("GET", f"/profiles/wrestlers/{rng.choice(ds.wrestlers)[1]}",
+                                                    rng.choice(ds.promoters), "promoters"),
+    "list_wrestlers": lambda rng, ds: api_event("GET", "/profiles/wrestlers", rng.choice(ds.promoters), "promoters",
+                                                qs={"city": rng.choice(CITIES)[0], "limit": "50"}),
+    "apps_by_tryout": lambda rng, ds: (lambda t: api_event("GET", "/applications", t[1], "promoters",
+                                                           qs={"tryoutId": t[0]}))(_owned_tryout(rng, ds)),
+    "my_applications": lambda rng, ds: api_event("GET", "/applications",
+                                                 rng.choice(list(ds.applied) or [ds.wrestlers[0][0]]), "wrestlers"),
+    "apply": lambda rng, ds: api_event("POST", "/applications", rng.choice(ds.wrestlers)[0], "wrestlers",
+                                       body={"tryoutId": rng.choice(ds.tryouts)[0], "notes": "load test"}),
+    "owner_tryouts": lambda rng, ds: api_event("GET", f"/promoters/{rng.choice(ds.promoters)}/tryouts",
+                                               rng.choice(ds.wrestlers)[0], "wrestlers"),
+    "export": lambda rng, ds: (lambda t: api_event("GET", "/applications/export", t[1], "promoters",
+                                                   qs={"tryoutId": t[0], "format": "csv"}))(_owned_tryout(rng, ds)),
+}
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, int]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in GENERATORS:
+            raise SystemExit(f"unknown route {name!r}; choose from {', '.join(GENERATORS)}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+# --------------------------------------------------------------------------- #
+# Workers (one per simulated Lambda container)
+# --------------------------------------------------------------------------- #
+
+_W: Dict[str, Any] = {}
+
+
+class _Context:
+    """Enough of a Lambda context for the API's deadline handling (15 s timeout)."""
+
+    def __init__(self, timeout_ms: int = 15000) -> None:
+        self._deadline = time.monotonic() + timeout_ms / 1000.0
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self._deadline - time.monotonic()) * 1000)
+
+
+def _count_items(parsed: Any, model: Any, **_: Any) -> None:
+    if not isinstance(parsed, dict):
+        return
+    n = len(parsed.get("Items") or [])
+    n += 1 if parsed.get("Item") else 0
+    n += sum(len(v) for v in (parsed.get("Responses") or {}).values()) if isinstance(parsed.get("Responses"), dict) else 0
+    n += sum(1 for r in parsed.get("Responses") or [] if r.get("Item")) if isinstance(parsed.get("Responses"), list) else 0
+    _W["items_read"] += n
+
+
+def _worker_init(env: Dict[str, str]) -> None:
+    os.environ.update(env)
+    sys.path.insert(0, str(API_DIR))
+    logging.disable(logging.CRITICAL)
+    import app
+    import metrics
+
+    _W.update(app=app, cold=True, doc=None, items_read=0)
+    original = metrics.flush
+
+    class _Null:
+        def write(self, _: str) -> None:
+            pass
+
+        def flush(self) -> None:
+            pass
+
+    def _capture(status: int, **kwargs: Any) -> Any:
+        kwargs["stream"] = _Null()
+        _W["doc"] = original(status, **kwargs)
+        return _W["doc"]
+
+    metrics.flush = _capture
+
+
+def _hook_clients() -> None:
+    from db import tables
+
+    t = tables.get_tables()
+    for client in (t.ddb.meta.client, t.client):
+        client.meta.events.register("after-call.dynamodb.*", _count_items, unique_id="loadtest-items")
+    _W["hooked"] = True
+
+
+def _worker_run(task: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    route, event = task
+    _W["doc"], _W["items_read"] = None, 0
+    t0 = time.perf_counter()
+    resp = _W["app"].lambda_handler(event, _Context())
+    latency = (time.perf_counter() - t0) * 1000
+    tables = sys.modules.get("db.tables")
+    if not _W.get("hooked") and tables and tables.get_tables.cache_info().currsize:
+        # Clients exist once a route has touched DynamoDB (a cold request, not counted).
+        _hook_clients()
+    doc = _W["doc"] or {}
+    cold, _W["cold"] = _W["cold"], False
+    returned = 0
+    try:
+        if not resp.get("isBase64Encoded"):
+            body = resp.get("body") or ""
+            parsed = json.loads(body) if body.startswith(("{", "[")) else None
+            if isinstance(parsed, list):
+                returned = len(parsed)
+            elif isinstance(parsed, dict):
+                returned = len(parsed["items"]) if isinstance(parsed.get("items"), list) else int(bool(parsed))
+            elif body:
+                returned = body.count("\n")
+    except ValueError:
+        pass
+    return {
+        "route": route, "status": resp.get("statusCode", 0), "latency_ms": latency, "cold": cold,
+        "ddb_calls": doc.get("DynamoDBCalls", 0), "rcu": doc.get("ReadCapacityUnits", 0.0),
+        "items_read": _W["items_read"], "items_returned": returned,
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Report
+# --------------------------------------------------------------------------- #
+
+def _pct(values: Sequence[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, max(0, int(round(p / 100.0 * len(s) + 0.5)) - 1))]
+
+
+def summarize(results: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    routes: Dict[str, Dict[str, Any]] = {}
+    for name in sorted({r["route"] for r in results}):
+        rs = [r for r in results if r["route"] == name]
+        warm = [r for r in rs if not r["cold"]] or rs
+        lat = [r["latency_ms"] for r in warm]
+        routes[name] = {
+            "requests": len(rs),
+            "cold": sum(r["cold"] for r in rs),
+            "errors": sum(r["status"] >= 500 for r in rs),
+            "status": dict(sorted(Counter(r["status"] for r in rs).items())),
+            "p50_ms": round(_pct(lat, 50), 2), "p90_ms": round(_pct(lat, 90), 2),
+            "p99_ms": round(_pct(lat, 99), 2), "max_ms": round(max(lat), 2),
+            "ddb_calls": round(statistics.mean(r["ddb_calls"] for r in warm), 2),
+            "items_read": round(statistics.mean(r["items_read"] for r in warm), 1),
+            "items_returned": round(statistics.mean(r["items_returned"] for r in warm), 1),
+            "rcu": round(statistics.mean(r["rcu"] for r in warm), 2),
+        }
+    return {"requests": len(results), "wall_s": round(wall_s, 2),
+            "throughput_rps": round(len(results) / wall_s, 1) if wall_s else 0.0, "routes": routes}
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    cols = ("requests", "errors", "p50_ms", "p90_ms", "p99_ms", "max_ms", "ddb_calls", "items_read",
+            "items_returned", "rcu")
+    print(f"{summary['requests']} requests in {summary['wall_s']}s ({summary['throughput_rps']} req/s); "
+          "latencies exclude cold starts")
+    print(f"{'route':<20}" + "".join(f"{c:>15}" for c in cols))
+    for name, r in summary["routes"].items():
+        print(f"{name:<20}" + "".join(f"{r[c]:>15}" for c in cols))
+
+
+# --------------------------------------------------------------------------- #
+# Main
+# --------------------------------------------------------------------------- #
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--backend", choices=("moto", "local"), default="moto")
+    ap.add_argument("--endpoint-url", help="DynamoDB Local endpoint for --backend local")
+    ap.add_argument("--wrestlers", type=int, default=10_000)
+    ap.add_argument("--promoters", type=int, default=200)
+    ap.add_argument("--tryouts", type=int, default=1_000)
+    ap.add_argument("--applications", type=int, default=50_000)
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply every seed volume (e.g. 0.1 for a quick run)")
+    ap.add_argument("--requests", type=int, default=2_000)
+    ap.add_argument("--concurrency", type=int, default=4, help="worker processes (simulated containers)")
+    ap.add_argument("--mix", help="route weights, e.g. tryout_feed=5,apps_by_tryout=1 (default: built-in mix)")
+    ap.add_argument("--async", dest="use_async", action="store_true", help="run the API with API_ASYNC=1")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    for name in ("werkzeug", "wrestleutopia"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    endpoint, stop = start_backend(args.backend, args.endpoint_url)
+    env = {**BASE_ENV, "AWS_ENDPOINT_URL_DYNAMODB": endpoint, "API_ASYNC": "1" if args.use_async else "0"}
+    os.environ.update(env)
+    sys.path.insert(0, str(API_DIR))
+    try:
+        import boto3
+
+        resource = boto3.resource("dynamodb")
+        t0 = time.perf_counter()
+        create_tables(resource.meta.client)
+        rng = random.Random(args.seed)
+        scale = lambda n: max(1, int(n * args.scale))  # noqa: E731
+        ds, rows = build_dataset(rng, scale(args.wrestlers), scale(args.promoters), scale(args.tryouts),
+                                 scale(args.applications))
+        load_rows(resource, rows)
+        logger.info("tables ready in %.1fs: %s", time.perf_counter() - t0,
+                    ", ".join(f"{BASE_ENV[k]}={len(v)}" for k, v in rows.items()))
+
+        mix = parse_mix(args.mix)
+        names = list(mix)
+        tasks = [(name, GENERATORS[name](rng, ds))
+                 for name in rng.choices(names, weights=[mix[n] for n in names], k=args.requests)]
+        ctx = mp.get_context("spawn")
+        t1 = time.perf_counter()
+        with ctx.Pool(args.concurrency, initializer=_worker_init, initargs=(env,)) as pool:
+            results = list(pool.imap_unordered(_worker_run, tasks, chunksize=4))
+        summary = summarize(results, time.perf_counter() - t1)
+    finally:
+        stop()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+    return 1 if any(r["errors"] for r in summary["routes"].values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,487 @@
+"""
+Record and replay the per-account feed fetchers.
+
+``record`` downloads each account's live feed into ``fixtures/``.
+``replay`` serves those fixtures from a local HTTP stub, points every
+``fetch_data.lambda_handler`` at the stub and reports, per feed, the time
+spent on the network versus parsing, the peak Python memory, the number of
+entries in the payload and which entry the handler picked. Each payload is
+also run through feedparser, ElementTree and a streaming ``iterparse`` so
+parser swaps can be judged on real data; any disagreement on the picked
+post is flagged.
+
+Usage::
+
+    python tools/feed_bench/feed_bench.py record [--account NAME ...]
+    python tools/feed_bench/feed_bench.py replay [--account NAME ...] [--rounds N] [--json] [--strict]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+logger = logging.getLogger("feed_bench")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+URL_ATTRS = ("DEFAULT_FEED_URL", "FEED_URL", "RSS_FEED_URL")
+URL_ENV_VARS = {
+    "animeutopia": "ANIME_FEED_URL",
+    "driftutopia": "DRIFT_FEED_URL",
+    "xputopia": "IGN_FEED_URL",
+}
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+NEWS_NS = "{http://www.google.com/schemas/sitemap-news/0.9}"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+def discover_fetchers() -> Dict[str, Path]:
+    """
+    Find every account's ``fetch_data`` handler.
+
+    Returns:
+        Dict[str, Path]: Account name (without ``-prod``) to handler path.
+    """
+    found = {}
+    for path in sorted(REPO_ROOT.glob("accounts/*/artifacts/scripts/fetch_data/lambda_function.py")):
+        account = path.parents[3].name
+        found[account.removesuffix("-prod")] = path
+    return found
+
+
+def load_fetcher(account: str, path: Path) -> ModuleType:
+    """
+    Import a handler under a unique module name.
+
+    Every account ships its own ``lambda_function`` module, so they are
+    loaded side by side instead of through ``sys.path``.
+
+    Raises:
+        ImportError: If the handler's dependencies are not installed.
+    """
+    spec = importlib.util.spec_from_file_location(f"fetch_data_{account}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def feed_url_from_source(path: Path) -> Optional[str]:
+    """Read the feed URL constant without importing the handler."""
+    for line in path.read_text(encoding="utf-8").splitlines():
+        name, _, value = line.partition("=")
+        if name.strip() in URL_ATTRS and value.strip()[:1] in "\"'":
+            return value.strip().strip("\"'")
+    return None
+
+
+# --------------------------------------------------------------------------- #
+# Recording
+# --------------------------------------------------------------------------- #
+
+def record(accounts: List[str], timeout: float = 15.0) -> int:
+    """
+    Download the live feed of each account into the fixtures directory.
+
+    Each feed is stored as ``<account>.xml`` next to ``<account>.json``
+    holding the source URL, content type and recording time.
+
+    Returns:
+        int: The number of feeds that could not be recorded.
+    """
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    failures = 0
+    for account, path in discover_fetchers().items():
+        if accounts and account not in accounts:
+            continue
+        url = feed_url_from_source(path)
+        if not url:
+            logger.info("%s: no feed URL, skipping", account)
+            continue
+
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as resp:
+                body = resp.read()
+                content_type = resp.headers.get("Content-Type", "application/xml")
+        except Exception as exc:
+            logger.error("%s: could not record %s: %s", account, url, exc)
+            failures += 1
+            continue
+
+        (FIXTURES_DIR / f"{account}.xml").write_bytes(body)
+        meta = {
+            "url": url,
+            "content_type": content_type,
+            "bytes": len(body),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        (FIXTURES_DIR / f"{account}.json").write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+        logger.info("%s: recorded %d bytes from %s", account, len(body), url)
+    return failures
+
+
+# --------------------------------------------------------------------------- #
+# Replay
+# --------------------------------------------------------------------------- #
+
+class FixtureServer:
+    """Serve ``fixtures/<account>.xml`` at ``http://127.0.0.1:<port>/<account>``."""
+
+    def __init__(self, fixtures_dir: Path) -> None:
+        self.fixtures_dir = fixtures_dir
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                account = self.path.strip("/").split("?")[0]
+                body_path = server.fixtures_dir / f"{account}.xml"
+                if not account or not body_path.is_file():
+                    self.send_error(404)
+                    return
+                meta_path = server.fixtures_dir / f"{account}.json"
+                meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.is_file() else {}
+                body = body_path.read_bytes()
+                self.send_response(200)
+                self.send_header("Content-Type", meta.get("content_type", "application/xml"))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url_for(self, account: str) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/{account}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class NetworkTimer:
+    """
+    Accumulate wall time spent inside socket calls.
+
+    requests, urllib and feedparser all end up in ``socket.socket``; timing
+    ``connect``, ``sendall`` and the receive calls separates network wait
+    from the time the handler spends parsing. Only calls made on the
+    installing thread count, so the stub server's own I/O is ignored.
+    """
+
+    _METHODS = ("connect", "sendall", "send", "recv", "recv_into")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self._local = threading.local()
+        self._owner: Optional[int] = None
+
+    def _wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        timer = self
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            if threading.get_ident() != timer._owner or getattr(timer._local, "active", False):
+                return fn(*args, **kwargs)
+            timer._local.active = True
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.seconds += time.perf_counter() - start
+                timer._local.active = False
+
+        return timed
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator["NetworkTimer"]:
+        self._owner = threading.get_ident()
+        with contextlib.ExitStack() as stack:
+            for name in self._METHODS:
+                original = getattr(socket.socket, name)
+                stack.enter_context(mock.patch.object(socket.socket, name, self._wrap(original)))
+            yield self
+
+
+def _measure(fn: Callable[[], Any], rounds: int) -> Tuple[Any, Dict[str, float]]:
+    """
+    Run *fn* ``rounds`` times; report median wall/network time and peak memory.
+
+    Memory is measured on a separate, untimed run because tracemalloc slows
+    allocation-heavy parsers enough to distort the timings.
+    """
+    result = None
+    walls, nets = [], []
+    for _ in range(max(1, rounds)):
+        gc.collect()
+        timer = NetworkTimer()
+        with timer.installed():
+            start = time.perf_counter()
+            result = fn()
+            walls.append(time.perf_counter() - start)
+        nets.append(timer.seconds)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    walls.sort()
+    nets.sort()
+    wall = walls[len(walls) // 2]
+    net = nets[len(nets) // 2]
+    return result, {
+        "wall_ms": round(wall * 1000, 3),
+        "network_ms": round(net * 1000, 3),
+        "parse_ms": round(max(0.0, wall - net) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _text(el: Optional[ET.Element]) -> str:
+    return (el.text or "").strip() if el is not None else ""
+
+
+def _lastmod(url_el: ET.Element) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(_text(url_el.find(f"{SITEMAP_NS}lastmod")).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _entry_links(root: ET.Element) -> List[str]:
+    """Return the link of every entry, in document order, for RSS, Atom or news sitemaps."""
+    if root.tag == f"{SITEMAP_NS}urlset":
+        return [_text(u.find(f"{SITEMAP_NS}loc")) for u in root.findall(f"{SITEMAP_NS}url")]
+    if root.tag == f"{ATOM_NS}feed":
+        links = []
+        for entry in root.findall(f"{ATOM_NS}entry"):
+            link = entry.find(f"{ATOM_NS}link")
+            links.append(link.get("href", "") if link is not None else "")
+        return links
+    return [_text(item.find("link")) for item in root.iter("item")]
+
+
+def pick_elementtree(payload: bytes) -> Optional[str]:
+    """Build the whole tree and pick the first entry (newest ``lastmod`` for sitemaps)."""
+    root = ET.fromstring(payload)
+    if root.tag == f"{SITEMAP_NS}urlset":
+        dated = [(d, _text(u.find(f"{SITEMAP_NS}loc"))) for u in root.findall(f"{SITEMAP_NS}url")
+                 if u.find(f"{NEWS_NS}news") is not None and (d := _lastmod(u)) is not None]
+        return max(dated)[1] if dated else None
+    links = _entry_links(root)
+    return links[0] if links else None
+
+
+def pick_streaming(payload: bytes) -> Optional[str]:
+    """
+    Pick the same entry with ``iterparse``, discarding elements as it goes.
+
+    RSS and Atom stop at the first complete entry; sitemaps must be read to
+    the end because entries are not ordered by date.
+    """
+    newest: Optional[Tuple[datetime, str]] = None
+    for _, el in ET.iterparse(io.BytesIO(payload), events=("end",)):
+        if el.tag == "item":
+            return _text(el.find("link"))
+        if el.tag == f"{ATOM_NS}entry":
+            link = el.find(f"{ATOM_NS}link")
+            return link.get("href", "") if link is not None else ""
+        if el.tag == f"{SITEMAP_NS}url":
+            dt = _lastmod(el)
+            if dt is not None and el.find(f"{NEWS_NS}news") is not None:
+                candidate = (dt, _text(el.find(f"{SITEMAP_NS}loc")))
+                newest = candidate if newest is None or candidate > newest else newest
+            el.clear()
+    return newest[1] if newest else None
+
+
+def pick_feedparser(payload: bytes) -> Optional[str]:
+    """Pick the first entry as parsed by feedparser (RSS/Atom only)."""
+    import feedparser
+
+    feed = feedparser.parse(payload)
+    return feed.entries[0].get("link") if feed.entries else None
+
+
+REFERENCE_PARSERS: Dict[str, Callable[[bytes], Optional[str]]] = {
+    "elementtree": pick_elementtree,
+    "iterparse": pick_streaming,
+    "feedparser": pick_feedparser,
+}
+
+
+def replay_account(account: str, path: Path, server: FixtureServer, rounds: int) -> Dict[str, Any]:
+    """
+    Replay one account's fixture through its handler and the reference parsers.
+
+    Returns:
+        Dict[str, Any]: A report row; ``error`` is set when the handler could
+        not be run (missing fixture or dependency).
+    """
+    row: Dict[str, Any] = {"account": account}
+    fixture = FIXTURES_DIR / f"{account}.xml"
+    if not fixture.is_file():
+        row["error"] = "no fixture (run `record` first)"
+        return row
+    payload = fixture.read_bytes()
+    row["bytes"] = len(payload)
+
+    try:
+        links = _entry_links(ET.fromstring(payload))
+    except ET.ParseError as exc:
+        links = []
+        row["fixture_error"] = f"not well-formed XML: {exc}"
+    row["entries"] = len(links)
+
+    try:
+        module = load_fetcher(account, path)
+    except ImportError as exc:
+        row["error"] = f"handler not importable: {exc}"
+        module = None
+
+    if module is not None:
+        url = server.url_for(account)
+        patches = [mock.patch.object(module, attr, url) for attr in URL_ATTRS if hasattr(module, attr)]
+        if account in URL_ENV_VARS:
+            patches.append(mock.patch.dict(os.environ, {URL_ENV_VARS[account]: url}))
+        defaults = getattr(module, "fetch_latest_news_post", None)
+        if defaults is not None and defaults.__defaults__:
+            patches.append(mock.patch.object(defaults, "__defaults__", (url,)))
+
+        with contextlib.ExitStack() as stack:
+            for p in patches:
+                stack.enter_context(p)
+            result, stats = _measure(lambda: module.lambda_handler({}, None), rounds)
+
+        post = result.get("post") or {}
+        picked = post.get("link")
+        row["handler"] = {
+            **stats,
+            "status": result.get("status"),
+            "link": picked,
+            "pick_index": links.index(picked) if picked in links else None,
+            "post_id_ok": picked is None or result.get("post_id") == hashlib.md5(picked.encode("utf-8")).hexdigest(),
+        }
+
+    row["parsers"] = {}
+    for name, parser in REFERENCE_PARSERS.items():
+        try:
+            link, stats = _measure(lambda: parser(payload), rounds)
+        except ImportError:
+            row["parsers"][name] = {"error": "not installed"}
+            continue
+        except Exception as exc:
+            row["parsers"][name] = {"error": f"{type(exc).__name__}: {exc}"}
+            continue
+        row["parsers"][name] = {**stats, "link": link}
+
+    picks = {name: p["link"] for name, p in row["parsers"].items() if "link" in p}
+    if "handler" in row:
+        picks["handler"] = row["handler"]["link"]
+    row["agree"] = len(set(picks.values())) <= 1
+    if not row["agree"]:
+        row["picks"] = picks
+    return row
+
+
+def replay(accounts: List[str], rounds: int) -> List[Dict[str, Any]]:
+    """Replay every recorded fixture and return one report row per account."""
+    rows = []
+    with FixtureServer(FIXTURES_DIR) as server:
+        for account, path in discover_fetchers().items():
+            if accounts and account not in accounts:
+                continue
+            if not feed_url_from_source(path):
+                continue
+            rows.append(replay_account(account, path, server, rounds))
+    return rows
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Render the replay report as a fixed-width text table."""
+    header = f"{'account':<14}{'impl':<13}{'wall ms':>10}{'net ms':>10}{'parse ms':>10}{'peak KiB':>10}{'entries':>9}{'pick':>6}  link"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        account = row["account"]
+        if "error" in row and "handler" not in row:
+            lines.append(f"{account:<14}{'handler':<13}{row['error']}")
+        impls = ([("handler", row["handler"])] if "handler" in row else []) + list(row.get("parsers", {}).items())
+        for name, r in impls:
+            if "error" in r:
+                lines.append(f"{account:<14}{name:<13}{r['error']}")
+                continue
+            pick = r.get("pick_index")
+            lines.append(
+                f"{account:<14}{name:<13}{r['wall_ms']:>10.2f}{r['network_ms']:>10.2f}{r['parse_ms']:>10.2f}"
+                f"{r['peak_kib']:>10.1f}{row.get('entries', 0):>9}{'' if pick is None else pick:>6}  {r.get('link')}"
+            )
+        if "picks" in row:
+            lines.append(f"{account:<14}MISMATCH: implementations picked different posts")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="download live feeds into fixtures/")
+    rec.add_argument("--account", action="append", default=[], help="limit to an account (repeatable)")
+
+    rep = sub.add_parser("replay", help="replay fixtures through every fetcher")
+    rep.add_argument("--account", action="append", default=[], help="limit to an account (repeatable)")
+    rep.add_argument("--rounds", type=int, default=5, help="timed runs per implementation (median reported)")
+    rep.add_argument("--json", action="store_true", help="print the report as JSON")
+    rep.add_argument("--strict", action="store_true", help="exit non-zero when implementations disagree")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.command == "record":
+        return 1 if record(args.account) else 0
+
+    # The handlers raise the root logger to INFO on import; keep their
+    # per-call log lines out of the report.
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(logging.WARNING)
+
+    rows = replay(args.account, args.rounds)
+    print(json.dumps(rows, indent=2) if args.json else format_table(rows))
+    if args.strict and any(not row["agree"] for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())